@@ -13,12 +13,100 @@ load_dotenv(dotenv_path=_root / "api.env")
 # API
 DEEPGRAM_API_KEY: str = os.getenv("DEEPGRAM_API_KEY", "").strip()
 DEEPGRAM_BASE_URL: str | None = os.getenv("DEEPGRAM_BASE_URL", "").strip() or None
+# Prerecorded transcription: concurrent requests on the shared HTTP client, and per-request timeout
+DEEPGRAM_MAX_CONCURRENCY: int = int(os.getenv("DEEPGRAM_MAX_CONCURRENCY", "8"))
+DEEPGRAM_TIMEOUT_S: float = float(os.getenv("DEEPGRAM_TIMEOUT_S", "300"))
+# Long-audio mode (/upload-audio): WAV/MP3 longer than LONG_AUDIO_MIN_S are transcribed as
+# concurrent overlapping windows of at least LONG_AUDIO_WINDOW_S
+LONG_AUDIO_MIN_S: float = float(os.getenv("LONG_AUDIO_MIN_S", "300"))
+LONG_AUDIO_WINDOW_S: float = float(os.getenv("LONG_AUDIO_WINDOW_S", "60"))
+LONG_AUDIO_OVERLAP_S: float = float(os.getenv("LONG_AUDIO_OVERLAP_S", "4"))
+# Background transcription jobs (/upload-audio?async=true): workers and waiting-job limit (429 beyond it)
+TRANSCRIBE_WORKERS: int = int(os.getenv("TRANSCRIBE_WORKERS", "4"))
+TRANSCRIBE_QUEUE_SIZE: int = int(os.getenv("TRANSCRIBE_QUEUE_SIZE", "32"))
+# /listen: finals waiting to be sent before the server stops reading audio from that client
+CAPTION_QUEUE_MAX_FINALS: int = int(os.getenv("CAPTION_QUEUE_MAX_FINALS", "64"))
+# /listen: rate client audio is decimated to before Deepgram (integer factor of the client rate),
+# and duration of the packets client frames are coalesced into
+LIVE_SAMPLE_RATE: int = int(os.getenv("LIVE_SAMPLE_RATE", "16000"))
+LIVE_PACKET_MS: int = int(os.getenv("LIVE_PACKET_MS", "250"))
+# /listen: pre-warmed Deepgram live connections (0 disables), how long one may sit idle, keep-alive interval
+LIVE_POOL_MAX_IDLE: int = int(os.getenv("LIVE_POOL_MAX_IDLE", "4"))
+LIVE_POOL_IDLE_S: float = float(os.getenv("LIVE_POOL_IDLE_S", "120"))
+LIVE_KEEPALIVE_S: float = float(os.getenv("LIVE_KEEPALIVE_S", "5"))
+# /listen: directory for per-session NDJSON logs of final captions (in memory only when unset)
+LIVE_TRANSCRIPT_DIR: str = os.getenv("LIVE_TRANSCRIPT_DIR", "").strip()
+# Sessions: dropped after SESSION_TTL_S without use (checked every SESSION_SWEEP_S; 0 disables),
+# least recently used first once their estimated size passes SESSION_STORE_MAX_MB
+SESSION_TTL_S: float = float(os.getenv("SESSION_TTL_S", "21600"))
+SESSION_SWEEP_S: float = float(os.getenv("SESSION_SWEEP_S", "60"))
+SESSION_STORE_MAX_MB: int = int(os.getenv("SESSION_STORE_MAX_MB", "256"))
+# Session backend: "memory" (this process only) or "sqlite" (a file shared by all workers on the
+# host, e.g. uvicorn --workers N; the memory store above is then each worker's cache)
+SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory").strip().lower()
+SESSION_DB_PATH: str = os.getenv("SESSION_DB_PATH", "").strip() or str(_root / "sessions.db")
+# How long a request waits for another worker's SQLite write before failing (it blocks the event loop)
+SESSION_DB_BUSY_MS: int = int(os.getenv("SESSION_DB_BUSY_MS", "250"))
+# Phonetic keyword correction of final captions and transcripts: on/off, time budget per live
+# caption (ms), and minimum spelling similarity (0-1) for a sound-alike to be replaced
+CORRECTION_ENABLED: bool = os.getenv("CORRECTION_ENABLED", "true").lower() in ("1", "true", "yes")
+CORRECTION_BUDGET_MS: float = float(os.getenv("CORRECTION_BUDGET_MS", "5"))
+CORRECTION_MIN_SIMILARITY: float = float(os.getenv("CORRECTION_MIN_SIMILARITY", "0.65"))
+# Optional word-frequency list (most frequent first, one word per line, optionally followed by
+# its count) whose top CORRECTION_WORDLIST_TOP words are treated as common English words too
+CORRECTION_WORDLIST: str = os.getenv("CORRECTION_WORDLIST", "").strip()
+CORRECTION_WORDLIST_TOP: int = int(os.getenv("CORRECTION_WORDLIST_TOP", "30000"))
 
 # Optional: Gemini for keyword extraction
 GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "").strip()
 # Use Gemini for keywords when key is set (set to "false" or "0" to use spaCy instead)
 USE_GEMINI_KEYWORDS: bool = os.getenv("USE_GEMINI_KEYWORDS", "true").strip().lower() not in ("false", "0", "no")
+# Point at a local fake Gemini endpoint for testing (e.g. http://127.0.0.1:8100)
+GEMINI_BASE_URL: str | None = os.getenv("GEMINI_BASE_URL", "").strip() or None
+# Total time allowed for keyword extraction before falling back to spaCy
+GEMINI_BUDGET_MS: int = int(os.getenv("GEMINI_BUDGET_MS", "8000"))
+# Start the next model if the current one has not answered within this many ms
+GEMINI_HEDGE_MS: int = int(os.getenv("GEMINI_HEDGE_MS", "2500"))
+# Longer documents are split on page boundaries into chunks of this size and sent concurrently
+GEMINI_CHUNK_CHARS: int = int(os.getenv("GEMINI_CHUNK_CHARS", "30000"))
+# Gemini API calls in flight at once per extraction, hedged calls included
+GEMINI_MAX_CONCURRENCY: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
 
 # Limits (defaults)
 MAX_AUDIO_MB: int = int(os.getenv("MAX_AUDIO_MB", "25"))
+MAX_UPLOAD_AUDIO_MB: int = int(os.getenv("MAX_UPLOAD_AUDIO_MB", "500"))  # /upload-audio (full lectures)
+MAX_PDF_MB: int = int(os.getenv("MAX_PDF_MB", "50"))
 MAX_KEYWORDS: int = int(os.getenv("MAX_KEYWORDS", "20"))
+
+# PDF ingestion: page shards are extracted and scored in a process pool
+PDF_WORKERS: int = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_SHARD: int = int(os.getenv("PDF_PAGES_PER_SHARD", "8"))
+# Smaller first shard so the first partial keyword list arrives quickly
+PDF_FIRST_SHARD_PAGES: int = int(os.getenv("PDF_FIRST_SHARD_PAGES", "2"))
+
+# Keyword cache (content hash + settings -> keywords); set KEYWORD_CACHE_DIR to persist across restarts
+KEYWORD_CACHE_MAX_MB: int = int(os.getenv("KEYWORD_CACHE_MAX_MB", "16"))
+KEYWORD_CACHE_DIR: str = os.getenv("KEYWORD_CACHE_DIR", "").strip()
+# Transcript cache (audio hash + keywords + options -> result); set TRANSCRIPT_CACHE_DIR to persist
+TRANSCRIPT_CACHE_MAX_MB: int = int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "32"))
+TRANSCRIPT_CACHE_DIR: str = os.getenv("TRANSCRIPT_CACHE_DIR", "").strip()
+
+# spaCy keyword engine: text is tagged in chunks of at most this many characters via nlp.pipe
+KEYWORD_CHUNK_CHARS: int = int(os.getenv("KEYWORD_CHUNK_CHARS", "5000"))
+KEYWORD_PIPE_BATCH_SIZE: int = int(os.getenv("KEYWORD_PIPE_BATCH_SIZE", "32"))
+# >1 forks spaCy workers per call; leave at 1 when PDF_WORKERS already parallelizes pages
+KEYWORD_PIPE_PROCESSES: int = int(os.getenv("KEYWORD_PIPE_PROCESSES", "1"))
+
+# Startup: engines loaded in the lifespan warm-up (comma-separated: spacy, fitz, deepgram, gemini, pdf_pool).
+# Use an empty value for workers that only serve /listen.
+WARMUP_ENGINES: list[str] = [
+    e.strip() for e in os.getenv("WARMUP_ENGINES", "spacy,fitz,deepgram,gemini,pdf_pool").split(",") if e.strip()
+]
+# Warm up at import time instead of in the lifespan, so a pre-forking server
+# (gunicorn --preload -k uvicorn.workers.UvicornWorker) shares the loaded model across workers
+WARMUP_AT_IMPORT: bool = os.getenv("WARMUP_AT_IMPORT", "false").strip().lower() in ("true", "1", "yes")
+
+# Keyword scoring: "tfidf" (against the corpus document-frequency index) or "frequency"
+KEYWORD_SCORING: str = os.getenv("KEYWORD_SCORING", "tfidf").strip().lower()
+# Memory-mapped document-frequency index file; empty keeps the index in memory only
+CORPUS_INDEX_PATH: str = os.getenv("CORPUS_INDEX_PATH", "").strip()
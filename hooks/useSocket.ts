@@ -7,11 +7,17 @@ interface TranscriptMessage {
   is_final?: boolean
   text?: string
   confidence?: number
+  /** Position of a final in the session's transcript log (sessions only) */
+  seq?: number
+  /** Id of the transcript log seq belongs to; seqs restart at 1 in a new log */
+  epoch?: string
 }
 
 const THROTTLE_MS = 100
 const MAX_RECONNECT_ATTEMPTS = 3
 const BASE_RECONNECT_DELAY_MS = 1000
+/** Close code when another presenter took over the session; reconnecting would take it back */
+const PRESENTER_REPLACED_CODE = 4001
 
 export function useSocket(url: string | null, enabled: boolean) {
   const [status, setStatus] = useState<SocketStatus>("idle")
@@ -26,6 +32,9 @@ export function useSocket(url: string | null, enabled: boolean) {
   }
   const lastUpdateRef = useRef(0)
   const pendingInterimRef = useRef<string>("")
+  // Last final seq received and its log's epoch; sent as ?since=&epoch= on reconnect so missed finals are replayed
+  const lastSeqRef = useRef<number | null>(null)
+  const epochRef = useRef<string | null>(null)
 
   const flushPendingInterim = useCallback(() => {
     if (pendingInterimRef.current) {
@@ -45,6 +54,15 @@ export function useSocket(url: string | null, enabled: boolean) {
       const { addTranscriptItem, setInterimText } = useStore.getState()
 
       if (isFinal) {
+        if (typeof data.seq === "number") {
+          // A seq from another log (server restart, other worker) says nothing about duplicates
+          if ((data.epoch ?? null) !== epochRef.current) {
+            epochRef.current = data.epoch ?? null
+            lastSeqRef.current = null
+          }
+          if (lastSeqRef.current !== null && data.seq <= lastSeqRef.current) return
+          lastSeqRef.current = data.seq
+        }
         addTranscriptItem({
           id: crypto.randomUUID(),
           text,
@@ -81,6 +99,9 @@ export function useSocket(url: string | null, enabled: boolean) {
     }
 
     userDisconnectRef.current = false
+    // Seqs of a previous url's session don't apply to this one
+    lastSeqRef.current = null
+    epochRef.current = null
     syncStatusToStore("connecting")
     const ws = new WebSocket(url)
 
@@ -104,18 +125,27 @@ export function useSocket(url: string | null, enabled: boolean) {
       const delay = BASE_RECONNECT_DELAY_MS * Math.pow(2, reconnectAttemptRef.current)
       reconnectAttemptRef.current++
       reconnectTimeoutRef.current = setTimeout(() => {
-        reconnectAttemptRef.current = 0
         userDisconnectRef.current = false
         syncStatusToStore("connecting")
-        const ws2 = new WebSocket(url)
+        const resumeUrl =
+          lastSeqRef.current === null
+            ? url
+            : `${url}${url.includes("?") ? "&" : "?"}since=${lastSeqRef.current}` +
+              (epochRef.current ? `&epoch=${encodeURIComponent(epochRef.current)}` : "")
+        const ws2 = new WebSocket(resumeUrl)
         ws2.onopen = () => {
+          reconnectAttemptRef.current = 0
           syncStatusToStore("connected")
           socketRef.current = ws2
         }
         ws2.onmessage = handleMessage
-        ws2.onclose = () => {
+        ws2.onclose = (event) => {
           socketRef.current = null
           flushPendingInterim()
+          if (event.code === PRESENTER_REPLACED_CODE) {
+            syncStatusToStore("error")
+            return
+          }
           if (!userDisconnectRef.current) {
             syncStatusToStore("disconnected")
             tryReconnect()
@@ -126,13 +156,17 @@ export function useSocket(url: string | null, enabled: boolean) {
       }, delay)
     }
 
-    ws.onclose = () => {
+    ws.onclose = (event) => {
       socketRef.current = null
       flushPendingInterim()
       if (userDisconnectRef.current) {
         syncStatusToStore("idle")
         return
       }
+      if (event.code === PRESENTER_REPLACED_CODE) {
+        syncStatusToStore("error")
+        return
+      }
       syncStatusToStore("disconnected")
       tryReconnect()
     }
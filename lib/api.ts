@@ -9,10 +9,13 @@ const getApiBase = () => {
 export const getUploadUrl = () => `${getApiBase()}/upload`
 export const getUploadAudioUrl = () => `${getApiBase()}/upload-audio`
 
-/** Base WebSocket URL for live transcription. sessionId is optional (for keyword biasing). */
+/**
+ * Base WebSocket URL for live transcription. sessionId is optional (for keyword biasing);
+ * with one, this client is the session's presenter (its captions are logged and broadcast).
+ */
 export const getWebSocketUrl = (sessionId: string | null) => {
   const base = getApiBase().replace(/^http/, "ws")
-  return sessionId ? `${base}/listen?session_id=${sessionId}` : `${base}/listen`
+  return sessionId ? `${base}/listen?session_id=${sessionId}&role=presenter` : `${base}/listen`
 }
 
 export interface TimedWord {
@@ -2,14 +2,44 @@
 FastAPI app. Run: uvicorn main:app --reload --port 8000
 """
 
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+import config
+from routers import listen, metrics as metrics_router, session, upload, upload_pdf, transcribe
+from services import asr_service, job_queue, keywords_gemini, live_pool, metrics, pdf_pipeline, session_store, transcript_log, warmup
+from services.session_db import DatabaseBusy
+from services.upload_ingest import UploadTooLarge
+
+if config.WARMUP_AT_IMPORT:
+    warmup.warm(config.WARMUP_ENGINES)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not config.WARMUP_AT_IMPORT:
+        warmup.warm(config.WARMUP_ENGINES)
+    job_queue.start()
+    session_store.start()
+    yield
+    # Jobs first: interrupted ones mark their sessions failed in the store
+    await job_queue.stop()
+    await session_store.stop()
+    transcript_log.flush()
+    pdf_pipeline.shutdown()
+    await keywords_gemini.aclose()
+    await asr_service.aclose()
+    await live_pool.aclose()
 
-from routers import listen, upload, upload_pdf, transcribe
 
 app = FastAPI(
     title="Audio-ASR + PDF Pipeline",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -28,8 +58,48 @@ app.include_router(upload_pdf.router)
 app.include_router(upload.router)
 app.include_router(transcribe.router)
 app.include_router(listen.router)
+app.include_router(session.router)
+app.include_router(metrics_router.router)
+
+
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large(request: Request, exc: UploadTooLarge):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+
+@app.exception_handler(asr_service.UpstreamError)
+async def upstream_error(request: Request, exc: asr_service.UpstreamError):
+    return JSONResponse(
+        status_code=exc.status_code, content={"detail": str(exc), "upstream_status": exc.upstream_status}
+    )
+
+
+@app.exception_handler(DatabaseBusy)
+async def database_busy(request: Request, exc: DatabaseBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
+
+@app.middleware("http")
+async def request_timer(request: Request, call_next):
+    t0 = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    if route is not None:
+        elapsed = time.perf_counter() - t0
+        warmup.record_first_request(f"{request.method} {route.path}", elapsed)
+        metrics.HTTP_REQUESTS.labels(request.method, route.path, str(response.status_code)).observe(elapsed)
+    return response
 
 
 @app.get("/")
 async def root():
     return {"service": "audio-asr-pdf-pipeline", "docs": "/docs"}
+
+
+@app.get("/ready")
+async def ready(response: Response):
+    """Readiness: 200 once the configured engines are warm, 503 before."""
+    report = warmup.status(config.WARMUP_ENGINES)
+    if not report["ready"]:
+        response.status_code = 503
+    return report
@@ -1,29 +1,87 @@
 """WebSocket /listen — Live streaming transcription with Deepgram."""
 
-import asyncio
 import json
 import logging
+import time
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
 import config
-from deepgram import Deepgram
-from services import session_store
+from services import caption_hub, caption_queue, keyword_corrector, keyword_matcher, live_pool, metrics, session_store, transcript_log
+from services.audio_pipeline import CLIENT_SAMPLE_RATE, AudioPipeline
 
 router = APIRouter(tags=["listen"])
 logger = logging.getLogger(__name__)
 
+# Close code for a presenter replaced by a newer one; clients must not reconnect on it
+PRESENTER_REPLACED = 4001
+
+_latency_interim = metrics.LIVE_CAPTION_LATENCY.labels("interim")
+_latency_final = metrics.LIVE_CAPTION_LATENCY.labels("final")
+
+
+def _caption(data: dict) -> dict | None:
+    """Deepgram transcript event -> { is_final, text, confidence }, or None if there is no text."""
+    if "channel" not in data:
+        return None
+    alts = data.get("channel", {}).get("alternatives") or []
+    if not alts:
+        return None
+    transcript = (alts[0] or {}).get("transcript", "").strip()
+    if not transcript:
+        return None
+    return {
+        "is_final": data.get("is_final", False),
+        "text": transcript,
+        "confidence": (alts[0] or {}).get("confidence"),
+    }
+
+
+def _replay(
+    session_id: str, since: int, epoch: str | None, matcher: keyword_matcher.KeywordMatcher | None
+) -> list[dict]:
+    """Logged finals after seq `since` (all if `epoch` is another log's), with keyword spans like live captions."""
+    missed = transcript_log.since(session_id, since, epoch)
+    for msg in missed:
+        msg["spans"] = matcher.find(msg["text"]) if matcher is not None else []
+    return missed
+
+
+@router.get("/listen/stats")
+async def listen_stats():
+    """Caption queue depth per open connection, pre-warmed upstream pool, broadcast fan-out, keyword correction."""
+    return {
+        **caption_queue.stats(),
+        "upstream": live_pool.stats(),
+        "broadcast": caption_hub.stats(),
+        "correction": keyword_corrector.stats(),
+    }
+
 
 @router.websocket("/listen")
 async def websocket_listen(
     websocket: WebSocket,
     session_id: str | None = Query(None, description="Session ID for keyword biasing"),
+    sample_rate: int = Query(CLIENT_SAMPLE_RATE, description="Sample rate of the client's linear16 PCM"),
+    since: int | None = Query(None, description="Replay the session's finals after this seq first"),
+    epoch: str | None = Query(None, description="Epoch of the log `since` is from; another epoch replays every final"),
+    role: str | None = Query(None, description="'presenter' to own the session's transcript and broadcast it"),
 ):
     """
     Accept WebSocket connection, stream audio to Deepgram, forward transcripts.
-    Client sends binary audio (webm); server sends JSON { is_final, text, confidence }.
+    Client sends binary linear16 PCM; it is resampled to LIVE_SAMPLE_RATE and sent in
+    LIVE_PACKET_MS packets. Server sends JSON { is_final, text, confidence, spans }, spans being
+    the session keywords found in text (finals have misheard keywords corrected first).
+    With a session and ?role=presenter this connection is the session's presenter: finals are
+    appended to its transcript log and carry their sequence number as `seq` and the log's
+    `epoch` (seqs restart in a new log), and captions are broadcast to the session's
+    /listen/view viewers. A newer presenter replaces this one, which is closed with code 4001
+    (clients should not reconnect on it). A reconnecting presenter passes the last seq and
+    epoch it saw as ?since=&epoch= to get the missed finals first. Other connections with a
+    session only use its keywords.
     """
     await websocket.accept()
+    accepted_at = time.perf_counter()
     logger.info("WebSocket /listen accepted")
 
     if not config.DEEPGRAM_API_KEY:
@@ -31,56 +89,79 @@ async def websocket_listen(
         await websocket.close(code=1011, reason="DEEPGRAM_API_KEY not configured")
         return
 
+    if role not in (None, "presenter"):
+        await websocket.close(code=1008, reason="role must be 'presenter'")
+        return
+
     keywords = []
+    log_session_id = None
     if session_id:
         sess = session_store.get_session(session_id)
         if sess:
             keywords = sess.get("keywords") or []
+            if role == "presenter":
+                log_session_id = sess["session_id"]
 
-    opts = {"api_key": config.DEEPGRAM_API_KEY}
-    if config.DEEPGRAM_BASE_URL:
-        opts["api_url"] = config.DEEPGRAM_BASE_URL.rstrip("/")
-    dg = Deepgram(opts)
-
-    live_options = {
-        "punctuate": True,
-        "interim_results": True,
-        "smart_format": True,
-        "encoding": "linear16",
-        "sample_rate": 48000,
-    }
-    if keywords:
-        live_options["keywords"] = keywords
+    audio = AudioPipeline(sample_rate)
+    matcher = keyword_matcher.get_matcher(keywords)
+    corrector = keyword_corrector.get_corrector(keywords)
 
     dg_socket = None
+    warm = False
+    first_caption_sent = False
+    first_interim_at: float | None = None
     bytes_received = 0
+    # One ordered writer per connection; stale interims are dropped, finals never are
+    captions = caption_queue.CaptionQueue(websocket.send_text)
+    if log_session_id is not None and since is not None:
+        for missed in _replay(log_session_id, since, epoch, matcher):
+            captions.put(missed)
+
+    async def close_superseded() -> None:
+        await websocket.close(code=PRESENTER_REPLACED, reason="Another presenter connected to this session")
+
+    if log_session_id is not None:
+        caption_hub.claim_presenter(log_session_id, close_superseded)
+    metrics.LIVE_ACTIVE.inc()
     try:
-        dg_socket = await dg.transcription.live(live_options)
-        logger.info("Connected to Deepgram live API")
-
-        async def on_transcript(data: dict) -> None:
-            if "channel" not in data:
-                return
-            alts = data.get("channel", {}).get("alternatives") or []
-            if not alts:
-                return
-            transcript = (alts[0] or {}).get("transcript", "").strip()
-            if not transcript:
-                return
-            msg = {
-                "is_final": data.get("is_final", False),
-                "text": transcript,
-                "confidence": (alts[0] or {}).get("confidence"),
-            }
-            try:
-                await websocket.send_text(json.dumps(msg))
-                logger.debug("Sent transcript: %r", transcript[:50])
-            except Exception as e:
-                logger.warning("Failed to send transcript: %s", e)
+        # Pre-warmed upstream connection for these keywords when one is idle, else a new one
+        connect_started = time.perf_counter()
+        dg_socket, warm = await live_pool.acquire(keywords, sample_rate)
+        metrics.LIVE_UPSTREAM_CONNECT.labels(str(warm).lower()).observe(time.perf_counter() - connect_started)
+        logger.info("Connected to Deepgram live API (warm=%s)", warm)
 
         def handle_transcript(body) -> None:
+            nonlocal first_caption_sent, first_interim_at
             if isinstance(body, dict):
-                asyncio.create_task(on_transcript(body))
+                msg = _caption(body)
+                if msg is not None:
+                    now = time.perf_counter()
+                    if not first_caption_sent:
+                        first_caption_sent = True
+                        live_pool.record_first_caption(now - accepted_at, warm)
+                    if "start" in body:
+                        # Deepgram's offset of the caption's last audio, back to when that audio arrived
+                        received = audio.received_at(body["start"] + body.get("duration", 0))
+                        if received is not None:
+                            (_latency_final if msg["is_final"] else _latency_interim).observe(now - received)
+                    if not msg["is_final"]:
+                        if first_interim_at is None:
+                            first_interim_at = now
+                    elif first_interim_at is not None:
+                        metrics.LIVE_INTERIM_TO_FINAL.observe(now - first_interim_at)
+                        first_interim_at = None
+                    if msg["is_final"]:
+                        # Misheard keywords rewritten, within a budget so captions aren't held up
+                        msg["text"] = keyword_corrector.correct(corrector, msg["text"], config.CORRECTION_BUDGET_MS)
+                    msg["spans"] = matcher.find(msg["text"]) if matcher is not None else []
+                    if msg["is_final"] and log_session_id is not None:
+                        msg["seq"] = transcript_log.append(log_session_id, msg["text"], msg["confidence"])
+                        msg["epoch"] = transcript_log.epoch(log_session_id)
+                        keyword_matcher.record_hits(log_session_id, msg["spans"])
+                    encoded = json.dumps(msg)
+                    captions.put(msg, encoded)
+                    if log_session_id is not None:
+                        caption_hub.publish(log_session_id, msg, encoded)
 
         dg_socket.register_handler(
             dg_socket.event.TRANSCRIPT_RECEIVED,
@@ -93,11 +174,13 @@ async def websocket_listen(
         dg_socket.register_handler(dg_socket.event.ERROR, handle_error)
 
         while True:
+            await captions.wait_for_room()
             msg = await websocket.receive()
             if "bytes" in msg:
                 data = msg["bytes"]
                 bytes_received += len(data)
-                dg_socket.send(data)
+                metrics.LIVE_AUDIO_BYTES.inc(len(data))
+                audio.feed(data, dg_socket.send)
             elif "text" in msg:
                 logger.warning("Received text instead of bytes, ignoring")
             elif msg.get("type") == "websocket.disconnect":
@@ -112,13 +195,64 @@ async def websocket_listen(
         except Exception:
             pass
     finally:
+        metrics.LIVE_ACTIVE.dec()
+        elapsed = time.perf_counter() - accepted_at
+        if bytes_received and elapsed > 0:
+            metrics.LIVE_AUDIO_RATE.observe(bytes_received / elapsed)
+        if log_session_id is not None:
+            caption_hub.release_presenter(log_session_id, close_superseded)
         try:
             if dg_socket is not None:
+                audio.flush(dg_socket.send)
                 await dg_socket.finish()
         except Exception as e:
             logger.warning("Deepgram finish: %s", e)
+        await captions.aclose()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+        logger.info("WebSocket /listen closed (bytes_received=%d, audio=%s)", bytes_received, audio.stats())
+
+
+@router.websocket("/listen/view")
+async def websocket_view(
+    websocket: WebSocket,
+    session_id: str = Query(..., description="Session whose presenter's captions to receive"),
+    since: int | None = Query(None, description="Replay the session's finals after this seq first"),
+    epoch: str | None = Query(None, description="Epoch of the log `since` is from; another epoch replays every final"),
+):
+    """
+    Receive-only caption stream for a session (lecture-hall viewers); no audio is sent.
+    Messages are the presenter's { is_final, text, confidence, spans, seq, epoch }. A viewer that
+    falls too far behind is disconnected and should reconnect with ?since=<last seq>&epoch=<its epoch>.
+    """
+    await websocket.accept()
+    sess = session_store.get_session(session_id)
+    if not sess:
+        await websocket.close(code=1008, reason="Session not found")
+        return
+    sid = sess["session_id"]
+
+    async def close_lagging() -> None:
+        await websocket.close(code=1013, reason="Too far behind; reconnect with since")
+
+    captions = caption_queue.CaptionQueue(websocket.send_text)
+    if since is not None:
+        for missed in _replay(sid, since, epoch, keyword_matcher.get_matcher(sess.get("keywords"))):
+            captions.put(missed)
+    caption_hub.subscribe(sid, captions, close_lagging)
+    try:
+        while True:
+            msg = await websocket.receive()
+            if msg.get("type") == "websocket.disconnect":
+                break
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        caption_hub.unsubscribe(sid, captions)
+        await captions.aclose()
         try:
             await websocket.close()
         except Exception:
             pass
-        logger.info("WebSocket /listen closed (bytes_received=%d)", bytes_received)
@@ -0,0 +1,56 @@
+"""GET /metrics — Prometheus text exposition."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import config
+from services import (
+    caption_hub,
+    caption_queue,
+    job_queue,
+    keyword_cache,
+    keyword_corrector,
+    keywords_gemini,
+    live_pool,
+    metrics,
+    session_store,
+    transcript_cache,
+    warmup,
+)
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _component_stats() -> list[str]:
+    """Stats the services keep themselves, read at scrape time."""
+    blocks = [
+        metrics.render_stats("session_store", session_store.stats(), "Session store size and evictions"),
+        metrics.render_stats("keyword_cache", keyword_cache.stats(), "Keyword cache"),
+        metrics.render_stats("transcript_cache", transcript_cache.stats(), "Transcript cache"),
+        metrics.render_stats("transcribe_jobs", job_queue.stats(), "Background transcription queue"),
+        metrics.render_stats(
+            "caption_queue",
+            {k: v for k, v in caption_queue.stats().items() if k != "depths"},
+            "Outbound caption queues",
+        ),
+        metrics.render_stats("live_pool", live_pool.stats(), "Pre-warmed Deepgram live connections"),
+        metrics.render_stats("caption_broadcast", caption_hub.stats(), "Caption broadcast hub"),
+        metrics.render_stats("keyword_correction", keyword_corrector.stats(), "Keyword correction"),
+        metrics.render_stats("warmup", warmup.status(config.WARMUP_ENGINES), "Engine warm-up and readiness"),
+    ]
+    blocks.append(
+        metrics.render_labeled_stats(
+            "gemini",
+            [({"model": model}, st) for model, st in keywords_gemini.get_stats().items()],
+            "Gemini calls per model",
+        )
+    )
+    return [block for block in blocks if block]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Counters, gauges and histograms from the hot paths, plus each component's stats()."""
+    return PlainTextResponse(metrics.render(_component_stats()), media_type=CONTENT_TYPE)
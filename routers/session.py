@@ -3,7 +3,7 @@
 from fastapi import APIRouter, HTTPException
 
 from schemas import SessionResponse
-from services import session_store
+from services import keyword_matcher, session_store, transcript_log
 
 router = APIRouter(prefix="", tags=["session"])
 
@@ -13,11 +13,17 @@ async def get_session(session_id: str):
     sess = session_store.get_session(session_id)
     if not sess:
         raise HTTPException(404, detail="Session not found")
+    segments = sess.get("segments") or []
+    spans = keyword_matcher.match_segments(keyword_matcher.get_matcher(sess.get("keywords")), segments)
     return SessionResponse(
         session_id=sess["session_id"],
         keywords=sess.get("keywords") or [],
-        transcript=sess.get("transcript"),
+        # Live captions when there are any (assembled incrementally), else the prerecorded transcript
+        transcript=transcript_log.transcript(sess["session_id"]) or sess.get("transcript"),
+        segments=[{**seg, "spans": seg_spans} for seg, seg_spans in zip(segments, spans)],
+        keyword_hits=keyword_matcher.hits(sess["session_id"]),
         status=sess.get("status", "unknown"),
+        error=sess.get("error"),
         created_at=sess.get("created_at"),
         updated_at=sess.get("updated_at"),
     )
@@ -1,16 +1,14 @@
 """Router: /transcribe"""
 
-import tempfile
-from pathlib import Path
-
-from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, HTTPException, Query, Request
 
 import config
-from services import asr_service, session_store
+from services import asr_service, keyword_corrector, session_store, transcript_cache
+from services.upload_ingest import multipart_body, receive_upload, require_suffix
 
 router = APIRouter(tags=["transcribe"])
 
-MAX_BYTES = config.MAX_AUDIO_MB * 1024 * 1024
+_mp3_suffix = require_suffix((".mp3",), "Expected an MP3 file (audio/mpeg)")
 
 
 def _get_keywords_for_transcription(session_id: str | None) -> list[str]:
@@ -23,41 +21,42 @@ def _get_keywords_for_transcription(session_id: str | None) -> list[str]:
     return session_store.get_keywords(s)
 
 
-@router.post("/transcribe")
+@router.post("/transcribe", openapi_extra=multipart_body("MP3 audio file"))
 async def transcribe(
-    file: UploadFile = File(..., description="MP3 audio file"),
+    request: Request,
     session_id: str | None = Query(None, description="Session from Phase 2 for keyword biasing"),
 ):
     """
     Accept an MP3 upload and optional session_id. Session validation and keyword
     resolution are handled locally; missing or invalid session_id results in
-    transcription without context. Returns transcript, confidence, and keywords_used.
+    transcription without context. Returns transcript, confidence, keywords_used, and cached
+    (true when the same audio and keywords were already transcribed).
     """
-    if not file or not file.filename or not file.filename.lower().endswith(".mp3"):
-        raise HTTPException(400, detail="Expected an MP3 file (audio/mpeg)")
-    content = await file.read()
-    if len(content) > MAX_BYTES:
-        raise HTTPException(
-            413,
-            detail=f"Audio file exceeds maximum size of {config.MAX_AUDIO_MB} MB",
-        )
+    # Streams to disk; UploadTooLarge (413) from Content-Length, or as soon as MAX_AUDIO_MB is crossed
+    spooled = (await receive_upload(request, config.MAX_AUDIO_MB, _mp3_suffix, kind="Audio")).spooled
+    tmp_path = spooled.path
     keywords_used: list[str] = _get_keywords_for_transcription(session_id)
 
-    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-        tmp.write(content)
-        tmp_path = Path(tmp.name)
     try:
-        try:
-            transcript_text, confidence, _, _ = await asr_service.transcribe_audio(
-                tmp_path,
-                keywords=keywords_used if keywords_used else None,
-            )
-        except ValueError as e:
-            raise HTTPException(503, detail=str(e))
+        options = asr_service.options_key()
+        result = transcript_cache.get(spooled.sha256, keywords_used, options)
+        cached = result is not None
+        if result is None:
+            try:
+                result = await asr_service.transcribe_audio(
+                    tmp_path,
+                    keywords=keywords_used if keywords_used else None,
+                )
+            except ValueError as e:
+                raise HTTPException(503, detail=str(e))
+            transcript_cache.put(spooled.sha256, keywords_used, options, result)
+        corrector = keyword_corrector.get_corrector(keywords_used)
+        transcript_text, confidence, _, _ = keyword_corrector.correct_result(corrector, result)
         return {
             "transcript": transcript_text,
             "confidence": confidence,
             "keywords_used": keywords_used,
+            "cached": cached,
         }
     finally:
         tmp_path.unlink(missing_ok=True)
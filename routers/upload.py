@@ -1,44 +1,181 @@
 """POST /upload-pdf and POST /upload-audio."""
 
-import tempfile
+import asyncio
+from functools import partial
 from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
 
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 import config
-from schemas import TimedSegment, TimedWord, UploadAudioResponse, UploadPdfResponse
-from services import asr_service, pdf_service, session_store
+from schemas import KeywordSpan, TimedSegment, TimedWord, UploadAudioJobResponse, UploadAudioResponse, UploadPdfResponse
+from services import asr_service, audio_chunking, job_queue, keyword_corrector, keyword_matcher, live_pool, pdf_pipeline, session_store, transcript_cache
+from services.session_db import DatabaseBusy
+from services.transcript_columns import dumps, to_columns
+from services.upload_ingest import SpooledUpload, multipart_body, receive_upload, require_suffix
 
 router = APIRouter(prefix="", tags=["upload"])
 
+_pdf_suffix = require_suffix((".pdf",), "Expected a PDF file")
+_audio_suffix = require_suffix(
+    (".mp3", ".wav", ".m4a", ".ogg", ".webm"),
+    "Unsupported audio format. Use MP3, WAV, etc.",
+    missing_detail="Expected an audio file",
+)
 
-@router.post("/upload-pdf", response_model=UploadPdfResponse)
-async def upload_pdf(file: UploadFile = File(..., description="PDF file")):
-    if not file.filename or not file.filename.lower().endswith(".pdf"):
-        raise HTTPException(400, detail="Expected a PDF file")
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = Path(tmp.name)
+
+async def _stream_pdf(tmp_path: Path, doc_hash: str, fmt: str) -> AsyncIterator[str]:
+    try:
+        async for event in pdf_pipeline.run_keyword_pipeline(
+            tmp_path, top_n=config.MAX_KEYWORDS, doc_hash=doc_hash
+        ):
+            if event["event"] == "partial":
+                yield pdf_pipeline.encode_event(event, fmt)
+                continue
+            session_id = session_store.create_session(
+                event["keywords"], event["counts"], event["source"], doc_hash=doc_hash
+            )
+            live_pool.prewarm_session(session_id)
+            yield pdf_pipeline.encode_event(
+                {"event": "done", "session_id": session_id, "keywords": event["keywords"]},
+                fmt,
+            )
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+@router.post("/upload-pdf", response_model=UploadPdfResponse, openapi_extra=multipart_body("PDF file"))
+async def upload_pdf(
+    request: Request,
+    stream: str | None = Query(None, description="Stream progress as 'ndjson' or 'sse'"),
+):
+    if stream is not None and stream not in pdf_pipeline.STREAM_MEDIA_TYPES:
+        raise HTTPException(400, detail="stream must be 'ndjson' or 'sse'")
+    spooled = (await receive_upload(request, config.MAX_PDF_MB, _pdf_suffix, kind="PDF")).spooled
+    tmp_path, doc_hash = spooled.path, spooled.sha256
+    if stream:
+        return StreamingResponse(_stream_pdf(tmp_path, doc_hash, stream), media_type=pdf_pipeline.STREAM_MEDIA_TYPES[stream])
     try:
-        keywords = pdf_service.process_pdf(tmp_path, top_n=config.MAX_KEYWORDS)
-        session_id = session_store.create_session(keywords)
-        return UploadPdfResponse(session_id=session_id, keywords=keywords)
+        final: dict = {}
+        async for event in pdf_pipeline.run_keyword_pipeline(
+            tmp_path, top_n=config.MAX_KEYWORDS, doc_hash=doc_hash
+        ):
+            if event["event"] == "keywords":
+                final = event
+        session_id = session_store.create_session(
+            final["keywords"], final["counts"], final["source"], doc_hash=doc_hash
+        )
+        live_pool.prewarm_session(session_id)
+        return UploadPdfResponse(session_id=session_id, keywords=final["keywords"])
     finally:
         tmp_path.unlink(missing_ok=True)
 
 
-@router.post("/upload-audio", response_model=UploadAudioResponse)
+async def _transcribe(spooled: SpooledUpload, keywords: Optional[list[str]]) -> tuple[tuple, bool]:
+    """
+    (transcript, confidence, words, segments) with misheard keywords corrected, and whether it
+    came from the transcript cache (which holds the uncorrected result).
+    """
+    # One-request results are shared with /transcribe; split ones also depend on the windowing
+    single, split = asr_service.options_key(), audio_chunking.options_key()
+    result = transcript_cache.get(spooled.sha256, keywords, single) or transcript_cache.get(
+        spooled.sha256, keywords, split
+    )
+    cached = result is not None
+    if result is None:
+        windows = await asyncio.to_thread(audio_chunking.plan_windows, spooled.path)
+        result = await audio_chunking.transcribe_windows(spooled.path, windows, keywords)
+        transcript_cache.put(spooled.sha256, keywords, single if windows is None else split, result)
+    return keyword_corrector.correct_result(keyword_corrector.get_corrector(keywords), result), cached
+
+
+# Attempts at a background job's session write while other workers hold the session database
+_JOB_WRITE_ATTEMPTS = 5
+
+
+async def _job_write(write: Callable[..., object], *args, **kwargs) -> None:
+    """A session write from a background job, retried after DatabaseBusy (SESSION_BACKEND=sqlite)."""
+    for _ in range(_JOB_WRITE_ATTEMPTS - 1):
+        try:
+            write(*args, **kwargs)
+            return
+        except DatabaseBusy as e:
+            await asyncio.sleep(e.retry_after)
+    write(*args, **kwargs)
+
+
+async def _transcription_job(session_id: str, spooled: SpooledUpload, keywords: Optional[list[str]]) -> None:
+    """
+    Background job: queued -> transcribing -> transcript_ready (or failed with an error, or
+    with "interrupted" if the app shuts down mid-job).
+    """
+    try:
+        await _job_write(session_store.update_session_status, session_id, "transcribing")
+        (transcript, _, _, segments), _ = await _transcribe(spooled, keywords)
+        await _job_write(session_store.update_session_transcript, session_id, transcript, segments)
+        for spans in keyword_matcher.match_segments(keyword_matcher.get_matcher(keywords), segments):
+            keyword_matcher.record_hits(session_id, spans)
+    except asyncio.CancelledError:
+        await _job_write(session_store.update_session_status, session_id, "failed", error="interrupted")
+        raise
+    except Exception as e:
+        await _job_write(session_store.update_session_status, session_id, "failed", error=str(e) or type(e).__name__)
+        raise
+    finally:
+        spooled.unlink()
+
+
+def _discard_job(session_id: str, spooled: SpooledUpload) -> None:
+    """A queued job dropped at shutdown: its session is failed with "interrupted"."""
+    spooled.unlink()
+    session_store.update_session_status(session_id, "failed", error="interrupted")
+
+
+def _admit() -> None:
+    """job_queue.admit(), as a 429 with Retry-After when the queue is full."""
+    try:
+        job_queue.admit()
+    except job_queue.QueueFull as e:
+        raise HTTPException(429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+@router.post(
+    "/upload-audio",
+    response_model=UploadAudioResponse,
+    responses={202: {"model": UploadAudioJobResponse, "description": "Queued (?async=true)"}},
+    openapi_extra=multipart_body(
+        "Audio file (MP3/WAV)",
+        session_id="Session whose keywords bias the transcription (and that receives the transcript)",
+        bias_keywords="Comma-separated keywords for biasing",
+    ),
+)
 async def upload_audio(
-    file: UploadFile = File(..., description="Audio file (MP3/WAV)"),
-    session_id: str | None = Form(None),
-    bias_keywords: str | None = Form(None, description="Comma-separated keywords for biasing"),
+    request: Request,
+    run_async: bool = Query(
+        False,
+        alias="async",
+        description="Return 202 with session_id at once and transcribe in the background",
+    ),
+    response_format: str = Query("full", alias="format", description="'full' or 'compact' (columnar words)"),
 ):
-    if not file.filename:
-        raise HTTPException(400, detail="Expected an audio file")
-    ext = (Path(file.filename).suffix or "").lower()
-    if ext not in (".mp3", ".wav", ".m4a", ".ogg", ".webm"):
-        raise HTTPException(400, detail="Unsupported audio format. Use MP3, WAV, etc.")
+    """
+    Transcribe an uploaded recording with keyword biasing (bias_keywords, else the session's).
+    With ?async=true the job is queued and the response is 202 {session_id, status: "queued"};
+    poll GET /session/{session_id} until status is transcript_ready (or failed). A full queue
+    answers 429 with Retry-After, before the upload is read.
+    With ?format=compact the words are parallel arrays {word, start_ms, end_ms} and segments
+    are {transcript, range, spans} with [start, end) indexes into them (see transcript_columns).
+    Each segment carries the biasing keywords found in its transcript as character spans.
+    """
+    if response_format not in ("full", "compact"):
+        raise HTTPException(400, detail="format must be 'full' or 'compact'")
+    if run_async:
+        _admit()  # shed load before reading the upload
+    received = await receive_upload(request, config.MAX_UPLOAD_AUDIO_MB, _audio_suffix, kind="Audio")
+    spooled = received.spooled
+    session_id = received.fields.get("session_id", "").strip() or None
+    bias_keywords = received.fields.get("bias_keywords") or None
     # Resolve keywords: explicit bias_keywords > session keywords
     keywords = None
     if bias_keywords:
@@ -49,25 +186,53 @@ async def upload_audio(
             keywords = sess.get("keywords") or []
     if not keywords:
         keywords = None
-    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = Path(tmp.name)
+    if run_async:
+        # Again, as the queue may have filled while the upload was read; no await between
+        # admit() and submit(), so the submit cannot be rejected
+        try:
+            _admit()
+        except HTTPException:
+            spooled.unlink()
+            raise
+        if not session_id or not session_store.session_exists(session_id):
+            session_id = session_store.create_session([])
+        session_store.update_session_status(session_id, "queued")
+        job_queue.submit(
+            partial(_transcription_job, session_id, spooled, keywords),
+            discard=partial(_discard_job, session_id, spooled),
+        )
+        return JSONResponse(
+            status_code=202,
+            content=UploadAudioJobResponse(session_id=session_id, status="queued").model_dump(),
+        )
     try:
         try:
-            transcript, _, words, segments = await asr_service.transcribe_audio(tmp_path, keywords=keywords)
+            (transcript, confidence, words, segments), cached = await _transcribe(spooled, keywords)
         except ValueError as e:
             raise HTTPException(503, detail=str(e))  # e.g. missing DEEPGRAM_API_KEY
         if session_id:
-            session_store.update_session_transcript(session_id, transcript)
+            session_store.update_session_transcript(session_id, transcript, segments)
         else:
             session_id = session_store.create_session([])
-            session_store.update_session_transcript(session_id, transcript)
+            session_store.update_session_transcript(session_id, transcript, segments)
+        spans = keyword_matcher.match_segments(keyword_matcher.get_matcher(keywords), segments)
+        for seg_spans in spans:
+            keyword_matcher.record_hits(session_id, seg_spans)
+        if response_format == "compact":
+            # Columnar and serialized directly: no per-word models, words not repeated in segments
+            body = {"session_id": session_id, "cached": cached, **to_columns(transcript, confidence, segments, spans)}
+            return Response(content=dumps(body), media_type="application/json")
         timed_words = [TimedWord(word=w["word"], start=w["start"], end=w["end"]) for w in words]
         timed_segments = [
-            TimedSegment(transcript=s["transcript"], words=[TimedWord(word=w["word"], start=w["start"], end=w["end"]) for w in s["words"]])
-            for s in segments
+            TimedSegment(
+                transcript=s["transcript"],
+                words=[TimedWord(word=w["word"], start=w["start"], end=w["end"]) for w in s["words"]],
+                spans=[KeywordSpan(**span) for span in seg_spans],
+            )
+            for s, seg_spans in zip(segments, spans)
         ]
-        return UploadAudioResponse(transcript=transcript, session_id=session_id, words=timed_words, segments=timed_segments)
+        return UploadAudioResponse(
+            transcript=transcript, session_id=session_id, words=timed_words, segments=timed_segments, cached=cached
+        )
     finally:
-        tmp_path.unlink(missing_ok=True)
+        spooled.unlink()
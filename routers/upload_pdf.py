@@ -1,46 +1,108 @@
 """Phase 2: POST /upload — PDF ingestion pipeline (API contract)."""
 
-import tempfile
+from functools import partial
 from pathlib import Path
+from typing import AsyncIterator
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 import config
-from services import pdf_service, session_store
-from services.keywords_gemini import extract_keywords_gemini
+from services import keywords_gemini, live_pool, pdf_pipeline, session_store
+from services.upload_ingest import multipart_body, receive_upload, require_suffix
 
 router = APIRouter(tags=["upload"])
 
 
-def _get_keywords_from_pdf(tmp_path: Path) -> list:
-    """Use Gemini if enabled and key set, else spaCy. Fallback to spaCy if Gemini returns empty."""
-    text = pdf_service.extract_text_from_pdf(tmp_path)
-    if config.USE_GEMINI_KEYWORDS and config.GEMINI_API_KEY:
-        keywords = extract_keywords_gemini(text, max_keywords=config.MAX_KEYWORDS)
-        if keywords:
-            return keywords
-    return pdf_service.extract_keywords(text, top_n=config.MAX_KEYWORDS)
+def _use_gemini() -> bool:
+    return keywords_gemini.is_configured()
 
 
-@router.post("/upload")
-async def upload(
-    file: UploadFile = File(..., description="PDF file (field name: file or pdf)"),
-):
+def _store_keywords(event: dict, doc_hash: str, session_id: str | None) -> tuple[str, list]:
     """
-    Accept a PDF upload (multipart/form-data), extract text, identify technical
-    vocabulary via NLP, store keywords in memory under a new session_id.
-    Uses Gemini when USE_GEMINI_KEYWORDS=true and GEMINI_API_KEY is set; otherwise spaCy.
-    Returns session_id, keywords, and status per API contract.
+    Create a session from the pipeline's final event, or merge the document into session_id
+    in one session write (a document already in the session is not counted twice). Once the
+    keywords are stored, a Deepgram live connection biased with them is pre-warmed for /listen.
     """
-    if not file.filename or not file.filename.lower().endswith(".pdf"):
-        raise HTTPException(400, detail="Expected a PDF file")
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = Path(tmp.name)
+    if session_id is None:
+        session_id = session_store.create_session(
+            event["keywords"], event["counts"], event["source"], doc_hash=doc_hash
+        )
+        live_pool.prewarm_session(session_id)
+        return session_id, event["keywords"]
+    keywords = session_store.add_session_document(
+        session_id, doc_hash, partial(pdf_pipeline.merge_document, event=event, top_n=config.MAX_KEYWORDS)
+    )
+    if keywords is None:
+        raise HTTPException(404, detail="Session not found")
+    live_pool.prewarm_session(session_id)
+    return session_id, keywords
+
+
+async def _get_keywords_from_pdf(tmp_path: Path, doc_hash: str) -> dict:
+    """Use Gemini if enabled and key set, else spaCy. Fallback to spaCy if Gemini returns empty."""
+    final: dict = {}
+    async for event in pdf_pipeline.run_keyword_pipeline(
+        tmp_path, top_n=config.MAX_KEYWORDS, use_gemini=_use_gemini(), doc_hash=doc_hash
+    ):
+        if event["event"] == "keywords":
+            final = event
+    return final
+
+
+async def _stream_upload(
+    tmp_path: Path, doc_hash: str, fmt: str, session_id: str | None
+) -> AsyncIterator[str]:
+    """Partial keyword rankings as pages finish, then the session (temp file removed at the end)."""
+    try:
+        async for event in pdf_pipeline.run_keyword_pipeline(
+            tmp_path, top_n=config.MAX_KEYWORDS, use_gemini=_use_gemini(), doc_hash=doc_hash
+        ):
+            if event["event"] == "partial":
+                yield pdf_pipeline.encode_event(event, fmt)
+                continue
+            try:
+                sid, keywords = _store_keywords(event, doc_hash, session_id)
+            except HTTPException as e:
+                yield pdf_pipeline.encode_event({"event": "error", "detail": e.detail}, fmt)
+                return
+            yield pdf_pipeline.encode_event(
+                {"event": "done", "session_id": sid, "keywords": keywords, "status": "ready"},
+                fmt,
+            )
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+_pdf_suffix = require_suffix((".pdf",), "Expected a PDF file")
+
+
+async def _handle_upload(request: Request, stream: str | None, session_id: str | None):
+    if stream is not None and stream not in pdf_pipeline.STREAM_MEDIA_TYPES:
+        raise HTTPException(400, detail="stream must be 'ndjson' or 'sse'")
+    received = await receive_upload(request, config.MAX_PDF_MB, _pdf_suffix, kind="PDF", file_fields=("file", "pdf"))
+    spooled = received.spooled
+    tmp_path, doc_hash = spooled.path, spooled.sha256
+    if session_id is not None:
+        # A document the session already has needs no processing
+        sess = session_store.get_session(session_id)
+        if sess is None or doc_hash in (sess.get("documents") or []):
+            spooled.unlink()
+            if sess is None:
+                raise HTTPException(404, detail="Session not found")
+            result = {"session_id": session_id, "keywords": list(sess.get("keywords") or []), "status": "ready"}
+            if stream:
+                done = pdf_pipeline.encode_event({"event": "done", **result}, stream)
+                return StreamingResponse(iter([done]), media_type=pdf_pipeline.STREAM_MEDIA_TYPES[stream])
+            return result
+    if stream:
+        return StreamingResponse(
+            _stream_upload(tmp_path, doc_hash, stream, session_id),
+            media_type=pdf_pipeline.STREAM_MEDIA_TYPES[stream],
+        )
     try:
-        keywords = _get_keywords_from_pdf(tmp_path)
-        session_id = session_store.create_session(keywords)
+        event = await _get_keywords_from_pdf(tmp_path, doc_hash)
+        session_id, keywords = _store_keywords(event, doc_hash, session_id)
         return {
             "session_id": session_id,
             "keywords": keywords,
@@ -48,3 +110,35 @@ async def upload(
         }
     finally:
         tmp_path.unlink(missing_ok=True)
+
+
+@router.post("/upload", openapi_extra=multipart_body("PDF file (field name: file or pdf)"))
+async def upload(
+    request: Request,
+    stream: str | None = Query(None, description="Stream progress as 'ndjson' or 'sse'"),
+):
+    """
+    Accept a PDF upload (multipart/form-data), extract text, identify technical
+    vocabulary via NLP, store keywords in memory under a new session_id.
+    Uses Gemini when USE_GEMINI_KEYWORDS=true and GEMINI_API_KEY is set; otherwise spaCy.
+    Returns session_id, keywords, and status per API contract.
+    With ?stream=ndjson|sse, sends partial keyword rankings as pages are processed and
+    ends with a "done" event carrying session_id, keywords and status.
+    """
+    return await _handle_upload(request, stream, None)
+
+
+@router.post("/upload/{session_id}", openapi_extra=multipart_body("PDF file to add to the session"))
+async def upload_to_session(
+    session_id: str,
+    request: Request,
+    stream: str | None = Query(None, description="Stream progress as 'ndjson' or 'sse'"),
+):
+    """
+    Add a PDF to an existing session. Only the new document is processed; its term counts
+    are merged into the session's and the top keywords are recomputed from the merged counts.
+    Same response (and streaming mode) as POST /upload.
+    """
+    if not session_store.session_exists(session_id):
+        raise HTTPException(404, detail="Session not found")
+    return await _handle_upload(request, stream, session_id.strip())
@@ -19,9 +19,16 @@ class TimedWord(BaseModel):
     end: float
 
 
+class KeywordSpan(BaseModel):
+    start: int = Field(..., description="Character offset in the text")
+    end: int = Field(..., description="Character offset just past the keyword")
+    keyword: str = Field(..., description="Session keyword as listed")
+
+
 class TimedSegment(BaseModel):
     transcript: str
     words: list[TimedWord] = Field(default_factory=list)
+    spans: list[KeywordSpan] = Field(default_factory=list, description="Keywords found in transcript")
 
 
 class UploadAudioResponse(BaseModel):
@@ -29,6 +36,12 @@ class UploadAudioResponse(BaseModel):
     session_id: str
     words: list[TimedWord] = Field(default_factory=list, description="Word-level timestamps for sync-with-playback")
     segments: list[TimedSegment] = Field(default_factory=list, description="Utterance segments with punctuation")
+    cached: bool = Field(False, description="True if served from the transcript cache")
+
+
+class UploadAudioJobResponse(BaseModel):
+    session_id: str
+    status: str = Field(..., description="queued; poll GET /session/{session_id} for progress")
 
 
 # --- Session ---
@@ -36,6 +49,9 @@ class SessionResponse(BaseModel):
     session_id: str
     keywords: list[str] = Field(default_factory=list)
     transcript: Optional[str] = None
-    status: str = Field(..., description="e.g. created, transcript_ready, done")
+    segments: list[TimedSegment] = Field(default_factory=list, description="Timed segments once transcribed")
+    keyword_hits: dict[str, int] = Field(default_factory=dict, description="Keyword -> times heard, most first")
+    status: str = Field(..., description="e.g. created, queued, transcribing, transcript_ready, failed")
+    error: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Load-test caption broadcast: one presenter on /listen, many viewers on /listen/view.
+Run from project root:  python scripts/bench_broadcast.py --pdf path/to/syllabus.pdf --viewers 50,200,500
+
+For each viewer count, opens that many viewer sockets on one session, streams audio on the
+presenter socket at real-time pace, and reports per-message fan-out latency: the time from
+the presenter receiving a caption to each viewer receiving the same caption (p50/p95/max).
+A flat p95 as viewers grow means each caption is serialized once and slow viewers don't
+stall the rest. Without --audio a synthetic tone is sent, which only produces captions from
+a stand-in server (see DEEPGRAM_BASE_URL). Run against a single worker.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+
+import httpx
+import websockets
+
+from bench_first_caption import FRAME_SAMPLES, SAMPLE_RATE, load_frames
+
+
+def _key(msg: dict) -> tuple:
+    return (msg.get("seq"), msg.get("is_final"), msg.get("text"))
+
+
+async def viewer(url: str, arrivals: list[tuple[tuple, float]], ready: asyncio.Event, done: asyncio.Event) -> None:
+    async with websockets.connect(url, max_queue=None) as ws:
+        ready.set()
+        while not done.is_set():
+            try:
+                raw = await asyncio.wait_for(ws.recv(), 0.5)
+            except asyncio.TimeoutError:
+                continue
+            arrivals.append((_key(json.loads(raw)), time.perf_counter()))
+
+
+async def one_round(base_ws: str, session_id: str, n_viewers: int, frames: list[bytes], settle: float) -> dict:
+    done = asyncio.Event()
+    arrivals: list[list[tuple[tuple, float]]] = [[] for _ in range(n_viewers)]
+    readies = [asyncio.Event() for _ in range(n_viewers)]
+    tasks = [
+        asyncio.create_task(viewer(f"{base_ws}/listen/view?session_id={session_id}", arrivals[i], readies[i], done))
+        for i in range(n_viewers)
+    ]
+    await asyncio.gather(*(r.wait() for r in readies))
+
+    sent_at: dict[tuple, float] = {}
+    async with websockets.connect(f"{base_ws}/listen?session_id={session_id}&role=presenter") as presenter:
+
+        async def pump() -> None:
+            for frame in frames:
+                await presenter.send(frame)
+                await asyncio.sleep(FRAME_SAMPLES / SAMPLE_RATE)
+
+        sender = asyncio.create_task(pump())
+        try:
+            while True:
+                raw = await asyncio.wait_for(presenter.recv(), settle)
+                sent_at.setdefault(_key(json.loads(raw)), time.perf_counter())
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            pass
+        finally:
+            sender.cancel()
+    done.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies = [
+        (t - sent_at[key]) * 1000 for per_viewer in arrivals for key, t in per_viewer if key in sent_at
+    ]
+    latencies.sort()
+    return {
+        "viewers": n_viewers,
+        "captions": len(sent_at),
+        "deliveries": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2) if latencies else None,
+        "max_ms": round(latencies[-1], 2) if latencies else None,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    base = args.base_url.rstrip("/")
+    session_id = args.session_id
+    if session_id is None:
+        with open(args.pdf, "rb") as f:
+            r = httpx.post(f"{base}/upload", files={"file": (Path(args.pdf).name, f, "application/pdf")}, timeout=120)
+        r.raise_for_status()
+        session_id = r.json()["session_id"]
+    base_ws = base.replace("http", "ws", 1)
+    frames = load_frames(Path(args.audio) if args.audio else None, args.seconds)
+    rounds = []
+    for n in (int(v) for v in args.viewers.split(",")):
+        rounds.append(await one_round(base_ws, session_id, n, frames, args.settle))
+    broadcast = httpx.get(f"{base}/listen/stats").json().get("broadcast")
+    return {"rounds": rounds, "server_broadcast": broadcast}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pdf", help="PDF to upload to create the session")
+    source.add_argument("--session-id", help="Existing session to broadcast")
+    parser.add_argument("--audio", help="16-bit mono 48 kHz WAV for the presenter to stream")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of the synthetic tone")
+    parser.add_argument("--viewers", default="10,100,300", help="Comma-separated viewer counts")
+    parser.add_argument("--settle", type=float, default=3.0, help="Seconds without captions that end a round")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
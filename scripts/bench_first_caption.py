@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Measure time-to-first-caption on /listen against a running server.
+Run from project root:  python scripts/bench_first_caption.py --pdf path/to/syllabus.pdf [--audio speech.wav]
+
+Uploads the PDF once (so the server pre-warms a Deepgram connection for the session), then
+opens /listen --runs times, streaming audio at real-time pace in 4096-sample frames like the
+browser, and reports the time from starting the WebSocket handshake to the first caption.
+--audio must be 16-bit mono WAV (48 kHz to match the browser); without it a synthetic tone is
+sent, which only produces captions from a stand-in server (see DEEPGRAM_BASE_URL).
+Compare a server started with LIVE_POOL_MAX_IDLE=0 (cold) against the default (warm).
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import wave
+from pathlib import Path
+
+import httpx
+import numpy as np
+import websockets
+
+FRAME_SAMPLES = 4096
+SAMPLE_RATE = 48000
+
+
+def load_frames(audio: Path | None, seconds: float = 10.0) -> list[bytes]:
+    if audio is None:
+        t = np.arange(int(SAMPLE_RATE * seconds))
+        pcm = (np.sin(2 * np.pi * 220 * t / SAMPLE_RATE) * 3000).astype("<i2").tobytes()
+    else:
+        with wave.open(str(audio), "rb") as w:
+            if w.getsampwidth() != 2 or w.getnchannels() != 1:
+                raise SystemExit("--audio must be 16-bit mono WAV")
+            pcm = w.readframes(w.getnframes())
+    step = FRAME_SAMPLES * 2
+    return [pcm[i : i + step] for i in range(0, len(pcm), step)]
+
+
+async def first_caption(ws_url: str, frames: list[bytes], timeout: float) -> float | None:
+    t0 = time.perf_counter()
+    async with websockets.connect(ws_url) as ws:
+
+        async def pump() -> None:
+            for frame in frames:
+                await ws.send(frame)
+                await asyncio.sleep(FRAME_SAMPLES / SAMPLE_RATE)
+
+        sender = asyncio.create_task(pump())
+        try:
+            while True:
+                msg = json.loads(await asyncio.wait_for(ws.recv(), timeout))
+                if msg.get("text"):
+                    return time.perf_counter() - t0
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            sender.cancel()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    base = args.base_url.rstrip("/")
+    session_id = args.session_id
+    if session_id is None:
+        with open(args.pdf, "rb") as f:
+            r = httpx.post(f"{base}/upload", files={"file": (Path(args.pdf).name, f, "application/pdf")}, timeout=120)
+        r.raise_for_status()
+        session_id = r.json()["session_id"]
+    ws_url = base.replace("http", "ws", 1) + f"/listen?session_id={session_id}"
+    frames = load_frames(Path(args.audio) if args.audio else None)
+    samples = []
+    for _ in range(args.runs):
+        # Give the server time to open a replacement idle connection
+        await asyncio.sleep(args.pause)
+        seconds = await first_caption(ws_url, frames, args.timeout)
+        if seconds is not None:
+            samples.append(seconds)
+    upstream = httpx.get(f"{base}/listen/stats").json().get("upstream")
+    return {
+        "runs": args.runs,
+        "captioned": len(samples),
+        "p50_ms": round(statistics.median(samples) * 1000, 1) if samples else None,
+        "min_ms": round(min(samples) * 1000, 1) if samples else None,
+        "max_ms": round(max(samples) * 1000, 1) if samples else None,
+        "server_upstream": upstream,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pdf", help="PDF to upload to create the session")
+    source.add_argument("--session-id", help="Existing session to listen with")
+    parser.add_argument("--audio", help="16-bit mono 48 kHz WAV to stream")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--pause", type=float, default=1.0, help="Seconds between connections")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark keyword extraction: full en_core_web_sm pipeline over the whole document
+(the original extract_keywords) vs the lean batched keyword engine.
+Run from project root:  python scripts/bench_keywords.py path/to/deck.pdf [more.pdf ...]
+
+Reports tokens/sec for both and whether the top-N rankings are identical.
+"""
+
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+import spacy
+
+import config
+from services import keyword_engine, pdf_service
+
+
+def _baseline_counts(nlp: spacy.Language, text: str) -> tuple[Counter, int]:
+    """The original single-call implementation (full pipeline, one Doc)."""
+    nlp.max_length = max(nlp.max_length, len(text) + 1)
+    doc = nlp(text)
+    counts: Counter[str] = Counter()
+    for token in doc:
+        if token.pos_ not in ("NOUN", "PROPN"):
+            continue
+        word = token.text.strip().lower()
+        if len(word) < 5 or not word.isalpha() or word in pdf_service.FILLER_TERMS:
+            continue
+        counts[word] += 1
+    return counts, len(doc)
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/bench_keywords.py <path_to.pdf> [...]")
+        sys.exit(1)
+
+    full_nlp = spacy.load(keyword_engine.MODEL_NAME)
+    keyword_engine.get_nlp()
+    top_n = config.MAX_KEYWORDS
+
+    for arg in sys.argv[1:]:
+        pdf_path = Path(arg)
+        pages = pdf_service.extract_page_texts(pdf_path)
+        text = " ".join(pages)
+        n_tokens = len(full_nlp.tokenizer(text))
+        print(f"{pdf_path.name}: {len(pages)} pages, {len(text)} chars, {n_tokens} tokens")
+
+        t0 = time.perf_counter()
+        base_counts, _ = _baseline_counts(full_nlp, text)
+        base_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        lean_counts = keyword_engine.count_keywords(pages, filler_terms=pdf_service.FILLER_TERMS)
+        lean_s = time.perf_counter() - t0
+
+        base_top = pdf_service.rank_keywords(base_counts, top_n=top_n)
+        lean_top = pdf_service.rank_keywords(lean_counts, top_n=top_n)
+        print(f"  baseline: {base_s:.3f}s  {n_tokens / base_s:,.0f} tokens/s")
+        print(f"  engine:   {lean_s:.3f}s  {n_tokens / lean_s:,.0f} tokens/s  ({base_s / lean_s:.1f}x)")
+        if base_top == lean_top:
+            print(f"  top-{top_n}: identical")
+        else:
+            overlap = len(set(base_top) & set(lean_top))
+            print(f"  top-{top_n}: DIFFERENT (overlap {overlap}/{len(base_top)})")
+            print("    baseline:", base_top)
+            print("    engine:  ", lean_top)
+
+
+if __name__ == "__main__":
+    main()
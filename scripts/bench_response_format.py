@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare /upload-audio response formats on a synthetic lecture transcript.
+Run from project root:  python scripts/bench_response_format.py [--words 30000] [--repeat 5]
+
+"full" reproduces the default path (TimedWord/TimedSegment models, response_model
+validation, JSON encoding); "compact" is the ?format=compact path (to_columns + dumps).
+Prints payload bytes and best-of-N build+serialize time for each, as JSON.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+from schemas import TimedSegment, TimedWord, UploadAudioResponse  # noqa: E402
+from services import transcript_columns  # noqa: E402
+
+_VOCAB = "the eigenvalue of a matrix is defined by its characteristic polynomial and determinant".split()
+
+
+def synthetic_segments(n_words: int, words_per_segment: int = 12) -> list[dict]:
+    rng = random.Random(0)
+    segments, t = [], 0.0
+    for first in range(0, n_words, words_per_segment):
+        words = []
+        for _ in range(min(words_per_segment, n_words - first)):
+            end = t + rng.uniform(0.15, 0.6)
+            words.append({"word": rng.choice(_VOCAB), "start": round(t, 2), "end": round(end, 2)})
+            t = end + rng.uniform(0.0, 0.2)
+        segments.append({"transcript": " ".join(w["word"] for w in words) + ".", "words": words})
+    return segments
+
+
+def full(transcript: str, words: list[dict], segments: list[dict]) -> bytes:
+    timed_words = [TimedWord(word=w["word"], start=w["start"], end=w["end"]) for w in words]
+    timed_segments = [
+        TimedSegment(transcript=s["transcript"], words=[TimedWord(word=w["word"], start=w["start"], end=w["end"]) for w in s["words"]])
+        for s in segments
+    ]
+    response = UploadAudioResponse(transcript=transcript, session_id="x", words=timed_words, segments=timed_segments)
+    # FastAPI re-validates against response_model, dumps to JSON-able data, then json.dumps
+    validated = UploadAudioResponse.model_validate(response.model_dump())
+    return json.dumps(validated.model_dump(mode="json")).encode("utf-8")
+
+
+def compact(transcript: str, words: list[dict], segments: list[dict]) -> bytes:
+    body = {"session_id": "x", "cached": False, **transcript_columns.to_columns(transcript, 0.9, segments)}
+    return transcript_columns.dumps(body)
+
+
+def best_of(fn, repeat: int, *args) -> tuple[float, bytes]:
+    best, out = float("inf"), b""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=30000, help="Words in the synthetic transcript (~3h lecture)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    segments = synthetic_segments(args.words)
+    words = [w for s in segments for w in s["words"]]
+    transcript = " ".join(s["transcript"] for s in segments)
+
+    report = {"words": len(words), "segments": len(segments), "orjson": transcript_columns.orjson is not None}
+    for name, fn in (("full", full), ("compact", compact)):
+        seconds, payload = best_of(fn, args.repeat, transcript, words, segments)
+        report[name] = {"ms": round(seconds * 1000, 2), "bytes": len(payload)}
+    report["speedup"] = round(report["full"]["ms"] / report["compact"]["ms"], 2)
+    report["size_ratio"] = round(report["compact"]["bytes"] / report["full"]["bytes"], 3)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Measure worker startup and first-request latency.
+Run from project root:  python scripts/bench_startup.py [path/to/sample.pdf]
+
+Reports, as JSON:
+  - import_seconds: time to `import main` in a fresh interpreter, and which heavy modules it pulled in
+  - ready_seconds: time from launching uvicorn until GET /ready returns 200
+  - first/second POST /upload latency (if a PDF is given)
+Run with different WARMUP_ENGINES values to compare lazy vs preloaded workers.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+_project_root = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("spacy", "fitz", "deepgram", "google.genai")
+
+_IMPORT_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import main
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE],
+        cwd=_project_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_server(pdf_path: Path | None) -> dict:
+    import httpx
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=_project_root,
+        env=os.environ.copy(),
+    )
+    result: dict = {}
+    try:
+        with httpx.Client(timeout=120) as client:
+            while True:
+                try:
+                    r = client.get(f"{base}/ready")
+                    if r.status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if proc.poll() is not None:
+                    raise RuntimeError("uvicorn exited during startup")
+                time.sleep(0.05)
+            result["ready_seconds"] = time.perf_counter() - t0
+            result["ready"] = r.json()
+
+            if pdf_path is not None:
+                for label in ("first_upload_seconds", "second_upload_seconds"):
+                    t1 = time.perf_counter()
+                    with open(pdf_path, "rb") as f:
+                        r = client.post(f"{base}/upload", files={"file": (pdf_path.name, f, "application/pdf")})
+                    r.raise_for_status()
+                    result[label] = time.perf_counter() - t1
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return result
+
+
+def main() -> None:
+    pdf_path = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    report = {
+        "warmup_engines": os.getenv("WARMUP_ENGINES", "(default)"),
+        "import": measure_import(),
+        "server": measure_server(pdf_path),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,7 @@ if str(_project_root) not in sys.path:
 
 import config
 from services import pdf_service
-from services.keywords_gemini import extract_keywords_gemini, get_last_error
+from services.keywords_gemini import extract_keywords_gemini, get_stats
 
 
 def main() -> None:
@@ -66,11 +66,16 @@ def main() -> None:
             print(f"  Only in spaCy: {len(only_spacy)}")
             print(f"  Only in Gemini: {len(only_gemini)}")
         else:
-            err = get_last_error()
-            if err:
-                print(f"  (No keywords returned: {err})")
+            errors = {m: st["last_error"] for m, st in get_stats().items() if st["last_error"]}
+            if errors:
+                print("  (No keywords returned)")
+                for model_name, err in errors.items():
+                    print(f"    {model_name}: {err}")
             else:
                 print("  (No keywords returned; check API key and pip install google-genai)")
+        for model_name, st in get_stats().items():
+            print(f"  {model_name}: calls={st['calls']} ok={st['ok']} errors={st['errors']} "
+                  f"timeouts={st['timeouts']} avg_latency_ms={st['avg_latency_ms']}")
     else:
         print("--- Gemini ---")
         print("  Skipped (GEMINI_API_KEY not set). Add it to .env or api.env to compare.")
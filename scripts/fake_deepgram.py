@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Deepgram endpoints this service uses, for load tests without API credits.
+Run from project root:  python scripts/fake_deepgram.py --port 8200
+Then start the API with DEEPGRAM_API_KEY=<any 40 hex chars> DEEPGRAM_BASE_URL=http://127.0.0.1:8200/v1
+
+  POST /v1/listen       prerecorded: reads the whole body, waits, returns utterances with
+                        word timings spread over the audio's duration (WAV header, else size)
+  WebSocket /v1/listen  live (linear16): after each audio message an interim result for the
+                        utterance so far, a final every FAKE_DEEPGRAM_UTTERANCE_WORDS words,
+                        with start/duration in audio seconds; KeepAlive is ignored and
+                        CloseStream flushes the last final, sends Metadata and closes
+
+Behaviour (environment):
+  FAKE_DEEPGRAM_LATENCY_MS        prerecorded response delay (default 300)
+  FAKE_DEEPGRAM_LIVE_LATENCY_MS   delay before each live result is sent (default 50)
+  FAKE_DEEPGRAM_CONNECT_MS        delay before accepting a live connection (default 0)
+  FAKE_DEEPGRAM_WORDS_PER_SEC     speaking rate the words are laid out at (default 2.5)
+  FAKE_DEEPGRAM_UTTERANCE_WORDS   words per utterance / live final (default 12)
+  FAKE_DEEPGRAM_SCRIPT            text file whose words are "recognized", repeated as needed;
+                                  default: a fluid-dynamics lecture with misheard jargon
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+
+DEFAULT_SCRIPT = (
+    "today we derive the navy stock equations for an incompressible fluid "
+    "the Reynolds number tells us when the flow becomes turbulent "
+    "taking the furrier transform of the velocity field separates the scales "
+    "the pressure term acts like a Lagrange multiplier enforcing the divergence free condition "
+    "boundary layers form near the wall where viscosity dominates "
+    "and Bernoulli's principle only holds along a streamline in inviscid flow"
+)
+
+app = FastAPI(title="Fake Deepgram")
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _script_words() -> list[str]:
+    path = os.getenv("FAKE_DEEPGRAM_SCRIPT")
+    text = Path(path).read_text(encoding="utf-8") if path else DEFAULT_SCRIPT
+    return text.split() or ["hello"]
+
+
+def _word_at(words: list[str], index: int) -> str:
+    return words[index % len(words)]
+
+
+def _audio_seconds(body: bytes) -> float:
+    """Duration from a WAV header when there is one; otherwise assume 128 kbit/s compressed audio."""
+    if body[:4] == b"RIFF" and body[8:12] == b"WAVE":
+        pos = 12
+        byte_rate = 0
+        while pos + 8 <= len(body):
+            chunk_id, size = body[pos : pos + 4], int.from_bytes(body[pos + 4 : pos + 8], "little")
+            if chunk_id == b"fmt ":
+                byte_rate = int.from_bytes(body[pos + 16 : pos + 20], "little")
+            elif chunk_id == b"data" and byte_rate:
+                return min(size, len(body) - pos - 8) / byte_rate
+            pos += 8 + size + (size & 1)
+    return len(body) / 16000
+
+
+def _utterances(duration: float) -> tuple[list[dict], list[dict]]:
+    script = _script_words()
+    rate = _env_float("FAKE_DEEPGRAM_WORDS_PER_SEC", 2.5)
+    per_utterance = max(1, int(_env_float("FAKE_DEEPGRAM_UTTERANCE_WORDS", 12)))
+    n_words = max(1, int(duration * rate))
+    words = [
+        {
+            "word": _word_at(script, i).lower().strip(".,"),
+            "punctuated_word": _word_at(script, i),
+            "start": round(i / rate, 3),
+            "end": round((i + 0.8) / rate, 3),
+            "confidence": 0.95,
+        }
+        for i in range(n_words)
+    ]
+    utterances = [
+        {
+            "start": chunk[0]["start"],
+            "end": chunk[-1]["end"],
+            "confidence": 0.95,
+            "transcript": " ".join(w["punctuated_word"] for w in chunk),
+            "words": chunk,
+        }
+        for chunk in (words[i : i + per_utterance] for i in range(0, n_words, per_utterance))
+    ]
+    return words, utterances
+
+
+@app.post("/v1/listen")
+async def prerecorded(request: Request):
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+    await asyncio.sleep(_env_float("FAKE_DEEPGRAM_LATENCY_MS", 300) / 1000)
+    words, utterances = _utterances(_audio_seconds(bytes(body)))
+    transcript = " ".join(u["transcript"] for u in utterances)
+    return {
+        "metadata": {"sha256": hashlib.sha256(body).hexdigest(), "duration": words[-1]["end"]},
+        "results": {
+            "channels": [{"alternatives": [{"transcript": transcript, "confidence": 0.95, "words": words}]}],
+            "utterances": utterances,
+        },
+    }
+
+
+def _live_result(words: list[str], start: float, end: float, is_final: bool) -> str:
+    return json.dumps(
+        {
+            "type": "Results",
+            "is_final": is_final,
+            "speech_final": is_final,
+            "start": round(start, 3),
+            "duration": round(end - start, 3),
+            "channel": {"alternatives": [{"transcript": " ".join(words), "confidence": 0.95}]},
+        }
+    )
+
+
+@app.websocket("/v1/listen")
+async def live(websocket: WebSocket):
+    await asyncio.sleep(_env_float("FAKE_DEEPGRAM_CONNECT_MS", 0) / 1000)
+    await websocket.accept()
+    sample_rate = int(websocket.query_params.get("sample_rate", "16000"))
+    latency = _env_float("FAKE_DEEPGRAM_LIVE_LATENCY_MS", 50) / 1000
+    rate = _env_float("FAKE_DEEPGRAM_WORDS_PER_SEC", 2.5)
+    per_utterance = max(1, int(_env_float("FAKE_DEEPGRAM_UTTERANCE_WORDS", 12)))
+    script = _script_words()
+    # Results are sent in order, each no earlier than `latency` after its audio arrived
+    outbox: asyncio.Queue = asyncio.Queue()
+
+    async def sender() -> None:
+        while True:
+            due, text = await outbox.get()
+            if text is None:
+                return
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await websocket.send_text(text)
+
+    sending = asyncio.create_task(sender())
+    audio_bytes = 0
+    utterance_start = 0.0
+    word_index = 0  # first word of the current utterance
+    try:
+        while True:
+            msg = await websocket.receive()
+            if msg["type"] == "websocket.disconnect":
+                break
+            now = time.monotonic()
+            if msg.get("bytes"):
+                audio_bytes += len(msg["bytes"])
+                heard_until = audio_bytes / (2 * sample_rate)
+                spoken = int(heard_until * rate) - word_index
+                while spoken >= per_utterance:
+                    utterance = [_word_at(script, word_index + i) for i in range(per_utterance)]
+                    end = (word_index + per_utterance) / rate
+                    outbox.put_nowait((now + latency, _live_result(utterance, utterance_start, end, True)))
+                    word_index += per_utterance
+                    utterance_start = end
+                    spoken -= per_utterance
+                if spoken > 0:
+                    partial = [_word_at(script, word_index + i) for i in range(spoken)]
+                    outbox.put_nowait((now + latency, _live_result(partial, utterance_start, heard_until, False)))
+            elif msg.get("text"):
+                if json.loads(msg["text"]).get("type") != "CloseStream":
+                    continue  # KeepAlive, Configure
+                heard_until = audio_bytes / (2 * sample_rate)
+                spoken = int(heard_until * rate) - word_index
+                if spoken > 0:
+                    rest = [_word_at(script, word_index + i) for i in range(spoken)]
+                    outbox.put_nowait((now + latency, _live_result(rest, utterance_start, heard_until, True)))
+                metadata = {"type": "Metadata", "sha256": hashlib.sha256(str(audio_bytes).encode()).hexdigest(), "duration": heard_until}
+                outbox.put_nowait((now + latency, json.dumps(metadata)))
+                outbox.put_nowait((now, None))
+                await sending
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sending.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
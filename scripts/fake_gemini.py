@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini generateContent endpoint, for testing hedging and budgets
+without API credits.
+Run from project root:  python scripts/fake_gemini.py --port 8100
+Then start the API with GEMINI_API_KEY=fake GEMINI_BASE_URL=http://127.0.0.1:8100
+
+Per-model behaviour (comma-separated model=value lists):
+  FAKE_GEMINI_LATENCY_MS  e.g. "gemini-2.5-flash=6000,default=300"
+  FAKE_GEMINI_FAIL        e.g. "gemini-2.0-flash" (these models return HTTP 500)
+  FAKE_GEMINI_KEYWORDS    fixed JSON array to return; default: frequent long words from the prompt
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+
+app = FastAPI(title="Fake Gemini")
+
+
+def _per_model(env: str) -> dict[str, str]:
+    out = {}
+    for item in os.getenv(env, "").split(","):
+        if "=" in item:
+            k, v = item.split("=", 1)
+            out[k.strip()] = v.strip()
+        elif item.strip():
+            out[item.strip()] = ""
+    return out
+
+
+def _keywords_from_prompt(prompt: str, limit: int) -> list[str]:
+    body = prompt.split("---", 1)[-1]
+    words = re.findall(r"[a-z]{6,}", body.lower())
+    return [w for w, _ in Counter(words).most_common(limit)]
+
+
+@app.post("/{api_version}/models/{model_action}")
+async def generate_content(api_version: str, model_action: str, request: Request):
+    model_name = model_action.split(":", 1)[0]
+    latency = _per_model("FAKE_GEMINI_LATENCY_MS")
+    delay_ms = float(latency.get(model_name, latency.get("default", "200")))
+    await asyncio.sleep(delay_ms / 1000)
+    if model_name in _per_model("FAKE_GEMINI_FAIL"):
+        raise HTTPException(500, detail=f"{model_name} unavailable (fake)")
+
+    payload = await request.json()
+    prompt = "".join(
+        part.get("text", "")
+        for content in payload.get("contents", [])
+        for part in content.get("parts", [])
+    )
+    fixed = os.getenv("FAKE_GEMINI_KEYWORDS")
+    keywords = json.loads(fixed) if fixed else _keywords_from_prompt(prompt, 20)
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": json.dumps(keywords)}]},
+                "finishReason": "STOP",
+            }
+        ],
+        "modelVersion": model_name,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
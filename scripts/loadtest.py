@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test that runs offline against the Deepgram stand-in.
+Run from project root:
+  python scripts/loadtest.py --listen 20 --uploads 4 --transcribes 2 --pdfs 1 --pdf syllabus.pdf --duration 30
+
+Unless --base-url is given, starts scripts/fake_deepgram.py and the API (uvicorn main:app
+--workers N) on free ports, pointed at each other. Then, for --duration seconds, at once:
+  listen      --listen sockets each replay 16-bit PCM (--audio mono WAV at 48 kHz, else a tone)
+              at real-time pace; each socket gets its own session when --pdf is given
+  upload      --uploads closed-loop clients POST /upload-audio with a WAV
+  transcribe  --transcribes closed-loop clients POST /transcribe with the same audio as .mp3
+  pdf         --pdfs closed-loop clients POST /upload with --pdf
+Uploaded audio gets a few random bytes per request, and PDFs a trailing comment, so the
+transcript and keyword caches never answer. The spawned API inherits this environment: set
+GEMINI_BASE_URL to a running scripts/fake_gemini.py (or USE_GEMINI_KEYWORDS=false) to stay offline.
+
+Live latency is audio-in to caption-out for finals: the stand-in emits utterance k's final
+once audio up to (k + 1) * words / rate seconds has arrived, so it is measured from the moment
+the client had sent that much audio (--words-per-sec / --utterance-words must match the
+stand-in's settings when --base-url is used).
+
+Prints JSON: per scenario count, errors, p50/p95/p99 ms and per-second throughput; peak RSS
+per server process (spawned servers on Linux); and the git commit, so two versions' runs
+can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import wave
+from bisect import bisect_left
+from pathlib import Path
+
+import httpx
+import numpy as np
+import websockets
+
+_project_root = Path(__file__).resolve().parent.parent
+FRAME_SAMPLES = 4096
+SAMPLE_RATE = 48000
+FAKE_API_KEY = "0" * 40
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_project_root, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def load_pcm(audio: Path | None, seconds: float = 30.0) -> bytes:
+    """16-bit mono PCM at SAMPLE_RATE: the WAV's frames, or a quiet tone."""
+    if audio is None:
+        t = np.arange(int(SAMPLE_RATE * seconds))
+        return (np.sin(2 * np.pi * 220 * t / SAMPLE_RATE) * 3000).astype("<i2").tobytes()
+    with wave.open(str(audio), "rb") as w:
+        if w.getsampwidth() != 2 or w.getnchannels() != 1 or w.getframerate() != SAMPLE_RATE:
+            raise SystemExit(f"--audio must be 16-bit mono {SAMPLE_RATE} Hz WAV")
+        return w.readframes(w.getnframes())
+
+
+def wav_bytes(pcm: bytes, rate: int = SAMPLE_RATE) -> bytes:
+    header = (
+        b"RIFF" + (36 + len(pcm)).to_bytes(4, "little") + b"WAVEfmt "
+        + (16).to_bytes(4, "little") + (1).to_bytes(2, "little") + (1).to_bytes(2, "little")
+        + rate.to_bytes(4, "little") + (rate * 2).to_bytes(4, "little") + (2).to_bytes(2, "little")
+        + (16).to_bytes(2, "little") + b"data" + len(pcm).to_bytes(4, "little")
+    )
+    return header + pcm
+
+
+def _varied(payload: bytes) -> bytes:
+    """The same audio with its last 8 bytes randomized (distinct hash, same length)."""
+    return payload[:-8] + random.randbytes(8)
+
+
+def _varied_pdf(payload: bytes) -> bytes:
+    """The same PDF with a comment after %%EOF (readers ignore it; the content hash changes)."""
+    return payload + b"\n%" + random.randbytes(8).hex().encode() + b"\n"
+
+
+class Scenario:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latencies: list[float] = []
+        self.errors = 0
+        self.error_samples: list[str] = []
+
+    def error(self, detail: str) -> None:
+        self.errors += 1
+        if len(self.error_samples) < 5:
+            self.error_samples.append(detail[:200])
+
+    def report(self, seconds: float) -> dict:
+        values = sorted(self.latencies)
+
+        def pct(p: float) -> float | None:
+            if not values:
+                return None
+            return round(values[min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1)] * 1000, 1)
+
+        return {
+            "count": len(values),
+            "errors": self.errors,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "per_second": round(len(values) / seconds, 2) if seconds else None,
+            **({"error_samples": self.error_samples} if self.error_samples else {}),
+        }
+
+
+async def listen_client(
+    base_ws: str, session_id: str | None, pcm: bytes, deadline: float, args: argparse.Namespace, out: Scenario
+) -> None:
+    url = f"{base_ws}/listen" + (f"?session_id={session_id}" if session_id else "")
+    step = FRAME_SAMPLES * 2
+    frames = [pcm[i : i + step] for i in range(0, len(pcm), step)]
+    # Audio seconds sent so far and when, for mapping a final back to its audio
+    sent_offsets: list[float] = []
+    sent_times: list[float] = []
+    utterance_s = args.utterance_words / args.words_per_sec
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+
+            async def pump() -> None:
+                sent = 0
+                start = time.perf_counter()
+                i = 0
+                while time.perf_counter() < deadline:
+                    frame = frames[i % len(frames)]
+                    await ws.send(frame)
+                    sent += len(frame)
+                    sent_offsets.append(sent / (2 * SAMPLE_RATE))
+                    sent_times.append(time.perf_counter())
+                    i += 1
+                    # Real-time pace against the clock, not per-frame sleeps, so drift doesn't add up
+                    await asyncio.sleep(max(0.0, start + sent_offsets[-1] - time.perf_counter()))
+
+            sender = asyncio.create_task(pump())
+            finals = 0
+            try:
+                while not sender.done():
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(), 1.0)
+                    except asyncio.TimeoutError:
+                        continue
+                    msg = json.loads(raw)
+                    if not msg.get("is_final"):
+                        continue
+                    finals += 1
+                    k = bisect_left(sent_offsets, finals * utterance_s)
+                    if k < len(sent_times):
+                        out.latencies.append(time.perf_counter() - sent_times[k])
+            finally:
+                sender.cancel()
+    except (OSError, websockets.WebSocketException) as e:
+        out.error(f"listen: {e!r}")
+
+
+async def http_client(
+    client: httpx.AsyncClient, deadline: float, out: Scenario, make_request
+) -> None:
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            r = await make_request(client)
+        except httpx.HTTPError as e:
+            out.error(repr(e))
+            continue
+        if r.status_code >= 400:
+            out.error(f"{r.status_code} {r.text}")
+            continue
+        out.latencies.append(time.perf_counter() - t0)
+
+
+def _process_tree(pid: int) -> list[int]:
+    pids = [pid]
+    try:
+        children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    except OSError:
+        return pids
+    for child in children:
+        pids.extend(_process_tree(int(child)))
+    return pids
+
+
+def _rss_mb(pid: int) -> float | None:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def sample_rss(root_pid: int, deadline: float, peaks: dict[int, float]) -> None:
+    while time.perf_counter() < deadline:
+        for pid in _process_tree(root_pid):
+            rss = _rss_mb(pid)
+            if rss is not None:
+                peaks[pid] = max(peaks.get(pid, 0.0), rss)
+        await asyncio.sleep(1.0)
+
+
+async def run(args: argparse.Namespace, base: str, server_pid: int | None) -> dict:
+    base_ws = base.replace("http", "ws", 1)
+    pcm = load_pcm(Path(args.audio) if args.audio else None)
+    audio = wav_bytes(pcm[: SAMPLE_RATE * 2 * args.upload_seconds])
+    pdf = Path(args.pdf).read_bytes() if args.pdf else None
+    scenarios = {name: Scenario(name) for name in ("listen", "upload", "transcribe", "pdf")}
+
+    async def post_upload_audio(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post("/upload-audio", files={"file": ("load.wav", _varied(audio), "audio/wav")})
+
+    async def post_transcribe(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post("/transcribe", files={"file": ("load.mp3", _varied(audio), "audio/mpeg")})
+
+    async def post_pdf(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post("/upload", files={"file": ("load.pdf", _varied_pdf(pdf), "application/pdf")})
+
+    limits = httpx.Limits(max_connections=args.uploads + args.transcribes + args.pdfs + 8)
+    async with httpx.AsyncClient(base_url=base, timeout=300, limits=limits) as client:
+        sessions: list[str | None] = [None] * args.listen
+        if pdf is not None:
+            for i in range(args.listen):
+                r = await post_pdf(client)
+                r.raise_for_status()
+                sessions[i] = r.json()["session_id"]
+        started = time.perf_counter()
+        deadline = started + args.duration
+        tasks = [
+            listen_client(base_ws, sessions[i], pcm, deadline, args, scenarios["listen"]) for i in range(args.listen)
+        ]
+        tasks += [http_client(client, deadline, scenarios["upload"], post_upload_audio) for _ in range(args.uploads)]
+        tasks += [http_client(client, deadline, scenarios["transcribe"], post_transcribe) for _ in range(args.transcribes)]
+        if pdf is not None:
+            tasks += [http_client(client, deadline, scenarios["pdf"], post_pdf) for _ in range(args.pdfs)]
+        peaks: dict[int, float] = {}
+        if server_pid is not None:
+            tasks.append(sample_rss(server_pid, deadline, peaks))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "commit": _git_commit(),
+        "settings": {
+            "duration_s": args.duration,
+            "workers": args.workers if server_pid is not None else None,
+            "listen": args.listen,
+            "uploads": args.uploads,
+            "transcribes": args.transcribes,
+            "pdfs": args.pdfs if pdf is not None else 0,
+        },
+        "scenarios": {name: s.report(elapsed) for name, s in scenarios.items()},
+        "rss_mb": {str(pid): round(mb, 1) for pid, mb in sorted(peaks.items())} or None,
+    }
+
+
+def _wait_until_up(url: str, proc: subprocess.Popen, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"{proc.args} exited during startup")
+        try:
+            httpx.get(url, timeout=2)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise SystemExit(f"{url} did not come up")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Running API to test (default: start the stand-in and the API)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the spawned API")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--listen", type=int, default=10, help="Concurrent /listen sockets")
+    parser.add_argument("--uploads", type=int, default=2, help="Concurrent /upload-audio clients")
+    parser.add_argument("--transcribes", type=int, default=2, help="Concurrent /transcribe clients")
+    parser.add_argument("--pdfs", type=int, default=1, help="Concurrent /upload clients (needs --pdf)")
+    parser.add_argument("--pdf", help="PDF for /upload traffic and /listen sessions")
+    parser.add_argument("--audio", help="16-bit mono 48 kHz WAV to stream and upload")
+    parser.add_argument("--upload-seconds", type=int, default=20, help="Length of the uploaded audio")
+    parser.add_argument("--words-per-sec", type=float, default=2.5, help="Stand-in speaking rate")
+    parser.add_argument("--utterance-words", type=int, default=12, help="Stand-in words per final")
+    parser.add_argument("--out", help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    procs: list[subprocess.Popen] = []
+    try:
+        server_pid = None
+        base = args.base_url
+        if base is None:
+            fake_port, api_port = _free_port(), _free_port()
+            env = {
+                **os.environ,
+                "FAKE_DEEPGRAM_WORDS_PER_SEC": str(args.words_per_sec),
+                "FAKE_DEEPGRAM_UTTERANCE_WORDS": str(args.utterance_words),
+            }
+            fake = subprocess.Popen(
+                [sys.executable, "scripts/fake_deepgram.py", "--port", str(fake_port)], cwd=_project_root, env=env
+            )
+            procs.append(fake)
+            _wait_until_up(f"http://127.0.0.1:{fake_port}/docs", fake)
+            env.setdefault("DEEPGRAM_API_KEY", FAKE_API_KEY)
+            env["DEEPGRAM_BASE_URL"] = f"http://127.0.0.1:{fake_port}/v1"
+            api = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port),
+                 "--workers", str(args.workers), "--log-level", "warning"],
+                cwd=_project_root,
+                env=env,
+            )
+            procs.append(api)
+            base = f"http://127.0.0.1:{api_port}"
+            _wait_until_up(f"{base}/", api)
+            server_pid = api.pid
+        report = asyncio.run(run(args, base.rstrip("/"), server_pid))
+    finally:
+        for proc in reversed(procs):
+            proc.terminate()
+            proc.wait(timeout=10)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,39 @@
-"""Speech-to-text via Deepgram (async). Supports keyword biasing for PDF-derived terms."""
+"""
+Speech-to-text via Deepgram (async). Supports keyword biasing for PDF-derived terms.
+
+Prerecorded requests go straight to the Deepgram REST API on one long-lived pooled
+HTTP client; the audio file is streamed from disk in chunks and concurrency is bounded
+by DEEPGRAM_MAX_CONCURRENCY. DEEPGRAM_BASE_URL (same meaning as the SDK's api_url,
+e.g. http://127.0.0.1:8200/v1) points it at a local stand-in.
+"""
 
 import asyncio
+import time
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
+
+import httpx
 
 import config
-from deepgram import Deepgram
+from services import metrics
+
+DEFAULT_API_URL = "https://api.deepgram.com/v1"
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
 
+class UpstreamError(Exception):
+    """Deepgram failed or was unreachable; mapped in main to status_code (502, or 504 on timeout)."""
 
-def _mimetype_for_path(path: Path) -> str:
+    def __init__(self, message: str, status_code: int, upstream_status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.upstream_status = upstream_status
+
+
+def mimetype_for_path(path: Path) -> str:
     ext = (path.suffix or "").lower()
     return {
         ".mp3": "audio/mpeg",
@@ -19,35 +44,70 @@ def _mimetype_for_path(path: Path) -> str:
     }.get(ext, "audio/mpeg")
 
 
-def _transcribe_sync(
-    audio_path: Path,
-    keywords: Optional[list[str]] = None,
-) -> tuple[str, Optional[float], list[dict], list[dict]]:
-    """
-    Blocking Deepgram prerecorded transcription with optional keyword biasing.
-    Returns (transcript, confidence or None, words with timestamps, segments).
-    """
-    if not config.DEEPGRAM_API_KEY:
-        raise ValueError("DEEPGRAM_API_KEY is not set. Add it to .env or api.env.")
-    opts = {"api_key": config.DEEPGRAM_API_KEY}
-    if config.DEEPGRAM_BASE_URL:
-        opts["api_url"] = config.DEEPGRAM_BASE_URL.rstrip("/")
-    client = Deepgram(opts)
-
-    with open(audio_path, "rb") as f:
-        payload_bytes = f.read()
-    source = {"buffer": payload_bytes, "mimetype": _mimetype_for_path(audio_path)}
-
-    options: dict = {
-        "model": "nova-2",
-        "smart_format": True,
-        "utterances": True,
-        "punctuate": True,
-    }
-    if keywords:
-        options["keywords"] = keywords
-
-    response = client.transcription.sync_prerecorded(source, options)
+def _api_url() -> str:
+    return (config.DEEPGRAM_BASE_URL or DEFAULT_API_URL).rstrip("/")
+
+
+def _get_client() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    """The shared client and the semaphore bounding its concurrent requests (created together)."""
+    global _client, _semaphore
+    if _client is None or _semaphore is None:
+        limit = max(1, config.DEEPGRAM_MAX_CONCURRENCY)
+        _client = httpx.AsyncClient(
+            headers={"Authorization": f"Token {config.DEEPGRAM_API_KEY}"},
+            timeout=httpx.Timeout(config.DEEPGRAM_TIMEOUT_S, connect=10.0),
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+        )
+        _semaphore = asyncio.Semaphore(limit)
+    return _client, _semaphore
+
+
+async def aclose() -> None:
+    """Close the pooled client (call on app shutdown)."""
+    global _client, _semaphore
+    if _client is not None:
+        client, _client, _semaphore = _client, None, None
+        await client.aclose()
+
+
+async def iter_file(path: Path, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Read the file (or length bytes from offset) in fixed-size chunks off the event loop."""
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        if offset:
+            f.seek(offset)
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = UPLOAD_CHUNK_BYTES if remaining is None else min(UPLOAD_CHUNK_BYTES, remaining)
+            chunk = await asyncio.to_thread(f.read, size)
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _query_params(keywords: Optional[list[str]]) -> list[tuple[str, str]]:
+    params = [
+        ("model", "nova-2"),
+        ("smart_format", "true"),
+        ("utterances", "true"),
+        ("punctuate", "true"),
+    ]
+    for kw in keywords or []:
+        params.append(("keywords", kw))
+    return params
+
+
+def options_key() -> tuple:
+    """Request options that affect the result, other than keywords (for cache keys)."""
+    return tuple(_query_params(None))
+
+
+def _parse_response(response: Optional[dict]) -> tuple[str, Optional[float], list[dict], list[dict]]:
+    """Prerecorded JSON -> (transcript, confidence or None, words with timestamps, segments)."""
     results = (response or {}).get("results")
     if not results:
         return ("", None, [], [])
@@ -84,19 +144,74 @@ def _transcribe_sync(
     return (transcript, confidence, words, segments)
 
 
+def _json_object(response: httpx.Response) -> dict:
+    """The JSON object in a 2xx response; UpstreamError (502) if the body is anything else."""
+    status = response.status_code
+    try:
+        data = response.json()
+    except ValueError as e:
+        raise UpstreamError(f"Deepgram returned HTTP {status} with a body that is not JSON", 502, status) from e
+    if not isinstance(data, dict):
+        raise UpstreamError(f"Deepgram returned HTTP {status} with JSON that is not an object", 502, status)
+    return data
+
+
+async def transcribe_stream(
+    body: AsyncIterator[bytes],
+    size: int,
+    mimetype: str,
+    keywords: Optional[list[str]] = None,
+) -> tuple[str, Optional[float], list[dict], list[dict]]:
+    """
+    Transcribe size bytes of audio from body on the shared client; waits for a slot
+    when DEEPGRAM_MAX_CONCURRENCY requests are already in flight.
+    Returns (transcript, confidence or None, words, segments). Raises UpstreamError when
+    Deepgram answers with an error status or a body that is not a JSON object, times out or
+    can't be reached.
+    """
+    if not config.DEEPGRAM_API_KEY:
+        raise ValueError("DEEPGRAM_API_KEY is not set. Add it to .env or api.env.")
+    client, semaphore = _get_client()
+    async with semaphore:
+        t0 = time.perf_counter()
+        try:
+            response = await client.post(
+                f"{_api_url()}/listen",
+                params=_query_params(keywords),
+                headers={"Content-Type": mimetype, "Content-Length": str(size)},
+                content=body,
+            )
+            response.raise_for_status()
+            data = _json_object(response)
+        except httpx.HTTPStatusError as e:
+            metrics.DEEPGRAM_REQUESTS.labels("error").observe(time.perf_counter() - t0)
+            status = e.response.status_code
+            raise UpstreamError(f"Deepgram returned HTTP {status}", 502, status) from e
+        except httpx.TimeoutException as e:
+            metrics.DEEPGRAM_REQUESTS.labels("timeout").observe(time.perf_counter() - t0)
+            raise UpstreamError(f"Deepgram timed out ({type(e).__name__})", 504) from e
+        except httpx.TransportError as e:
+            metrics.DEEPGRAM_REQUESTS.labels("error").observe(time.perf_counter() - t0)
+            raise UpstreamError(f"Deepgram unreachable ({type(e).__name__})", 502) from e
+        except Exception:
+            metrics.DEEPGRAM_REQUESTS.labels("error").observe(time.perf_counter() - t0)
+            raise
+        metrics.DEEPGRAM_REQUESTS.labels("ok").observe(time.perf_counter() - t0)
+    return _parse_response(data)
+
+
 async def transcribe_audio(
     audio_path: Path,
     keywords: Optional[list[str]] = None,
 ) -> tuple[str, Optional[float], list[dict], list[dict]]:
     """
     Transcribe pre-recorded audio with optional keyword biasing.
-    Offloads blocking Deepgram call via asyncio.to_thread.
+    Streams the file to Deepgram on the shared client.
     Returns (transcript, confidence or None, words, segments).
     """
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(
-        None,
-        _transcribe_sync,
-        audio_path,
+    return await transcribe_stream(
+        iter_file(audio_path),
+        audio_path.stat().st_size,
+        mimetype_for_path(audio_path),
         keywords,
     )
@@ -0,0 +1,254 @@
+"""
+Long-audio mode for prerecorded transcription.
+Recordings longer than LONG_AUDIO_MIN_S are cut into overlapping time windows (WAV on sample
+frames, MP3 on frame boundaries) that are streamed to Deepgram concurrently straight from the
+spooled file. Per-window results are shifted back onto the recording's timeline and stitched
+at the middle of each overlap, so a word heard by two windows appears once.
+Other formats, and files whose layout can't be parsed, go as a single request.
+"""
+
+import asyncio
+import math
+import mmap
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import AsyncIterator, NamedTuple, Optional
+
+import config
+from services import asr_service
+
+# MPEG audio Layer III: bitrates (kbps) by index, sample rates by version bits
+_MP3_BITRATES = {
+    True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+# Give up on splitting if frame parsing stops before this share of the file
+_MP3_MIN_PARSED = 0.9
+
+
+class Window(NamedTuple):
+    start_s: float
+    end_s: float
+    offset: int
+    length: int
+    header: bytes = b""
+
+
+def _layout(duration: float, window_s: float, overlap_s: float) -> list[tuple[float, float]]:
+    """(start, end) times of overlapping windows covering [0, duration]."""
+    step = max(window_s - overlap_s, 1.0)
+    spans = []
+    start = 0.0
+    while True:
+        end = min(start + window_s, duration)
+        spans.append((start, end))
+        if end >= duration:
+            return spans
+        start += step
+
+
+def _window_length(duration: float) -> float:
+    """At least LONG_AUDIO_WINDOW_S, and long enough that all windows fit in one concurrent wave."""
+    per_slot = duration / max(1, config.DEEPGRAM_MAX_CONCURRENCY) + config.LONG_AUDIO_OVERLAP_S
+    return max(config.LONG_AUDIO_WINDOW_S, math.ceil(per_slot))
+
+
+def _wav_windows(mm: mmap.mmap) -> Optional[list[Window]]:
+    if mm[:4] != b"RIFF" or mm[8:12] != b"WAVE":
+        return None
+    fmt: Optional[bytes] = None
+    pos = 12
+    while pos + 8 <= len(mm):
+        chunk_id = mm[pos : pos + 4]
+        size = int.from_bytes(mm[pos + 4 : pos + 8], "little")
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt = mm[pos : body + size]
+        elif chunk_id == b"data":
+            if fmt is None or len(fmt) < 24:
+                return None
+            # Streaming writers leave the data size as 0 or 0xFFFFFFFF
+            if size == 0 or body + size > len(mm):
+                size = len(mm) - body
+            byte_rate = int.from_bytes(fmt[16:20], "little")
+            block_align = int.from_bytes(fmt[20:22], "little")
+            if not byte_rate or not block_align:
+                return None
+            frame_rate = byte_rate / block_align
+            duration = size / byte_rate
+            if duration < config.LONG_AUDIO_MIN_S:
+                return None
+            windows = []
+            for start_s, end_s in _layout(duration, _window_length(duration), config.LONG_AUDIO_OVERLAP_S):
+                first = round(start_s * frame_rate) * block_align
+                last = min(round(end_s * frame_rate) * block_align, size)
+                length = last - first
+                header = (
+                    b"RIFF"
+                    + (4 + len(fmt) + 8 + length).to_bytes(4, "little")
+                    + b"WAVE"
+                    + fmt
+                    + b"data"
+                    + length.to_bytes(4, "little")
+                )
+                windows.append(Window(first / byte_rate, last / byte_rate, body + first, length, header))
+            return windows
+        pos = body + size + (size & 1)
+    return None
+
+
+def _mp3_frames(mm: mmap.mmap) -> Optional[tuple[array, array]]:
+    """Byte offset and start time of every Layer III frame, plus a final (end, duration) entry."""
+    pos = 0
+    if mm[:3] == b"ID3" and len(mm) >= 10:
+        size = 0
+        for b in mm[6:10]:
+            size = (size << 7) | (b & 0x7F)
+        pos = 10 + size + (10 if mm[5] & 0x10 else 0)
+    audio_start = pos
+    offsets, times = array("Q"), array("d")
+    t = 0.0
+    n = len(mm)
+    while pos + 4 <= n:
+        b1, b2 = mm[pos + 1], mm[pos + 2]
+        if mm[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+            break
+        version = (b1 >> 3) & 3
+        layer = (b1 >> 1) & 3
+        bitrate_idx = b2 >> 4
+        rate_idx = (b2 >> 2) & 3
+        if version == 1 or layer != 1 or bitrate_idx in (0, 15) or rate_idx == 3:
+            break
+        mpeg1 = version == 3
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_idx]
+        bitrate = _MP3_BITRATES[mpeg1][bitrate_idx] * 1000
+        length = (144 if mpeg1 else 72) * bitrate // sample_rate + ((b2 >> 1) & 1)
+        offsets.append(pos)
+        times.append(t)
+        t += (1152 if mpeg1 else 576) / sample_rate
+        pos += length
+    if not offsets or pos - audio_start < _MP3_MIN_PARSED * (n - audio_start - 128):
+        return None
+    offsets.append(min(pos, n))
+    times.append(t)
+    return offsets, times
+
+
+def _mp3_windows(mm: mmap.mmap) -> Optional[list[Window]]:
+    frames = _mp3_frames(mm)
+    if frames is None:
+        return None
+    offsets, times = frames
+    duration = times[-1]
+    if duration < config.LONG_AUDIO_MIN_S:
+        return None
+    windows = []
+    for start_s, end_s in _layout(duration, _window_length(duration), config.LONG_AUDIO_OVERLAP_S):
+        i = min(bisect_left(times, start_s), len(times) - 1)
+        j = min(bisect_left(times, end_s), len(times) - 1)
+        windows.append(Window(times[i], times[j], offsets[i], offsets[j] - offsets[i]))
+    return windows
+
+
+def plan_windows(path: Path) -> Optional[list[Window]]:
+    """Overlapping windows for a long WAV/MP3, or None to send the file as one request."""
+    ext = path.suffix.lower()
+    if ext not in (".wav", ".mp3") or path.stat().st_size == 0:
+        return None
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        windows = _wav_windows(mm) if ext == ".wav" else _mp3_windows(mm)
+    return windows if windows and len(windows) > 1 else None
+
+
+def options_key() -> tuple:
+    """
+    asr_service.options_key() plus the settings that decide the windowing, for the results of
+    split recordings. A recording sent as one request gets the same result as from
+    asr_service.transcribe_audio, so that is cached under asr_service.options_key() alone.
+    """
+    return asr_service.options_key() + (
+        ("long_audio", config.LONG_AUDIO_MIN_S, config.LONG_AUDIO_WINDOW_S, config.LONG_AUDIO_OVERLAP_S),
+        ("concurrency", config.DEEPGRAM_MAX_CONCURRENCY),
+    )
+
+
+async def _window_body(path: Path, window: Window) -> AsyncIterator[bytes]:
+    if window.header:
+        yield window.header
+    async for chunk in asr_service.iter_file(path, window.offset, window.length):
+        yield chunk
+
+
+def stitch(
+    windows: list[Window],
+    results: list[tuple[str, Optional[float], list[dict], list[dict]]],
+) -> tuple[str, Optional[float], list[dict], list[dict]]:
+    """
+    Merge per-window results into one (transcript, confidence, words, segments). Timestamps
+    are shifted by the window start; each window keeps the words whose midpoint falls between
+    the midpoints of its overlaps with the previous and next windows.
+    """
+    cuts = [(windows[i].end_s + windows[i + 1].start_s) / 2 for i in range(len(windows) - 1)]
+    segments: list[dict] = []
+    words: list[dict] = []
+    confidences = []
+    for i, (window, (_, confidence, _, window_segments)) in enumerate(zip(windows, results)):
+        lo = cuts[i - 1] if i > 0 else -math.inf
+        hi = cuts[i] if i < len(cuts) else math.inf
+        if confidence is not None:
+            confidences.append(confidence)
+        for seg in window_segments:
+            kept = []
+            for w in seg["words"]:
+                start = round(w["start"] + window.start_s, 3)
+                end = round(w["end"] + window.start_s, 3)
+                if lo <= (start + end) / 2 < hi:
+                    kept.append({"word": w["word"], "start": start, "end": end})
+            if not kept:
+                continue
+            text = seg["transcript"] if len(kept) == len(seg["words"]) else " ".join(w["word"] for w in kept)
+            segments.append({"transcript": text, "words": kept})
+            words.extend(kept)
+    transcript = " ".join(s["transcript"] for s in segments)
+    confidence = sum(confidences) / len(confidences) if confidences else None
+    return (transcript, confidence, words, segments)
+
+
+async def transcribe_long_audio(
+    audio_path: Path,
+    keywords: Optional[list[str]] = None,
+) -> tuple[str, Optional[float], list[dict], list[dict]]:
+    """
+    Same contract as asr_service.transcribe_audio. Long WAV/MP3 recordings are transcribed
+    as concurrent overlapping windows and stitched; anything else is one request.
+    """
+    windows = await asyncio.to_thread(plan_windows, audio_path)
+    return await transcribe_windows(audio_path, windows, keywords)
+
+
+async def transcribe_windows(
+    audio_path: Path,
+    windows: Optional[list[Window]],
+    keywords: Optional[list[str]] = None,
+) -> tuple[str, Optional[float], list[dict], list[dict]]:
+    """transcribe_long_audio with the windows already planned (None: one request)."""
+    if windows is None:
+        return await asr_service.transcribe_audio(audio_path, keywords=keywords)
+    mimetype = asr_service.mimetype_for_path(audio_path)
+    tasks = [
+        asyncio.ensure_future(
+            asr_service.transcribe_stream(
+                _window_body(audio_path, w), len(w.header) + w.length, mimetype, keywords
+            )
+        )
+        for w in windows
+    ]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return stitch(windows, results)
@@ -0,0 +1,174 @@
+"""
+Live audio preprocessing for /listen.
+Client linear16 PCM (48 kHz from useAudioRecorder) is low-pass filtered and decimated to
+LIVE_SAMPLE_RATE with NumPy (polyphase: the buffer viewed as rows of `factor` samples, one
+matrix-vector product per row of filter taps, so only the kept output samples are computed) and coalesced into LIVE_PACKET_MS packets for Deepgram (the first frame goes out alone).
+All working buffers are allocated once per connection; the per-frame path only fills them.
+Frame arrival times are kept so a caption's audio offset can be mapped back to when that
+audio reached the server (received_at).
+"""
+
+import time
+from bisect import bisect_left
+from typing import Callable, Optional
+
+import numpy as np
+
+import config
+
+# Rate useAudioRecorder captures at (the /listen default)
+CLIENT_SAMPLE_RATE = 48000
+# Low-pass FIR length per unit of decimation factor, and cutoff as a share of the output Nyquist
+_TAPS_PER_FACTOR = 16
+_CUTOFF = 0.9
+# Largest client frame (samples) the buffers are sized for up front; bigger frames grow them once
+_INITIAL_FRAME_SAMPLES = 8192
+# Frame arrivals remembered for received_at(); the older half is dropped past this
+_MAX_ARRIVALS = 4096
+
+
+def _lowpass(factor: int) -> np.ndarray:
+    """
+    Hamming-windowed sinc low-pass for decimation by factor, zero-padded and shaped
+    (rows, factor) so row m holds taps m*factor .. m*factor + factor - 1.
+    """
+    n_taps = _TAPS_PER_FACTOR * factor + 1
+    n = np.arange(n_taps) - (n_taps - 1) / 2
+    cutoff = _CUTOFF * 0.5 / factor
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(n_taps)
+    h /= h.sum()
+    rows = -(-n_taps // factor)
+    padded = np.zeros(rows * factor, dtype=np.float32)
+    padded[:n_taps] = h[::-1]
+    return padded.reshape(rows, factor)
+
+
+def resampled_rate(input_rate: int, output_rate: int | None = None) -> int:
+    """Rate the pipeline produces: output_rate (default LIVE_SAMPLE_RATE) if it divides input_rate."""
+    output_rate = output_rate or config.LIVE_SAMPLE_RATE
+    if output_rate > input_rate or input_rate % output_rate:
+        # Only integer decimation is supported; other rates pass through unchanged
+        return input_rate
+    return output_rate
+
+
+class AudioPipeline:
+    def __init__(self, input_rate: int, output_rate: int | None = None, packet_ms: int | None = None) -> None:
+        output_rate = resampled_rate(input_rate, output_rate)
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.factor = input_rate // output_rate
+        self.packet_samples = max(1, output_rate * (packet_ms or config.LIVE_PACKET_MS) // 1000)
+        self._packet = np.empty(self.packet_samples, dtype=np.int16)
+        self._filled = 0
+        self.frames_in = 0
+        self.packets_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Parallel lists: client audio seconds received so far, and when (perf_counter)
+        self._arrival_offsets: list[float] = []
+        self._arrival_times: list[float] = []
+        self._arrivals_trimmed = False
+        if self.factor > 1:
+            self._taps = _lowpass(self.factor)
+            self._history = self._taps.size - 1  # input samples behind each output sample
+            self._kept = self._history  # samples carried over at the front of _work
+            self._alloc(_INITIAL_FRAME_SAMPLES)
+
+    def _alloc(self, frame_samples: int) -> None:
+        """(Re)size the input work buffer, filter output buffer and carry-over scratch."""
+        rows = -(-(self._history + frame_samples) // self.factor)
+        work = np.zeros(rows * self.factor, dtype=np.float32)
+        if hasattr(self, "_work"):
+            work[: self._kept] = self._work[: self._kept]
+        self._work = work
+        # Same memory as rows of `factor` samples: row r starts at input sample r * factor
+        self._rows = work.reshape(rows, self.factor)
+        self._filtered = np.empty(rows, dtype=np.float32)
+        self._product = np.empty(rows, dtype=np.float32)
+        self._carry = np.empty(self._history + self.factor, dtype=np.float32)
+
+    def _emit_samples(self, samples: np.ndarray, send: Callable[[bytes], None]) -> None:
+        """Append int16 samples to the current packet, sending each packet once it is full."""
+        pos = 0
+        while pos < len(samples):
+            take = min(self.packet_samples - self._filled, len(samples) - pos)
+            self._packet[self._filled : self._filled + take] = samples[pos : pos + take]
+            self._filled += take
+            pos += take
+            if self._filled == self.packet_samples:
+                self._send_packet(send)
+
+    def _send_packet(self, send: Callable[[bytes], None]) -> None:
+        data = self._packet[: self._filled].tobytes()
+        self._filled = 0
+        self.packets_out += 1
+        self.bytes_out += len(data)
+        send(data)
+
+    def feed(self, data: bytes, send: Callable[[bytes], None]) -> None:
+        """Process one client frame of linear16 PCM; send() is called for each completed packet."""
+        self.frames_in += 1
+        self.bytes_in += len(data)
+        if len(self._arrival_offsets) >= _MAX_ARRIVALS:
+            del self._arrival_offsets[: _MAX_ARRIVALS // 2]
+            del self._arrival_times[: _MAX_ARRIVALS // 2]
+            self._arrivals_trimmed = True
+        self._arrival_offsets.append(self.bytes_in / (2 * self.input_rate))
+        self._arrival_times.append(time.perf_counter())
+        pcm = np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+        if self.factor == 1:
+            self._emit_samples(pcm, send)
+        else:
+            self._decimate(pcm, send)
+        if self.packets_out == 0 and self._filled:
+            # Send the first frame on its own so upstream decoding starts without waiting for a full packet
+            self._send_packet(send)
+
+    def _decimate(self, pcm: np.ndarray, send: Callable[[bytes], None]) -> None:
+        n = len(pcm)
+        if self._kept + n > len(self._work):
+            self._alloc(n)
+        total = self._kept + n
+        self._work[self._kept : total] = pcm
+        n_out = (total - self._history - 1) // self.factor + 1 if total > self._history else 0
+        if n_out:
+            # out[k] = sum_m rows[k + m] . taps[m]; padded taps are zero past the filter length
+            out = self._filtered[:n_out]
+            product = self._product[:n_out]
+            np.dot(self._rows[:n_out], self._taps[0], out=out)
+            for m in range(1, len(self._taps)):
+                np.dot(self._rows[m : m + n_out], self._taps[m], out=product)
+                np.add(out, product, out=out)
+            np.rint(out, out=out)
+            np.clip(out, -32768, 32767, out=out)
+            self._emit_samples(out, send)
+        # Carry the samples the next output still needs to the front of the work buffer
+        start = n_out * self.factor
+        self._kept = total - start
+        self._carry[: self._kept] = self._work[start:total]
+        self._work[: self._kept] = self._carry[: self._kept]
+
+    def received_at(self, offset_s: float) -> Optional[float]:
+        """perf_counter time at which the client audio up to offset_s seconds had arrived."""
+        i = bisect_left(self._arrival_offsets, offset_s)
+        if i == len(self._arrival_offsets):
+            return self._arrival_times[-1] if self._arrival_times else None
+        if i == 0 and self._arrivals_trimmed:
+            return None  # older than the frames still remembered
+        return self._arrival_times[i]
+
+    def flush(self, send: Callable[[bytes], None]) -> None:
+        """Send the partly filled packet, if any."""
+        if self._filled:
+            self._send_packet(send)
+
+    def stats(self) -> dict:
+        return {
+            "input_rate": self.input_rate,
+            "output_rate": self.output_rate,
+            "frames_in": self.frames_in,
+            "packets_out": self.packets_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
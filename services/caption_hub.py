@@ -0,0 +1,98 @@
+"""
+Broadcast live captions from one presenter to many viewers.
+The presenter's /listen connection publishes each caption for its session; viewers on
+/listen/view subscribe with their own CaptionQueue. A caption is serialized once and the
+same string is queued for every viewer, each of which has its own writer task, so a slow
+viewer only falls behind itself: superseded interims are skipped, and a viewer whose final
+backlog reaches its limit is disconnected (it can reconnect with ?since= to catch up from
+the transcript log) rather than holding up the presenter or the other viewers.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Optional
+
+from services.caption_queue import CaptionQueue
+
+logger = logging.getLogger(__name__)
+
+# session_id -> viewer queue -> callable that closes that viewer's socket
+_viewers: dict[str, dict[CaptionQueue, Callable[[], Awaitable[None]]]] = {}
+# session_id -> callable that closes the current presenter's socket
+_presenters: dict[str, Callable[[], Awaitable[None]]] = {}
+_tasks: set[asyncio.Task] = set()
+_counts = {"published": 0, "delivered": 0, "evicted_slow": 0, "presenters_replaced": 0}
+
+
+async def _close_quietly(close: Callable[[], Awaitable[None]]) -> None:
+    try:
+        await close()
+    except Exception as e:
+        logger.debug("Closing caption socket: %s", e)
+
+
+def _spawn(close: Callable[[], Awaitable[None]]) -> None:
+    task = asyncio.create_task(_close_quietly(close))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def claim_presenter(session_id: str, close: Callable[[], Awaitable[None]]) -> None:
+    """Make this connection the session's presenter; a previous presenter is disconnected."""
+    previous = _presenters.get(session_id)
+    _presenters[session_id] = close
+    if previous is not None:
+        _counts["presenters_replaced"] += 1
+        _spawn(previous)
+
+
+def release_presenter(session_id: str, close: Callable[[], Awaitable[None]]) -> None:
+    if _presenters.get(session_id) is close:
+        del _presenters[session_id]
+
+
+def subscribe(session_id: str, queue: CaptionQueue, close: Callable[[], Awaitable[None]]) -> None:
+    """Deliver the session's captions to queue; close() is called if the viewer falls too far behind."""
+    _viewers.setdefault(session_id, {})[queue] = close
+
+
+def unsubscribe(session_id: str, queue: CaptionQueue) -> None:
+    viewers = _viewers.get(session_id)
+    if viewers is None:
+        return
+    viewers.pop(queue, None)
+    if not viewers:
+        del _viewers[session_id]
+
+
+def publish(session_id: str, msg: dict, encoded: Optional[str] = None) -> None:
+    """Queue a caption for every viewer of the session (serialized once). Safe from sync handlers."""
+    viewers = _viewers.get(session_id)
+    if not viewers:
+        return
+    if encoded is None:
+        encoded = json.dumps(msg)
+    _counts["published"] += 1
+    for queue, close in list(viewers.items()):
+        queue.put(msg, encoded)
+        _counts["delivered"] += 1
+        if queue.full:
+            logger.info("Disconnecting viewer of %s: %d finals behind", session_id, queue.depth)
+            _counts["evicted_slow"] += 1
+            unsubscribe(session_id, queue)
+            _spawn(close)
+
+
+def is_live(session_id: str) -> bool:
+    """Whether the session has a presenter or viewers connected."""
+    return session_id in _presenters or session_id in _viewers
+
+
+def stats() -> dict:
+    return {
+        "sessions": len(_viewers),
+        "viewers": sum(len(v) for v in _viewers.values()),
+        "presenters": len(_presenters),
+        **_counts,
+    }
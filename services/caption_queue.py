@@ -0,0 +1,122 @@
+"""
+Outbound caption queue for one /listen connection.
+Deepgram handlers put() captions synchronously; a single writer task sends them in order.
+Only the newest interim is kept: a later interim or any final supersedes it, so a lagging
+client skips stale interims but never loses a final. When more than CAPTION_QUEUE_MAX_FINALS
+finals are waiting, wait_for_room() holds back reading more audio from the client.
+Captions are queued already serialized, so one JSON string can be shared by many queues.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Open connections' queues, for depth metrics
+_live: "weakref.WeakSet[CaptionQueue]" = weakref.WeakSet()
+_dropped_total = 0
+
+
+class CaptionQueue:
+    def __init__(self, send: Callable[[str], Awaitable[None]], max_finals: Optional[int] = None) -> None:
+        self._send = send
+        self.max_finals = max_finals or config.CAPTION_QUEUE_MAX_FINALS
+        self._finals: deque[str] = deque()
+        self._interim: Optional[str] = None
+        self._wakeup = asyncio.Event()
+        self._room = asyncio.Event()
+        self._room.set()
+        self._closed = False
+        self.sent = 0
+        self.dropped_interims = 0
+        self._writer = asyncio.create_task(self._run())
+        _live.add(self)
+
+    @property
+    def depth(self) -> int:
+        return len(self._finals) + (self._interim is not None)
+
+    @property
+    def full(self) -> bool:
+        """True while the final backlog is at its limit."""
+        return len(self._finals) >= self.max_finals
+
+    def put(self, msg: dict, encoded: Optional[str] = None) -> None:
+        """
+        Queue a caption (encoded: msg already serialized, if the caller has it); superseded
+        interims are dropped. Safe to call from sync handlers.
+        """
+        global _dropped_total
+        if self._closed:
+            return
+        if self._interim is not None:
+            self._interim = None
+            self.dropped_interims += 1
+            _dropped_total += 1
+        text = encoded if encoded is not None else json.dumps(msg)
+        if msg.get("is_final"):
+            self._finals.append(text)
+            if self.full:
+                self._room.clear()
+        else:
+            self._interim = text
+        self._wakeup.set()
+
+    async def wait_for_room(self) -> None:
+        """Wait while the final backlog is at its limit (backpressure on the audio reader)."""
+        await self._room.wait()
+
+    def _next(self) -> Optional[str]:
+        if self._finals:
+            text = self._finals.popleft()
+            if not self.full:
+                self._room.set()
+            return text
+        text, self._interim = self._interim, None
+        return text
+
+    async def _run(self) -> None:
+        while True:
+            text = self._next()
+            if text is None:
+                if self._closed:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                await self._send(text)
+                self.sent += 1
+            except Exception as e:
+                logger.warning("Failed to send transcript: %s", e)
+                self._closed = True
+                self._room.set()
+                return
+
+    async def aclose(self, timeout: float = 2.0) -> None:
+        """Stop accepting captions and flush what is queued (up to timeout seconds)."""
+        self._closed = True
+        self._room.set()
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._writer, timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropped %d unsent captions on close", self.depth)
+        _live.discard(self)
+
+
+def stats() -> dict:
+    """Queue depth across open /listen connections, plus interims dropped as superseded."""
+    depths = [q.depth for q in list(_live)]
+    return {
+        "connections": len(depths),
+        "depths": depths,
+        "max_depth": max(depths, default=0),
+        "dropped_interims": _dropped_total,
+    }
@@ -0,0 +1,158 @@
+"""
+Frequent English words, for keyword_corrector: a transcript word on this list (or an
+inflection of one) was most likely heard right, so it is only rewritten to a keyword that
+sounds exactly like it. Base forms only; lower case. A full word-frequency list can be
+added with load_wordlist() (CORRECTION_WORDLIST).
+"""
+
+from pathlib import Path
+
+COMMON_WORDS = frozenset(
+    """
+    a able about above accept access account across act action active activity actual actually add
+    address admit adult affect after again against age agency agent ago agree agreement ahead air
+    all allow almost alone along already also although always among amount analysis and animal
+    another answer any anyone anything appear apply approach area argue arm around arrive art
+    article artist as ask assume at attack attention attorney audience author authority available
+    avoid away baby back bad bag ball bank bar base be beat beautiful because become bed before
+    begin behavior behind believe benefit best better between beyond big bill billion bit black
+    blood blue board body book born both box boy break bring brother budget build building
+    business but buy by call camera campaign can cancer candidate capital car card care career
+    carry case catch cause cell center central century certain certainly chair challenge chance
+    change character charge check child choice choose church citizen city civil claim class clear
+    clearly close coach cold collection college color come commercial common community company
+    compare computer concern condition conference congress consider consumer contain continue
+    control cost could country county couple course court cover create crime cultural culture cup
+    current customer cut dark data daughter day dead deal death debate decade decide decision deep
+    defense degree democrat democratic describe design despite detail determine develop
+    development die difference different difficult dinner direction director discover discuss
+    discussion disease do doctor dog door down draw dream drive drop drug during each early east
+    easy eat economic economy edge education effect effort eight either election else employee end
+    energy enjoy enough enter entire entry environment environmental especially establish even
+    evening event ever every everybody everyone everything evidence exactly example executive
+    exist expect experience expert explain eye face fact factor fail fall family far fast father
+    fear federal feel feeling few field fight figure fill film final finally financial find fine
+    finger finish fire firm first fish five floor fly focus follow food foot for force foreign
+    forget form former forward four free friend from front full fund future game garden gas
+    general generation get girl give glass go goal good government great green ground group grow
+    growth guess gun guy hair half hand hang happen happy hard have he head health hear heart heat
+    heavy help her here herself high him himself his history hit hold home hope hospital hot hotel
+    hour house how however huge human hundred husband idea identify if image imagine impact
+    important improve in include including increase indeed indicate individual industry
+    information inside instead institution interest interesting international interview into
+    investment involve issue it item its itself job join just keep key kid kill kind kitchen know
+    knowledge land language large last late later laugh law lawyer lay lead leader learn least
+    leave left leg legal less let letter level lie life light like likely line list listen little
+    live local long look lose loss lot love low machine magazine main maintain major majority make
+    man manage management manager many market marriage material matter may maybe me mean measure
+    media medical meet meeting member memory mention message method middle might military million
+    mind minute miss mission model modern moment money month more morning most mother mouth move
+    movement movie much music must my myself name nation national natural nature near nearly
+    necessary need network never new news newspaper next nice night no none nor north not note
+    nothing notice now number occur of off offer office officer official often oh oil ok old on
+    once one only onto open operation opportunity option or order organization other others our
+    out outside over own owner page pain painting paper parent part participant particular
+    particularly partner party pass past patient pattern pay peace people per perform performance
+    perhaps period person personal phone physical pick picture piece place plan plant play player
+    point police policy political politics poor popular population position positive possible
+    power practice prepare present president pressure pretty prevent price private probably
+    problem process produce product production professional professor program project property
+    protect prove provide public pull purpose push put quality question quickly quite race radio
+    raise range rate rather reach read ready real reality realize really reason receive recent
+    recently recognize record red reduce reflect region relate relationship religious remain
+    remember remove report represent republican require research resource respond response
+    responsibility rest result return reveal rich right rise risk road rock role room rule run
+    safe same save say scene school science scientist score sea season seat second section
+    security see seek seem sell send senior sense series serious serve service set seven several
+    shake share she shoot short shot should shoulder show side sign significant similar simple
+    simply since sing single sister sit site situation six size skill skin small smile so social
+    society soldier some somebody someone something sometimes son song soon sort sound source
+    south southern space speak special specific speech spend sport spring staff stage stand
+    standard star start state statement station stay step still stock stop store story strategy
+    street strong structure student study stuff style subject success successful such suddenly
+    suffer suggest summer support sure surface system table take talk task tax teach teacher team
+    technology television tell ten tend term test than thank that the their them themselves then
+    theory there these they thing think third this those though thought thousand threat three
+    through throughout throw thus time to today together tonight too top total tough toward town
+    trade traditional training travel treat treatment tree trial trip trouble true truth try turn
+    tv two type under understand unit until up upon us use usually value various very victim view
+    violence visit voice vote wait walk wall want war watch water way we weapon wear week weight
+    well west western what whatever when where whether which while white who whole whom whose why
+    wide wife will win wind window wish with within without woman wonder word work worker world
+    worry would write writer wrong yard yeah year yes yet you young your yourself
+    ability absolute accident accurate achieve acid acquire adapt addition adjust advance
+    advantage advice afford afraid afternoon aim alarm album alive angle angry announce annual
+    anxiety apart apartment appeal apple appoint appreciate appropriate approve arrange arrest
+    aside aspect assess asset assign assist associate atmosphere attach attempt attend attitude
+    attract average award aware balance band barrier basic basis battle bear bell belong below
+    bend beside bet bind bird birth bite blade blame blind block blow boat bone bonus border
+    bottle bottom bound brain branch brand brave bread breath brief bright broad brown brush
+    burden burn bus button cable cake calculate calm camp cap capacity capture carbon cash cast
+    category ceiling celebrate chain champion channel chapter chart cheap chemical chest chief
+    circle clean client climate climb clock cloud coast code coffee coin collapse combine comfort
+    command comment commit committee compete complete complex component concept conclude
+    confidence confirm conflict connect consequence constant construct contact content contest
+    context contract contribute convert convince cook cool cope copy core corner correct count
+    counter courage cousin crash crazy cream credit crew crisis critical crop cross crowd crucial
+    cry curious curve cycle daily damage dance danger date dear debt decline deliver demand deny
+    depend deposit depth desk destroy device diet dig dimension dirty disaster discipline display
+    distance distinct divide document domain double doubt dozen draft drag drama dress drink dry
+    due dust duty eager ear earn earth ease echo edit efficient egg elderly element elsewhere
+    emerge emotion emphasis employ empty enable encounter encourage enemy engage engine enhance
+    ensure entertain enthusiasm equal equipment error escape essay essential estate estimate
+    evaluate exam examine exchange excite excuse exercise expand expense explore expose express
+    extend extent extra extreme fabric facility faith fan fashion fat fault favor feature fee
+    female fiction file finance flat flavor flight flow flower fold folk forest fortune frame
+    frequent fresh fruit fuel function funny furniture gain gap gate gather gene gentle gift
+    glance global golden grab grade grain grand grant grass grave gray guard guest guide guilty
+    habit hall handle harm hat hate headline healthy height hello hero hide highlight highway
+    hill hire hole holiday honest honor horse host household hunt hurt ice ideal ignore illegal
+    illness immediate implement imply impose impress income index infect inflation influence
+    initial injury inner input insist inspire install instance instruct insurance intend
+    internal invest invite iron island joke journal journey joy judge jump junior jury justice
+    kick king kiss knee knife label labor lack lady lake landscape lap laser launch layer lean
+    lecture length lesson liberal library license lift limit link lip liquid literature loan lock
+    logic loose lord luck lunch mail male mall map margin mark mass master match math meal meat
+    mechanism medium mental menu mere metal mile milk minor mirror mix mobile mode moral motion
+    motor mount mountain mud muscle museum mystery narrow native neck negative neighbor nerve
+    neutral noise normal nose novel nuclear nurse object obtain obvious ocean odd online
+    opinion oppose opposite orange organ origin outcome output oven pace pack package pair panel
+    parent parking path pause peak pen pension percent perfect permit pet phase photo phrase
+    pilot pin pipe pitch plastic plate platform pleasure plenty pocket poem poet pole pool pop
+    port portion pose post pot pound pour powder praise pray predict prefer premium presence
+    press pride priest primary prime principle print prior priority prison prize profile profit
+    progress promise promote prompt proof proper proportion propose prospect proud pupil purchase
+    pure pursue puzzle quarter queen quick quiet quote rain random rank rare raw react reader
+    rebel recall recipe recover reform refuse regard register regret regular reject relax release
+    relief rely remote rent repair repeat replace reply request rescue reserve resident resist
+    resolve resort respect restaurant restore retain retire rice ride ring riot river roll roof
+    root rope rough round route routine row royal rub ruin rush sad sail salad salary sale salt
+    sample sand satisfy scale scheme scope screen script search secret sector seed select self
+    senate sequence session settle severe sex shade shadow shape sharp sheet shelf shell shelter
+    shift shine ship shirt shock shoe shop silence silk silly silver sin sink sky sleep slice
+    slide slight slip slow smart smell smoke smooth snow soft soil solar solid solution solve
+    soul soup spare speed spin spirit split spot spread square stable stake stamp steady steal
+    steel stick stone storm stream strength stress stretch strike string strip stroke studio
+    submit suit sum sun supply surgery surprise survey survive suspect sweet swim swing symbol
+    tale tank tape target taste tea tear temple tension terrible territory text theme therapy
+    thick thin thread threaten throat ticket tie tight tip tire title tone tool tooth topic
+    touch tour tower track trail train transfer transform trap trend troop truck trust tube tune
+    twice twin typical uncle unique universe unless update upper urban urge useful user vast
+    vehicle venture version video village virtue visible vision visual volume wage wake warm warn
+    wash waste wave weak wealth weather wedding weekend welcome wheel whisper wild wine wing
+    winner winter wire wise witness wood wool worth wound wrap yellow youth zone
+    """.split()
+)
+
+
+def load_wordlist(path: str, top: int) -> frozenset[str]:
+    """The first `top` words of a frequency list file (one per line, optionally followed by a count), lower case."""
+    words: set[str] = set()
+    with open(Path(path), encoding="utf-8") as f:
+        for line in f:
+            fields = line.split()
+            if fields:
+                words.add(fields[0].lower())
+                if len(words) >= top:
+                    break
+    return frozenset(words)
@@ -0,0 +1,235 @@
+"""
+Incremental document-frequency index over every PDF the service has ingested, used for
+TF-IDF keyword scoring.
+
+The table is an open-addressing hash table (64-bit term hash -> df) in a memory-mapped
+file, so lookups are O(1), nothing is loaded up front, and adding a document updates the
+counts in place. Each ingested document is recorded under a marker key so the same PDF
+is never counted twice. Without CORPUS_INDEX_PATH the same layout lives in memory.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import config
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock(f) -> None:
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK gives up after ~10 s; keep waiting, as flock does
+
+    def _unlock(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(f) -> None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+    def _unlock(f) -> None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+
+_MAGIC = b"LBDF"
+_VERSION = 1
+# magic, version, capacity (slots, power of two), documents, occupied slots
+_HEADER = struct.Struct("<4sIQQQ")
+# term hash (0 = empty slot), document frequency
+_SLOT = struct.Struct("<QI4x")
+_MAX_LOAD = 0.7
+_INITIAL_CAPACITY = 1 << 14
+
+
+def _term_key(term: str) -> int:
+    key = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+    return key or 1
+
+
+def _doc_key(doc_hash: str) -> int:
+    return _term_key("\0doc:" + doc_hash)
+
+
+class DfIndex:
+    def __init__(self, path: Optional[str] = None, capacity: int = _INITIAL_CAPACITY) -> None:
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._buf: mmap.mmap | bytearray
+        self._inode: Optional[int] = None
+        if self.path is None:
+            self._buf = self._empty_table(capacity)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._file_lock():
+                if not self.path.exists() or self.path.stat().st_size == 0:
+                    self._write_file(self.path, self._empty_table(capacity))
+            self._open()
+
+    # --- storage ---
+
+    @staticmethod
+    def _empty_table(capacity: int) -> bytearray:
+        buf = bytearray(_HEADER.size + capacity * _SLOT.size)
+        _HEADER.pack_into(buf, 0, _MAGIC, _VERSION, capacity, 0, 0)
+        return buf
+
+    @staticmethod
+    def _write_file(path: Path, data: bytes | bytearray) -> None:
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _open(self) -> None:
+        assert self.path is not None
+        with open(self.path, "r+b") as f:
+            self._buf = mmap.mmap(f.fileno(), 0)
+            self._inode = os.fstat(f.fileno()).st_ino
+        magic, version, *_ = _HEADER.unpack_from(self._buf, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{self.path} is not a corpus index")
+
+    def _refresh(self) -> None:
+        """Re-map if another process replaced the file (it grows by rewrite + rename)."""
+        if self.path is not None and os.stat(self.path).st_ino != self._inode:
+            self._buf.close()
+            self._open()
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        if self.path is None:
+            yield
+            return
+        with open(self.path.with_suffix(".lock"), "a") as lock:
+            _lock(lock)
+            try:
+                yield
+            finally:
+                _unlock(lock)
+
+    def _header(self) -> tuple[int, int, int]:
+        _, _, capacity, n_docs, n_used = _HEADER.unpack_from(self._buf, 0)
+        return capacity, n_docs, n_used
+
+    def _set_counts(self, n_docs: int, n_used: int) -> None:
+        capacity = self._header()[0]
+        _HEADER.pack_into(self._buf, 0, _MAGIC, _VERSION, capacity, n_docs, n_used)
+
+    def _slot(self, key: int) -> tuple[int, int, int]:
+        """(offset, stored key, df) of the slot holding key, or of the empty slot where it belongs."""
+        capacity = self._header()[0]
+        mask = capacity - 1
+        i = key & mask
+        while True:
+            offset = _HEADER.size + i * _SLOT.size
+            stored, df = _SLOT.unpack_from(self._buf, offset)
+            if stored == key or stored == 0:
+                return offset, stored, df
+            i = (i + 1) & mask
+
+    def _grow(self, needed: int) -> None:
+        capacity, n_docs, n_used = self._header()
+        if n_used + needed <= capacity * _MAX_LOAD:
+            return
+        new_capacity = capacity
+        while n_used + needed > new_capacity * _MAX_LOAD:
+            new_capacity *= 2
+        old = self._buf
+        new = self._empty_table(new_capacity)
+        self._buf = new
+        for i in range(capacity):
+            stored, df = _SLOT.unpack_from(old, _HEADER.size + i * _SLOT.size)
+            if stored:
+                offset, _, _ = self._slot(stored)
+                _SLOT.pack_into(new, offset, stored, df)
+        _HEADER.pack_into(new, 0, _MAGIC, _VERSION, new_capacity, n_docs, n_used)
+        if self.path is not None:
+            old.close()
+            self._write_file(self.path, new)
+            self._open()
+
+    # --- public API ---
+
+    @property
+    def n_docs(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._header()[1]
+
+    def df(self, term: str) -> int:
+        with self._lock:
+            self._refresh()
+            offset, stored, df = self._slot(_term_key(term))
+            return df if stored else 0
+
+    def idf_map(self, terms: Iterable[str]) -> dict[str, float]:
+        """Smoothed idf = ln((1 + N) / (1 + df)) + 1 for each term, in one pass."""
+        with self._lock:
+            self._refresh()
+            n_docs = self._header()[1]
+            out = {}
+            for term in terms:
+                _, stored, df = self._slot(_term_key(term))
+                out[term] = math.log((1 + n_docs) / (1 + (df if stored else 0))) + 1.0
+            return out
+
+    def add_document(self, doc_hash: str, terms: Iterable[str]) -> bool:
+        """Count each distinct term once for this document. Returns False if already indexed."""
+        unique = set(terms)
+        with self._lock, self._file_lock():
+            self._refresh()
+            doc_offset, stored, _ = self._slot(_doc_key(doc_hash))
+            if stored:
+                return False
+            self._grow(len(unique) + 1)
+            capacity, n_docs, n_used = self._header()
+            for key in [_term_key(t) for t in unique] + [_doc_key(doc_hash)]:
+                offset, stored, df = self._slot(key)
+                if not stored:
+                    n_used += 1
+                _SLOT.pack_into(self._buf, offset, key, df + 1)
+            self._set_counts(n_docs + 1, n_used)
+            if isinstance(self._buf, mmap.mmap):
+                self._buf.flush()
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            capacity, n_docs, n_used = self._header()
+            return {"documents": n_docs, "slots_used": n_used, "capacity": capacity}
+
+
+_index: Optional[DfIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> DfIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DfIndex(config.CORPUS_INDEX_PATH or None)
+    return _index
+
+
+def rank_tfidf(counts: Counter[str], top_n: int = 50) -> list[str]:
+    """Top N terms by tf * idf against the corpus index; ties keep first-seen order."""
+    idf = get_index().idf_map(counts)
+    scored = sorted(counts.items(), key=lambda item: -item[1] * idf[item[0]])
+    return [term for term, _ in scored[:top_n]]
@@ -0,0 +1,121 @@
+"""
+Background transcription jobs (POST /upload-audio?async=true).
+A bounded asyncio queue drained by TRANSCRIBE_WORKERS workers. submit() fails fast with
+QueueFull once TRANSCRIBE_QUEUE_SIZE jobs are waiting, carrying a Retry-After estimate
+from an EWMA of recent job durations, so bursts are shed instead of piling up connections.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Awaitable, Callable, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+# Weight of the newest job in the duration average; starting guess before any job finishes
+_EWMA_ALPHA = 0.2
+_INITIAL_JOB_SECONDS = 10.0
+
+_queue: Optional[asyncio.Queue] = None
+_workers: list[asyncio.Task] = []
+_job_seconds = _INITIAL_JOB_SECONDS
+_running = 0
+_completed = 0
+_failed = 0
+_rejected = 0
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Transcription queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+async def _worker() -> None:
+    global _job_seconds, _running, _completed, _failed
+    assert _queue is not None
+    while True:
+        run, _ = await _queue.get()
+        _running += 1
+        t0 = time.perf_counter()
+        try:
+            await run()
+            _completed += 1
+        except Exception:
+            _failed += 1
+            logger.exception("Transcription job failed")
+        finally:
+            _running -= 1
+            _job_seconds += _EWMA_ALPHA * (time.perf_counter() - t0 - _job_seconds)
+            _queue.task_done()
+
+
+def start() -> None:
+    """Create the queue and workers (call from the app lifespan)."""
+    global _queue
+    if _queue is not None:
+        return
+    _queue = asyncio.Queue(maxsize=max(1, config.TRANSCRIBE_QUEUE_SIZE))
+    _workers.extend(asyncio.create_task(_worker()) for _ in range(max(1, config.TRANSCRIBE_WORKERS)))
+
+
+async def stop() -> None:
+    """Cancel the workers and discard jobs that never started."""
+    global _queue
+    if _queue is None:
+        return
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    while not _queue.empty():
+        _, discard = _queue.get_nowait()
+        if discard is not None:
+            try:
+                discard()
+            except Exception:
+                logger.exception("Discarding a queued transcription job failed")
+    _queue = None
+
+
+def retry_after() -> int:
+    """Seconds until a queue slot is likely to free up (one worker finishing a job)."""
+    return max(1, math.ceil(_job_seconds / max(1, len(_workers))))
+
+
+def admit() -> None:
+    """Raise QueueFull if a job submitted now would be rejected."""
+    global _rejected
+    if _queue is not None and _queue.full():
+        _rejected += 1
+        raise QueueFull(retry_after())
+
+
+def submit(run: Job, discard: Optional[Callable[[], None]] = None) -> None:
+    """
+    Enqueue run() for a worker. discard() is called instead if the app shuts down before the
+    job starts. Raises QueueFull when the queue is at capacity.
+    """
+    admit()
+    if _queue is None:
+        start()
+    assert _queue is not None
+    _queue.put_nowait((run, discard))
+
+
+def stats() -> dict:
+    return {
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "running": _running,
+        "workers": len(_workers),
+        "capacity": _queue.maxsize if _queue is not None else config.TRANSCRIBE_QUEUE_SIZE,
+        "completed": _completed,
+        "failed": _failed,
+        "rejected": _rejected,
+        "avg_job_seconds": round(_job_seconds, 3),
+    }
@@ -0,0 +1,71 @@
+"""
+Content-addressed keyword cache.
+spaCy candidate counts are keyed by the document's SHA-256 plus the extraction settings
+(filler list) only, so repeat uploads of the same PDF skip PyMuPDF/spaCy and are re-ranked
+from the counts against the current corpus index. Gemini rankings can't be derived from
+counts and are keyed by top N too.
+"""
+
+import hashlib
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import config
+from services.result_cache import TieredCache, make_key
+
+_cache = TieredCache(
+    max_bytes=config.KEYWORD_CACHE_MAX_MB * 1024 * 1024,
+    disk_dir=config.KEYWORD_CACHE_DIR or None,
+)
+
+
+def file_hash(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _key(doc_hash: str, backend: str, top_n: int, filler_terms: frozenset[str]) -> str:
+    return make_key("keywords", doc_hash, backend, top_n, sorted(filler_terms))
+
+
+def get_counts(doc_hash: str, filler_terms: frozenset[str]) -> Optional[Counter[str]]:
+    """Cached spaCy candidate counts for this document and filler list, or None."""
+    value = _cache.get(make_key("counts", doc_hash, sorted(filler_terms)))
+    return Counter(value) if isinstance(value, dict) else None
+
+
+def put_counts(doc_hash: str, filler_terms: frozenset[str], counts: dict[str, int]) -> None:
+    _cache.put(make_key("counts", doc_hash, sorted(filler_terms)), dict(counts))
+
+
+def get(
+    doc_hash: str,
+    backend: str,
+    top_n: int,
+    filler_terms: frozenset[str],
+) -> Optional[dict]:
+    """Cached ranking {"keywords": [...], "counts": {term: n}} from this backend (e.g. Gemini), or None."""
+    value = _cache.get(_key(doc_hash, backend, top_n, filler_terms))
+    return value if isinstance(value, dict) else None
+
+
+def put(
+    doc_hash: str,
+    backend: str,
+    top_n: int,
+    filler_terms: frozenset[str],
+    keywords: list[str],
+    counts: Optional[dict[str, int]] = None,
+) -> None:
+    """Store the ranked keywords and, if given, the per-term counts they were ranked from."""
+    value = {"keywords": list(keywords), "counts": dict(counts or {})}
+    _cache.put(_key(doc_hash, backend, top_n, filler_terms), value)
+
+
+def stats() -> dict:
+    """Hit/miss/eviction counters and memory-tier size."""
+    return _cache.stats()
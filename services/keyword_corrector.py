@@ -0,0 +1,391 @@
+"""
+Rewrite misheard keywords in transcripts ("Navy Stock" -> "Navier-Stokes").
+Each keyword list is indexed once: every keyword gets a phonetic key (a Metaphone-style code
+per word, concatenated) stored in a BK-tree. correct() slides windows of 1..N words over the
+text (N = longest keyword in words, plus one for split words), looks up each window's key in
+the tree within a small edit distance (memoized per key), and replaces the best-scoring,
+non-overlapping windows with the closest keyword when the spellings are also similar
+enough. Windows spelled like a keyword, or like a keyword with an inflected last word
+("vectors", "algorithms"), are kept; a single word is only replaced by a keyword within a
+few letter edits of it (relative to the keyword's length), and a common English word only
+by a keyword with the same phonetic key. Live captions pass a time budget; once it is spent
+the rest of the text is left as is. Timed words are corrected the same way, the words of a
+replaced window merged into one that keeps their start and end.
+"""
+
+import re
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Optional
+
+import config
+from services.common_words import COMMON_WORDS, load_wordlist
+
+_WORD = re.compile(r"[A-Za-z0-9']+")
+# Text allowed between the words of one window (no sentence punctuation)
+_JOINER = re.compile(r"[\s-]*")
+_SUBSTITUTIONS = (
+    ("sch", "X"), ("tch", "X"), ("ch", "X"), ("sh", "X"), ("th", "0"), ("ph", "f"),
+    ("gh", ""), ("ck", "k"), ("dg", "j"), ("wh", "w"), ("qu", "kw"),
+)
+_VOWELS = frozenset("aeiou")
+# Inflectional endings stripped to find a word's base form, with what replaces them
+_SUFFIXES = (("ies", "y"), ("ied", "y"), ("ing", ""), ("ing", "e"), ("es", ""), ("ed", ""), ("ed", "e"), ("s", ""))
+# Single-word windows shorter than this (in letters), and windows with more words than the
+# keyword, need a closer spelling match
+_SHORT_WINDOW = 6
+_STRICT_MIN_SIMILARITY = 0.8
+# A single-word window may differ from the keyword by one letter edit per this many letters
+_LETTERS_PER_EDIT = 4
+_MAX_TOLERANCE = 2
+_MEMO_SIZE = 4096
+_COMMON_WORDS = (
+    COMMON_WORDS | load_wordlist(config.CORRECTION_WORDLIST, config.CORRECTION_WORDLIST_TOP)
+    if config.CORRECTION_WORDLIST
+    else COMMON_WORDS
+)
+
+
+def phonetic(word: str) -> str:
+    """Simplified Metaphone code: consonant sounds (and a leading vowel) of the word's letters."""
+    w = "".join(c for c in word.lower() if "a" <= c <= "z")
+    if not w:
+        return ""
+    if w[:2] in ("kn", "gn", "pn", "wr", "ae"):
+        w = w[1:]
+    if w[0] == "x":
+        w = "s" + w[1:]
+    for old, new in _SUBSTITUTIONS:
+        w = w.replace(old, new)
+    code = []
+    for i, c in enumerate(w):
+        nxt = w[i + 1] if i + 1 < len(w) else ""
+        if c in _VOWELS:
+            out = "A" if i == 0 else ""
+        elif c == "c":
+            out = "S" if nxt in ("e", "i", "y") else "K"
+        elif c == "g":
+            out = "J" if nxt in ("e", "i", "y") else "K"
+        elif c in ("y", "w", "h"):
+            out = c.upper() if i == 0 and nxt in _VOWELS else ""
+        else:
+            out = {"q": "K", "x": "KS", "z": "S", "v": "F"}.get(c, c.upper())
+        if out and not (code and code[-1] == out):
+            code.append(out)
+    return "".join(code)
+
+
+def _distance(a: str, b: str) -> int:
+    """Levenshtein distance."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+class _BKTree:
+    """Phonetic key -> keyword indexes, searchable within an edit distance."""
+
+    def __init__(self) -> None:
+        self._root: Optional[list] = None  # [key, indexes, {distance: child}]
+
+    def add(self, key: str, index: int) -> None:
+        if self._root is None:
+            self._root = [key, [index], {}]
+            return
+        node = self._root
+        while True:
+            d = _distance(key, node[0])
+            if d == 0:
+                node[1].append(index)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [key, [index], {}]
+                return
+            node = child
+
+    def search(self, key: str, tolerance: int) -> list[tuple[int, int]]:
+        """(distance, keyword index) for keys within tolerance."""
+        found: list[tuple[int, int]] = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            d = _distance(key, node[0])
+            if d <= tolerance:
+                found.extend((d, index) for index in node[1])
+            for edge, child in node[2].items():
+                if d - tolerance <= edge <= d + tolerance:
+                    stack.append(child)
+        return found
+
+
+def _tolerance(a: str, b: str) -> int:
+    """Edit distance allowed between two phonetic keys, by the longer one's length."""
+    longest = max(len(a), len(b))
+    return 0 if longest <= 3 else 1 if longest <= 5 else 2
+
+
+def _letters(text: str) -> str:
+    return "".join(c for c in text.lower() if c.isalnum())
+
+
+def _spelling(text: str) -> str:
+    """Case-folded text with hyphens as spaces and whitespace collapsed."""
+    return " ".join(text.lower().replace("-", " ").split())
+
+
+def _base_forms(spelling: str) -> list[str]:
+    """The spelling, then with its last word's inflectional ending (s/es/ed/ing...) stripped."""
+    forms = [spelling]
+    for suffix, replacement in _SUFFIXES:
+        if spelling.endswith(suffix) and len(spelling.rsplit(" ", 1)[-1]) > len(suffix) + 2:
+            forms.append(spelling[: -len(suffix)] + replacement)
+    return forms
+
+
+def _is_common(word: str) -> bool:
+    """Whether the word, or its base form, is a frequent English word."""
+    return any(form in _COMMON_WORDS for form in _base_forms(word.lower()))
+
+
+class KeywordCorrector:
+    def __init__(self, keywords: list[str]) -> None:
+        self.keywords: list[str] = []
+        self._keys: list[str] = []
+        self._letters: list[str] = []
+        self._word_counts: list[int] = []
+        self._tree = _BKTree()
+        self.max_words = 1
+        for keyword in keywords:
+            words = _WORD.findall(keyword)
+            key = "".join(phonetic(w) for w in words)
+            if len(key) < 3:
+                continue  # too short to match by sound without false positives
+            self._tree.add(key, len(self.keywords))
+            self.keywords.append(keyword.strip())
+            self._keys.append(key)
+            self._letters.append(_letters(keyword))
+            self._word_counts.append(len(words))
+            self.max_words = max(self.max_words, len(words) + 1)
+        self._exact = {_spelling(keyword) for keyword in self.keywords}
+        # Window key -> (keyword index, key distance) that sound close enough (the same words recur constantly)
+        self._sounds_like: dict[str, tuple[tuple[int, int], ...]] = {}
+
+    def _candidates(self, key: str) -> tuple[tuple[int, int], ...]:
+        found = self._sounds_like.get(key)
+        if found is None:
+            found = tuple(
+                (index, d)
+                for d, index in self._tree.search(key, _MAX_TOLERANCE)
+                if d <= _tolerance(key, self._keys[index])
+            )
+            if len(self._sounds_like) >= _MEMO_SIZE:
+                self._sounds_like.clear()
+            self._sounds_like[key] = found
+        return found
+
+    def _best(self, letters: str, key: str, n_words: int, common: bool = False) -> tuple[Optional[int], float]:
+        """
+        Closest-spelled keyword that sounds like the window, and its similarity (0-1). A single
+        word must be within a few letter edits of the keyword; a common one only matches
+        keywords with the same key, at the strict similarity.
+        """
+        candidates = self._candidates(key)
+        if not candidates:
+            return None, 0.0
+        best, best_score = None, 0.0
+        for index, d in candidates:
+            if common and d > 0:
+                continue
+            min_similarity = config.CORRECTION_MIN_SIMILARITY
+            if common or (n_words == 1 and len(letters) < _SHORT_WINDOW) or n_words > self._word_counts[index]:
+                min_similarity = max(min_similarity, _STRICT_MIN_SIMILARITY)
+            target = self._letters[index]
+            # ratio() can't exceed this; skip the full comparison when it can't qualify
+            if 2 * min(len(letters), len(target)) / (len(letters) + len(target)) < max(min_similarity, best_score):
+                continue
+            # One misheard word is a misspelling of the keyword, not another word that sounds alike
+            if n_words == 1 and _distance(letters, target) > max(1, len(target) // _LETTERS_PER_EDIT):
+                continue
+            score = SequenceMatcher(None, letters, target).ratio()
+            if score >= min_similarity and score > best_score:
+                best, best_score = index, score
+        return best, best_score
+
+    def _choose(self, text: str, budget_ms: Optional[float]) -> tuple[list[re.Match], list[tuple[int, int, int]], bool]:
+        """
+        The text's word tokens, the windows to replace as (first token, words, keyword index)
+        in text order, and whether the budget ran out. Every window of up to max_words words
+        is scored; the best-scoring windows win, without overlapping, and windows already
+        spelled like a keyword (ignoring case, hyphens and inflection of the last word) are kept.
+        """
+        deadline = time.perf_counter() + budget_ms / 1000 if budget_ms is not None else None
+        tokens = list(_WORD.finditer(text))
+        codes = [phonetic(t.group()) for t in tokens]
+        # joined[k]: tokens k and k + 1 may be in one window
+        joined = [bool(_JOINER.fullmatch(text[a.end() : b.start()])) for a, b in zip(tokens, tokens[1:])]
+        # (score, -words, first token, words, keyword index or None to keep the text)
+        found: list[tuple[float, int, int, int, Optional[int]]] = []
+        exceeded = False
+        for i in range(len(tokens)):
+            if deadline is not None and time.perf_counter() > deadline:
+                exceeded = True
+                break
+            for n in range(1, min(self.max_words, len(tokens) - i) + 1):
+                last = i + n - 1
+                if n > 1 and not joined[last - 1]:
+                    break
+                window = text[tokens[i].start() : tokens[last].end()]
+                if any(form in self._exact for form in _base_forms(_spelling(window))):
+                    found.append((2.0, -n, i, n, None))
+                    continue
+                letters = _letters(window)
+                key = "".join(codes[i : i + n])
+                if len(key) < 3:
+                    continue
+                index, score = self._best(letters, key, n, n == 1 and _is_common(tokens[i].group()))
+                if index is not None:
+                    found.append((score, -n, i, n, index))
+        taken = [False] * len(tokens)
+        chosen: list[tuple[int, int, int]] = []
+        for _, _, i, n, index in sorted(found, reverse=True):
+            if any(taken[i : i + n]):
+                continue
+            taken[i : i + n] = [True] * n
+            if index is not None:
+                chosen.append((i, n, index))
+        return tokens, sorted(chosen), exceeded
+
+    def correct(self, text: str, budget_ms: Optional[float] = None) -> tuple[str, int, bool]:
+        """(corrected text, number of replacements, whether the budget ran out)."""
+        if not self.keywords or not text:
+            return text, 0, False
+        tokens, chosen, exceeded = self._choose(text, budget_ms)
+        pieces: list[str] = []
+        pos = 0
+        for i, n, index in chosen:
+            start, end = tokens[i].start(), tokens[i + n - 1].end()
+            pieces.append(text[pos:start])
+            pieces.append(self.keywords[index])
+            pos = end
+        pieces.append(text[pos:])
+        return "".join(pieces), len(chosen), exceeded
+
+    def correct_words(self, words: list[dict], budget_ms: Optional[float] = None) -> tuple[list[dict], int, bool]:
+        """
+        Like correct() over timed words ({word, start, end}), joined with spaces: the words a
+        replacement touches become one word with the first one's start and the last one's end.
+        """
+        if not self.keywords or not words:
+            return words, 0, False
+        text = " ".join(w["word"] for w in words)
+        tokens, chosen, exceeded = self._choose(text, budget_ms)
+        if not chosen:
+            return words, 0, exceeded
+        starts: list[int] = []
+        pos = 0
+        for w in words:
+            starts.append(pos)
+            pos += len(w["word"]) + 1
+        # [first word, last word, [(start, end, keyword)]]; replacements touching a word are merged
+        groups: list[list] = []
+        for i, n, index in chosen:
+            start, end = tokens[i].start(), tokens[i + n - 1].end()
+            first, last = bisect_right(starts, start) - 1, bisect_right(starts, end - 1) - 1
+            if groups and first <= groups[-1][1]:
+                groups[-1][1] = max(groups[-1][1], last)
+                groups[-1][2].append((start, end, self.keywords[index]))
+            else:
+                groups.append([first, last, [(start, end, self.keywords[index])]])
+        out: list[dict] = []
+        done = 0
+        for first, last, replacements in groups:
+            out.extend(words[done:first])
+            pieces: list[str] = []
+            pos = starts[first]
+            for start, end, keyword in replacements:
+                pieces.append(text[pos:start])
+                pieces.append(keyword)
+                pos = end
+            pieces.append(text[pos : starts[last] + len(words[last]["word"])])
+            out.append({**words[first], "word": "".join(pieces), "end": words[last]["end"]})
+            done = last + 1
+        out.extend(words[done:])
+        return out, len(chosen), exceeded
+
+
+# Correctors by keyword list, most recently used last
+_correctors: "OrderedDict[tuple[str, ...], KeywordCorrector]" = OrderedDict()
+_MAX_CORRECTORS = 256
+_stats = {"texts": 0, "words": 0, "corrections": 0, "budget_exceeded": 0, "seconds": 0.0}
+
+
+def get_corrector(keywords: Optional[list[str]]) -> Optional[KeywordCorrector]:
+    """Corrector indexed over this keyword list (built on first use), or None without keywords."""
+    if not keywords or not config.CORRECTION_ENABLED:
+        return None
+    key = tuple(keywords)
+    corrector = _correctors.get(key)
+    if corrector is None:
+        corrector = _correctors[key] = KeywordCorrector(list(keywords))
+        if len(_correctors) > _MAX_CORRECTORS:
+            _correctors.popitem(last=False)
+    else:
+        _correctors.move_to_end(key)
+    return corrector
+
+
+def correct(corrector: Optional[KeywordCorrector], text: str, budget_ms: Optional[float] = None) -> str:
+    """Corrected text (unchanged without a corrector); counted in stats()."""
+    if corrector is None or not text:
+        return text
+    t0 = time.perf_counter()
+    corrected, replaced, exceeded = corrector.correct(text, budget_ms)
+    _stats["seconds"] += time.perf_counter() - t0
+    _stats["texts"] += 1
+    _stats["words"] += text.count(" ") + 1
+    _stats["corrections"] += replaced
+    _stats["budget_exceeded"] += exceeded
+    return corrected
+
+
+def correct_segments(corrector: Optional[KeywordCorrector], segments: list[dict]) -> list[dict]:
+    """Segments with corrected transcripts and words (new dicts; replaced words keep their timings)."""
+    if corrector is None:
+        return segments
+    return [
+        {**seg, "transcript": correct(corrector, seg["transcript"]), "words": corrector.correct_words(seg["words"])[0]}
+        for seg in segments
+    ]
+
+
+def correct_result(corrector: Optional[KeywordCorrector], result: tuple) -> tuple:
+    """asr_service (transcript, confidence, words, segments) with transcript, segments and words corrected."""
+    if corrector is None:
+        return result
+    transcript, confidence, words, segments = result
+    segments = correct_segments(corrector, segments)
+    # The flat word list is the segments' words in order (see asr_service and audio_chunking.stitch)
+    if segments:
+        words = [w for seg in segments for w in seg["words"]]
+    else:
+        words = corrector.correct_words(words)[0]
+    return correct(corrector, transcript), confidence, words, segments
+
+
+def stats() -> dict:
+    words = _stats["words"]
+    return {
+        "texts": _stats["texts"],
+        "corrections": _stats["corrections"],
+        "budget_exceeded": _stats["budget_exceeded"],
+        "us_per_word": round(_stats["seconds"] * 1e6 / words, 2) if words else None,
+    }
@@ -0,0 +1,98 @@
+"""
+Lean spaCy keyword engine.
+Loads only the components POS tagging needs (tok2vec, tagger, attribute_ruler) and streams
+text through nlp.pipe in line-aligned chunks, counting candidates as each chunk is tagged,
+so memory stays flat and spaCy's max_length is never hit.
+"""
+
+from collections import Counter
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+import config
+
+if TYPE_CHECKING:
+    import spacy
+
+MODEL_NAME = "en_core_web_sm"
+# Not needed for token.pos_: dependency parse, entities and lemmas
+EXCLUDED_COMPONENTS = ("parser", "ner", "lemmatizer")
+KEYWORD_POS = ("NOUN", "PROPN")
+
+_nlp: Optional["spacy.Language"] = None
+
+
+def get_nlp() -> "spacy.Language":
+    global _nlp
+    if _nlp is None:
+        import spacy
+
+        _nlp = spacy.load(MODEL_NAME, exclude=list(EXCLUDED_COMPONENTS))
+    return _nlp
+
+
+def is_loaded() -> bool:
+    return _nlp is not None
+
+
+def iter_chunks(texts: Iterable[str], max_chars: int) -> Iterator[str]:
+    """
+    Regroup texts into chunks of at most max_chars, splitting only at line breaks
+    (or whitespace for single over-long lines) so tokens are never cut in half.
+    """
+    buf: list[str] = []
+    size = 0
+    for text in texts:
+        for line in text.splitlines(keepends=True):
+            while len(line) > max_chars:
+                cut = line.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if buf:
+                    yield "".join(buf)
+                    buf, size = [], 0
+                yield line[:cut]
+                line = line[cut:]
+            if size + len(line) > max_chars and buf:
+                yield "".join(buf)
+                buf, size = [], 0
+            buf.append(line)
+            size += len(line)
+        # Texts are joined with a space in the original single-document pass
+        buf.append(" ")
+        size += 1
+    if buf:
+        chunk = "".join(buf)
+        if chunk.strip():
+            yield chunk
+
+
+def count_keywords(
+    texts: Iterable[str],
+    filler_terms: frozenset[str],
+    min_length: int = 5,
+    n_process: Optional[int] = None,
+) -> Counter[str]:
+    """
+    Frequencies of NOUN/PROPN tokens that are alphabetic, at least min_length long
+    and not filler, over all texts. Chunks are tagged with nlp.pipe and discarded
+    as soon as they are counted.
+    """
+    nlp = get_nlp()
+    counts: Counter[str] = Counter()
+    chunks = iter_chunks(texts, min(config.KEYWORD_CHUNK_CHARS, nlp.max_length))
+    for doc in nlp.pipe(
+        chunks,
+        batch_size=config.KEYWORD_PIPE_BATCH_SIZE,
+        n_process=n_process or config.KEYWORD_PIPE_PROCESSES,
+    ):
+        for token in doc:
+            if token.pos_ not in KEYWORD_POS:
+                continue
+            word = token.text.strip().lower()
+            if len(word) < min_length:
+                continue
+            if not word.isalpha():
+                continue
+            if word in filler_terms:
+                continue
+            counts[word] += 1
+    return counts
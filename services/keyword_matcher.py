@@ -0,0 +1,146 @@
+"""
+Find a session's keywords in captions and transcript segments.
+Each session's keyword list (single words and phrases) is compiled once into an
+Aho-Corasick automaton; find() then reports every keyword occurrence in one left-to-right
+pass over the text, case-insensitively and only on word boundaries, as non-overlapping
+{start, end, keyword} character spans (longest match wins). Matchers are cached by keyword
+list; hits on final text are counted per session.
+"""
+
+from collections import Counter, OrderedDict, deque
+from typing import Optional
+
+
+def _symbols(text: str) -> list[str]:
+    """One case-folded symbol per character (so spans index the original text); whitespace -> ' '."""
+    return [" " if c.isspace() else c.lower() for c in text]
+
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: list[str]) -> None:
+        self.keywords: list[str] = []
+        self._lengths: list[int] = []
+        # Trie as per-state transition dicts; state 0 is the root
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Keyword indexes ending at each state, including those reached through fail links
+        self._out: list[list[int]] = [[]]
+        seen = set()
+        for keyword in keywords:
+            pattern = _symbols(" ".join(keyword.split()))
+            if not pattern or tuple(pattern) in seen:
+                continue
+            seen.add(tuple(pattern))
+            self._insert(pattern, len(self.keywords))
+            self.keywords.append(keyword.strip())
+            self._lengths.append(len(pattern))
+        self._link()
+
+    def _insert(self, pattern: list[str], index: int) -> None:
+        state = 0
+        for symbol in pattern:
+            nxt = self._goto[state].get(symbol)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][symbol] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(index)
+
+    def _link(self) -> None:
+        """Breadth-first fail links; each state's outputs absorb its fail state's."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and symbol not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(symbol, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> list[dict]:
+        """Non-overlapping keyword spans in text: [{start, end, keyword}], end exclusive, by start."""
+        if not self.keywords or not text:
+            return []
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        n = len(text)
+        # start -> longest keyword index matched there
+        best: dict[int, int] = {}
+        state = 0
+        for i, symbol in enumerate(_symbols(text)):
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            if end < n and _is_word_char(text[end]) and _is_word_char(text[i]):
+                continue
+            for index in out[state]:
+                start = end - lengths[index]
+                if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+                    continue
+                current = best.get(start)
+                if current is None or lengths[index] > lengths[current]:
+                    best[start] = index
+        spans = []
+        covered = 0
+        for start in sorted(best):
+            if start < covered:
+                continue
+            index = best[start]
+            covered = start + lengths[index]
+            spans.append({"start": start, "end": covered, "keyword": self.keywords[index]})
+        return spans
+
+
+# Compiled matchers by keyword list, most recently used last (sessions from one syllabus share one)
+_matchers: "OrderedDict[tuple[str, ...], KeywordMatcher]" = OrderedDict()
+_MAX_MATCHERS = 256
+_hits: dict[str, Counter] = {}
+
+
+def get_matcher(keywords: Optional[list[str]]) -> Optional[KeywordMatcher]:
+    """Compiled matcher for this keyword list (compiled on first use), or None without keywords."""
+    if not keywords:
+        return None
+    key = tuple(keywords)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = KeywordMatcher(list(keywords))
+        if len(_matchers) > _MAX_MATCHERS:
+            _matchers.popitem(last=False)
+    else:
+        _matchers.move_to_end(key)
+    return matcher
+
+
+def record_hits(session_id: str, spans: list[dict]) -> None:
+    if spans:
+        _hits.setdefault(session_id, Counter()).update(span["keyword"] for span in spans)
+
+
+def match_segments(matcher: Optional[KeywordMatcher], segments: list[dict]) -> list[list[dict]]:
+    """Spans for each segment's transcript."""
+    if matcher is None:
+        return [[] for _ in segments]
+    return [matcher.find(seg["transcript"]) for seg in segments]
+
+
+def hits(session_id: str) -> dict[str, int]:
+    """Keyword -> times heard in final captions and transcribed segments, most frequent first."""
+    counter = _hits.get(session_id)
+    return dict(counter.most_common()) if counter else {}
+
+
+def discard(session_id: str) -> None:
+    _hits.pop(session_id, None)
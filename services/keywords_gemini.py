@@ -1,21 +1,58 @@
 """
 Optional: extract keywords using the Gemini API (google-genai package).
 Used when GEMINI_API_KEY is set in api.env.
+
+Calls are async on one shared client, hedged across models and bounded by a total
+latency budget; long documents are map-reduced over page chunks. Callers fall back
+to spaCy when this returns [].
 """
 
+import asyncio
 import json
 import re
-from typing import Optional
+import time
+from typing import NamedTuple, Optional
 
 import config
+from services import metrics
+
+# Use stable model IDs from https://ai.google.dev/gemini-api/docs/models (gemini-1.5-flash is deprecated/removed)
+MODEL_NAMES: tuple[str, ...] = (
+    "gemini-2.5-flash",
+    "gemini-2.0-flash",
+    "gemini-2.5-flash-lite",
+    "gemini-2.0-flash-lite",
+)
 
 _GEMINI_AVAILABLE: Optional[bool] = None
-_LAST_ERROR: Optional[str] = None
+_client = None
+# model -> counters; replaces the old single last-error string
+_stats: dict[str, dict] = {}
+
 
+def _model_stats(model_name: str) -> dict:
+    st = _stats.get(model_name)
+    if st is None:
+        st = _stats[model_name] = {
+            "calls": 0,
+            "ok": 0,
+            "errors": 0,
+            "hedged": 0,
+            "cancelled": 0,
+            "timeouts": 0,
+            "latency_ms_total": 0.0,
+            "last_error": None,
+        }
+    return st
 
-def get_last_error() -> Optional[str]:
-    """Return the last error message from Gemini extraction (for debugging)."""
-    return _LAST_ERROR
+
+def get_stats() -> dict:
+    """Per-model call, error, timeout and latency stats (avg_latency_ms over successful calls)."""
+    out = {}
+    for model_name, st in _stats.items():
+        avg = st["latency_ms_total"] / st["ok"] if st["ok"] else None
+        out[model_name] = {**st, "avg_latency_ms": round(avg, 1) if avg is not None else None}
+    return out
 
 
 def _gemini_available() -> bool:
@@ -26,14 +63,49 @@ def _gemini_available() -> bool:
         _GEMINI_AVAILABLE = False
         return False
     try:
-        from google import genai  # type: ignore
-        genai.Client(api_key=config.GEMINI_API_KEY)
+        from google import genai  # type: ignore  # noqa: F401
         _GEMINI_AVAILABLE = True
-    except Exception:
+    except ImportError:
         _GEMINI_AVAILABLE = False
     return _GEMINI_AVAILABLE
 
 
+def is_configured() -> bool:
+    return bool(config.USE_GEMINI_KEYWORDS and config.GEMINI_API_KEY)
+
+
+def _get_client():
+    """Shared genai.Client (one connection pool for all models and requests)."""
+    global _client
+    if _client is None:
+        from google import genai  # type: ignore
+        from google.genai import types  # type: ignore
+
+        http_options = None
+        if config.GEMINI_BASE_URL:
+            http_options = types.HttpOptions(base_url=config.GEMINI_BASE_URL)
+        _client = genai.Client(api_key=config.GEMINI_API_KEY, http_options=http_options)
+    return _client
+
+
+def warm() -> None:
+    """Import google-genai and create the shared client ahead of the first upload (no-op without a key)."""
+    if _gemini_available():
+        _get_client()
+
+
+def is_warm() -> bool:
+    return _client is not None
+
+
+async def aclose() -> None:
+    """Close the shared client (call on app shutdown)."""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aio.aclose()
+
+
 def _get_response_text(response) -> Optional[str]:
     """Get generated text from response (handles both .text and candidates[].content.parts)."""
     if response is None:
@@ -55,29 +127,8 @@ def _get_response_text(response) -> Optional[str]:
     return None
 
 
-def extract_keywords_gemini(
-    text: str,
-    max_keywords: int = 50,
-) -> list[str]:
-    """
-    Use Gemini to extract technical terms and phrases from text, suitable for
-    speech recognition keyword biasing. Returns a list of strings (words and short phrases).
-    Returns [] if API key is missing, package not installed, or on error.
-    """
-    global _LAST_ERROR
-    _LAST_ERROR = None
-    if not text or not text.strip():
-        return []
-    if not _gemini_available():
-        return []
-    try:
-        from google import genai  # type: ignore
-        from google.genai import types  # type: ignore
-    except ImportError as e:
-        _LAST_ERROR = f"Import error: {e}. Run: pip install google-genai"
-        return []
-
-    prompt = f"""You are helping prepare a keyword list for speech-to-text (ASR) biasing.
+def _build_prompt(text: str, max_keywords: int) -> str:
+    return f"""You are helping prepare a keyword list for speech-to-text (ASR) biasing.
 Extract from the following syllabus/lecture text the most important technical terms.
 You MUST include BOTH:
 1. Single-word terms (real words the lecturer will say): e.g. "graph", "neural", "equivariant", "diffusion", "protein", "eigenvalue"
@@ -91,40 +142,242 @@ Maximum {max_keywords} items. Mix single words and phrases. Example: ["graph", "
 
 Text:
 ---
-{text[:30000]}
+{text[:config.GEMINI_CHUNK_CHARS]}
 ---"""
 
-    # Use stable model IDs from https://ai.google.dev/gemini-api/docs/models (gemini-1.5-flash is deprecated/removed)
-    for model_name in ("gemini-2.5-flash", "gemini-2.0-flash", "gemini-2.5-flash-lite", "gemini-2.0-flash-lite"):
-        try:
-            client = genai.Client(api_key=config.GEMINI_API_KEY)
-            response = client.models.generate_content(
-                model=model_name,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.2,
-                    max_output_tokens=2048,
-                ),
+
+def _parse_keywords(raw: Optional[str], max_keywords: int) -> list[str]:
+    """Parse the model's JSON array into lowercase keywords. Raises ValueError if unusable."""
+    if not raw:
+        raise ValueError("empty response")
+    if raw.startswith("```"):
+        raw = re.sub(r"^```(?:json)?\s*", "", raw)
+        raw = re.sub(r"\s*```$", "", raw)
+    data = json.loads(raw)
+    if not isinstance(data, list):
+        raise ValueError("response is not a JSON array")
+    result = []
+    for item in data:
+        if isinstance(item, str) and item.strip():
+            result.append(item.strip().lower())
+        if len(result) >= max_keywords:
+            break
+    if not result:
+        raise ValueError("no keywords in response")
+    return result
+
+
+async def _call_model(model_name: str, prompt: str, max_keywords: int) -> list[str]:
+    from google.genai import types  # type: ignore
+
+    st = _model_stats(model_name)
+    st["calls"] += 1
+    t0 = time.perf_counter()
+    try:
+        response = await _get_client().aio.models.generate_content(
+            model=model_name,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                temperature=0.2,
+                max_output_tokens=2048,
+            ),
+        )
+        keywords = _parse_keywords(_get_response_text(response), max_keywords)
+    except asyncio.CancelledError:
+        st["cancelled"] += 1
+        metrics.GEMINI_CALLS.labels(model_name, "cancelled").observe(time.perf_counter() - t0)
+        raise
+    except json.JSONDecodeError as e:
+        st["errors"] += 1
+        st["last_error"] = f"Gemini returned invalid JSON: {e}"
+        metrics.GEMINI_CALLS.labels(model_name, "error").observe(time.perf_counter() - t0)
+        raise
+    except Exception as e:
+        st["errors"] += 1
+        st["last_error"] = f"Gemini error: {e}"
+        metrics.GEMINI_CALLS.labels(model_name, "error").observe(time.perf_counter() - t0)
+        raise
+    st["ok"] += 1
+    st["latency_ms_total"] += (time.perf_counter() - t0) * 1000
+    metrics.GEMINI_CALLS.labels(model_name, "ok").observe(time.perf_counter() - t0)
+    return keywords
+
+
+async def _extract_hedged(
+    text: str,
+    max_keywords: int,
+    deadline: float,
+    hedge: float,
+    semaphore: asyncio.Semaphore,
+) -> list[str]:
+    """
+    One prompt, hedged across models: the first model in MODEL_NAMES is asked first; if it
+    has not answered within hedge seconds, or fails, the next one is started as well, and
+    the first valid JSON list wins. Returns [] if every model fails or the deadline passes.
+    Each model call holds semaphore while it runs, hedges included.
+    """
+    prompt = _build_prompt(text, max_keywords)
+    loop = asyncio.get_running_loop()
+    models = iter(MODEL_NAMES)
+    pending: dict[asyncio.Task, str] = {}
+
+    def launch(hedged: bool) -> bool:
+        model_name = next(models, None)
+        if model_name is None:
+            return False
+        if hedged:
+            _model_stats(model_name)["hedged"] += 1
+        task = asyncio.create_task(call(model_name))
+        pending[task] = model_name
+        return True
+
+    async def call(model_name: str) -> list[str]:
+        async with semaphore:
+            return await _call_model(model_name, prompt, max_keywords)
+
+    launch(hedged=False)
+    more = True
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                for model_name in pending.values():
+                    _model_stats(model_name)["timeouts"] += 1
+                break
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=min(hedge, remaining) if more else remaining,
+                return_when=asyncio.FIRST_COMPLETED,
             )
-            raw = _get_response_text(response)
-            if not raw:
+            if not done:
+                if more and loop.time() < deadline:
+                    more = launch(hedged=True)
                 continue
-            if raw.startswith("```"):
-                raw = re.sub(r"^```(?:json)?\s*", "", raw)
-                raw = re.sub(r"\s*```$", "", raw)
-            data = json.loads(raw)
-            if not isinstance(data, list):
-                continue
-            result = []
-            for item in data:
-                if isinstance(item, str) and item.strip():
-                    result.append(item.strip().lower())
-                if len(result) >= max_keywords:
-                    break
-            return result
-        except json.JSONDecodeError as e:
-            _LAST_ERROR = f"Gemini returned invalid JSON ({model_name}): {e}"
-        except Exception as e:
-            _LAST_ERROR = f"Gemini error ({model_name}): {e}"
-            continue
+            # Retrieve every finished task's exception, even when another one won
+            winner = None
+            for task in done:
+                pending.pop(task)
+                if task.exception() is None:
+                    if winner is None:
+                        winner = task.result()
+                # Failed: replace it right away instead of waiting for the hedge delay
+                elif more and winner is None:
+                    more = launch(hedged=True)
+            if winner is not None:
+                return winner
+    finally:
+        for task in pending:
+            if task.done():
+                if not task.cancelled():
+                    task.exception()  # finished after the last wait; mark its error retrieved
+            else:
+                task.cancel()
     return []
+
+
+def chunk_pages(pages: list[str], max_chars: int) -> list[str]:
+    """
+    Group consecutive pages into prompt-sized chunks of at most max_chars, breaking only
+    between pages; a single page longer than max_chars is split at whitespace.
+    """
+    chunks: list[str] = []
+    buf: list[str] = []
+    size = 0
+    for page in pages:
+        page = page.strip()
+        if not page:
+            continue
+        if len(page) > max_chars and buf:
+            chunks.append(" ".join(buf))
+            buf, size = [], 0
+        while len(page) > max_chars:
+            cut = page.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(page[:cut])
+            page = page[cut:].lstrip()
+        if buf and size + 1 + len(page) > max_chars:
+            chunks.append(" ".join(buf))
+            buf, size = [], 0
+        buf.append(page)
+        size += len(page) + 1
+    if buf:
+        chunks.append(" ".join(buf))
+    return chunks
+
+
+def fuse_rankings(rankings: list[list[str]], max_keywords: int, k: int = 60) -> list[str]:
+    """
+    Reciprocal rank fusion: each keyword scores sum(1 / (k + rank)) over the chunk lists it
+    appears in, so terms found in many chunks and near the top of each list win.
+    Ties keep first-seen order.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        seen: set[str] = set()
+        for rank, keyword in enumerate(ranking):
+            if keyword in seen:
+                continue
+            seen.add(keyword)
+            scores[keyword] = scores.get(keyword, 0.0) + 1.0 / (k + rank + 1)
+    ordered = sorted(scores.items(), key=lambda item: -item[1])
+    return [keyword for keyword, _ in ordered[:max_keywords]]
+
+
+class GeminiKeywords(NamedTuple):
+    keywords: list[str]
+    # False when some chunks got no answer (failed or out of budget); keywords then cover only part of the text
+    complete: bool
+
+
+async def extract_keywords_gemini_async(
+    text: str | list[str],
+    max_keywords: int = 50,
+    budget_ms: Optional[int] = None,
+    hedge_ms: Optional[int] = None,
+) -> GeminiKeywords:
+    """
+    Use Gemini to extract technical terms and phrases from text, suitable for
+    speech recognition keyword biasing. Returns a list of strings (words and short phrases).
+
+    text may be a list of pages. Documents longer than GEMINI_CHUNK_CHARS are split on page
+    boundaries; the chunks are sent concurrently and the per-chunk lists are merged with
+    fuse_rankings. Each chunk is hedged across models; at most GEMINI_MAX_CONCURRENCY API
+    calls, hedges included, are in flight at once.
+    keywords is [] if API key is missing, package not installed, every call fails, or the
+    total budget_ms runs out; complete is False if any chunk went unanswered, so the result
+    should not be cached as the document's keywords.
+    """
+    pages = [text] if isinstance(text, str) else text
+    chunks = chunk_pages(pages, config.GEMINI_CHUNK_CHARS)
+    if not chunks:
+        return GeminiKeywords([], True)
+    if not _gemini_available():
+        return GeminiKeywords([], False)
+    budget = (budget_ms if budget_ms is not None else config.GEMINI_BUDGET_MS) / 1000
+    hedge = (hedge_ms if hedge_ms is not None else config.GEMINI_HEDGE_MS) / 1000
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    semaphore = asyncio.Semaphore(max(1, config.GEMINI_MAX_CONCURRENCY))
+    if len(chunks) == 1:
+        keywords = await _extract_hedged(chunks[0], max_keywords, deadline, hedge, semaphore)
+        return GeminiKeywords(keywords, bool(keywords))
+
+    results = await asyncio.gather(
+        *(_extract_hedged(chunk, max_keywords, deadline, hedge, semaphore) for chunk in chunks)
+    )
+    answered = [r for r in results if r]
+    return GeminiKeywords(fuse_rankings(answered, max_keywords), len(answered) == len(results))
+
+
+def extract_keywords_gemini(
+    text: str | list[str],
+    max_keywords: int = 50,
+) -> list[str]:
+    """Blocking wrapper around extract_keywords_gemini_async (for scripts; not from a running loop)."""
+    async def _run() -> list[str]:
+        try:
+            return (await extract_keywords_gemini_async(text, max_keywords=max_keywords)).keywords
+        finally:
+            await aclose()
+
+    return asyncio.run(_run())
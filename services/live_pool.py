@@ -0,0 +1,205 @@
+"""
+Pre-warmed Deepgram live connections for /listen.
+When a session's keywords are ready, a live connection with those keywords is opened in the
+background and kept open with KeepAlive messages, so a student connecting to /listen gets an
+upstream socket whose TLS and WebSocket handshakes are already done. At most LIVE_POOL_MAX_IDLE
+connections sit idle (each for up to LIVE_POOL_IDLE_S); handing one out opens a replacement,
+and pre-warming for new keywords when the pool is full closes the longest-open idle one.
+Time-to-first-caption is recorded separately for warm and cold connections.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from typing import Any, Optional
+
+import config
+from services import session_store
+from services.audio_pipeline import CLIENT_SAMPLE_RATE, resampled_rate
+
+logger = logging.getLogger(__name__)
+
+# options key -> idle (opened_at, connection), oldest first
+_idle: dict[tuple, deque[tuple[float, Any]]] = {}
+_opening = 0
+_tasks: set[asyncio.Task] = set()
+_keepalive_task: Optional[asyncio.Task] = None
+_dg: Any = None
+_handoffs = {"warm": 0, "cold": 0}
+_evicted = 0
+_first_caption: dict[str, deque[float]] = {"warm": deque(maxlen=500), "cold": deque(maxlen=500)}
+
+
+def live_options(keywords: list[str], sample_rate: int = CLIENT_SAMPLE_RATE) -> dict:
+    """Deepgram live options for a client sending linear16 at sample_rate (after resampling)."""
+    options = {
+        "punctuate": True,
+        "interim_results": True,
+        "smart_format": True,
+        "encoding": "linear16",
+        "sample_rate": resampled_rate(sample_rate),
+    }
+    if keywords:
+        options["keywords"] = list(keywords)
+    return options
+
+
+def _key(options: dict) -> tuple:
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in options.items()))
+
+
+def _get_client() -> Any:
+    global _dg
+    if _dg is None:
+        from deepgram import Deepgram
+
+        opts = {"api_key": config.DEEPGRAM_API_KEY}
+        if config.DEEPGRAM_BASE_URL:
+            opts["api_url"] = config.DEEPGRAM_BASE_URL.rstrip("/")
+        _dg = Deepgram(opts)
+    return _dg
+
+
+def _enabled() -> bool:
+    return bool(config.DEEPGRAM_API_KEY) and config.LIVE_POOL_MAX_IDLE > 0
+
+
+def _idle_count() -> int:
+    return sum(len(pool) for pool in _idle.values())
+
+
+def _evict_oldest(keep: tuple) -> bool:
+    """Close the longest-open idle connection with other options than keep; False if there is none."""
+    global _evicted
+    candidates = [(pool[0][0], key) for key, pool in _idle.items() if key != keep and pool]
+    if not candidates:
+        return False
+    _, key = min(candidates, key=lambda c: c[0])
+    _, conn = _idle[key].popleft()
+    if not _idle[key]:
+        del _idle[key]
+    _evicted += 1
+    _spawn_close(conn)
+    return True
+
+
+async def _fill(options: dict) -> None:
+    global _opening
+    if _idle_count() + _opening >= config.LIVE_POOL_MAX_IDLE and not _evict_oldest(_key(options)):
+        return
+    _opening += 1
+    try:
+        conn = await _get_client().transcription.live(options)
+    except Exception as e:
+        logger.warning("Pre-warming Deepgram live connection failed: %s", e)
+        return
+    finally:
+        _opening -= 1
+    _idle.setdefault(_key(options), deque()).append((time.monotonic(), conn))
+    _start_keepalive()
+
+
+def prewarm(keywords: list[str], sample_rate: int = CLIENT_SAMPLE_RATE) -> None:
+    """
+    Open an idle connection for these keywords in the background. A full pool makes room by
+    closing its longest-open connection, unless all of them are for these keywords already.
+    """
+    if not _enabled():
+        return
+    task = asyncio.create_task(_fill(live_options(keywords, sample_rate)))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def prewarm_session(session_id: str) -> None:
+    """Pre-warm a connection with the keywords session_store holds for session_id."""
+    prewarm(session_store.get_keywords(session_id))
+
+
+async def acquire(keywords: list[str], sample_rate: int = CLIENT_SAMPLE_RATE) -> tuple[Any, bool]:
+    """
+    A live connection for these keywords: a pre-warmed one if available (and a replacement is
+    opened in the background), else a new one. Returns (connection, warm).
+    """
+    options = live_options(keywords, sample_rate)
+    pool = _idle.get(_key(options))
+    while pool:
+        _, conn = pool.popleft()
+        if not conn.done:
+            _handoffs["warm"] += 1
+            prewarm(keywords, sample_rate)
+            return conn, True
+    _handoffs["cold"] += 1
+    return await _get_client().transcription.live(options), False
+
+
+async def _close(conn: Any) -> None:
+    try:
+        await asyncio.wait_for(conn.finish(), 5.0)
+    except Exception as e:
+        logger.debug("Closing idle Deepgram connection: %s", e)
+
+
+def _spawn_close(conn: Any) -> None:
+    task = asyncio.create_task(_close(conn))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def _start_keepalive() -> None:
+    global _keepalive_task
+    if _keepalive_task is None or _keepalive_task.done():
+        _keepalive_task = asyncio.create_task(_keepalive_loop())
+
+
+async def _keepalive_loop() -> None:
+    """Send KeepAlive on idle connections; drop closed ones and close those idle too long."""
+    while _idle:
+        await asyncio.sleep(config.LIVE_KEEPALIVE_S)
+        now = time.monotonic()
+        for key, pool in list(_idle.items()):
+            for entry in list(pool):
+                opened_at, conn = entry
+                if conn.done:
+                    pool.remove(entry)
+                elif now - opened_at > config.LIVE_POOL_IDLE_S:
+                    pool.remove(entry)
+                    _spawn_close(conn)
+                else:
+                    conn.keep_alive()
+            if not pool:
+                del _idle[key]
+
+
+def record_first_caption(seconds: float, warm: bool) -> None:
+    """Time from /listen accept to the first caption queued for the client."""
+    _first_caption["warm" if warm else "cold"].append(seconds)
+
+
+def stats() -> dict:
+    first_caption = {}
+    for kind, samples in _first_caption.items():
+        first_caption[kind] = {
+            "count": len(samples),
+            "p50_ms": round(statistics.median(samples) * 1000, 1) if samples else None,
+        }
+    return {
+        "idle": _idle_count(),
+        "opening": _opening,
+        "handoffs": dict(_handoffs),
+        "evicted": _evicted,
+        "first_caption": first_caption,
+    }
+
+
+async def aclose() -> None:
+    """Close idle connections (call on app shutdown)."""
+    global _keepalive_task
+    if _keepalive_task is not None:
+        _keepalive_task.cancel()
+        _keepalive_task = None
+    conns = [conn for pool in _idle.values() for _, conn in pool]
+    _idle.clear()
+    await asyncio.gather(*(_close(conn) for conn in conns))
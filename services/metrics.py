@@ -0,0 +1,243 @@
+"""
+Process-wide counters, gauges and histograms, rendered in the Prometheus text format.
+Recording is an in-process addition (plus a bisect for histograms) with no locks or I/O;
+record from the event loop only. Stats the services already keep (caches, job queue, live
+pool, ...) are not duplicated here: routers/metrics.py reads them when /metrics is scraped.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional, Union
+
+# Latency buckets in seconds, from sub-millisecond steps to slow upstream calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: list["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: dict[tuple, object] = {}
+        _registry.append(self)
+
+    @abstractmethod
+    def _new_child(self) -> object:
+        """A fresh value holder for one set of label values."""
+
+    def labels(self, *values: str):
+        """The child for these label values (create once and keep it on hot paths)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """Exposition lines for every child."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._children.items():
+            yield f"{self.name}{_labels(self.label_names, values)} {_number(child.value)}"
+
+
+class Gauge(_Metric):
+    """A settable value, or one read at scrape time from fn (a number, or {label values: number})."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        fn: Optional[Callable[[], Union[float, dict[tuple, float]]]] = None,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def _samples(self) -> Iterable[str]:
+        if self.fn is not None:
+            value = self.fn()
+            items = value.items() if isinstance(value, dict) else [((), value)]
+        else:
+            items = ((values, child.value) for values, child in self._children.items())
+        for values, number in items:
+            yield f"{self.name}{_labels(self.label_names, values)} {_number(number)}"
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot: above the largest bound
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, values, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, values)} {_number(child.sum)}"
+            yield f"{self.name}_count{_labels(self.label_names, values)} {cumulative}"
+
+
+def render(extra: Iterable[str] = ()) -> str:
+    """All registered metrics, then the extra pre-rendered blocks, as one text exposition."""
+    blocks = [metric.render() for metric in _registry]
+    blocks.extend(extra)
+    return "\n".join(blocks) + "\n"
+
+
+def render_stats(prefix: str, stats: dict, help: str, labels: Optional[dict[str, str]] = None) -> str:
+    """
+    A component's stats() dict as untyped samples: numeric leaves only (bools as 0/1), nested
+    keys joined with '_' into the name, e.g. {"hits": 3} -> prefix_hits 3.
+    """
+    return render_labeled_stats(prefix, [(labels or {}, stats)], help)
+
+
+def render_labeled_stats(prefix: str, stats_sets: Iterable[tuple[dict[str, str], dict]], help: str) -> str:
+    """
+    Like render_stats for several (labels, stats) pairs of one component, e.g. one per model:
+    samples are grouped by metric name so each family's HELP and TYPE appear once.
+    """
+    families: dict[str, list[str]] = {}
+
+    def walk(name: str, value: object, label_text: str) -> None:
+        if isinstance(value, dict):
+            for key, inner in value.items():
+                walk(f"{name}_{key}", inner, label_text)
+        elif isinstance(value, (bool, int, float)) and not (isinstance(value, float) and math.isnan(value)):
+            metric = "".join(c if c.isalnum() else "_" for c in name)
+            families.setdefault(metric, []).append(f"{metric}{label_text} {_number(float(value))}")
+
+    for labels, stats in stats_sets:
+        walk(prefix, stats, _labels(tuple(labels), tuple(labels.values())) if labels else "")
+    lines = []
+    for metric, samples in families.items():
+        lines.append(f"# HELP {metric} {help}")
+        lines.append(f"# TYPE {metric} untyped")
+        lines.extend(samples)
+    return "\n".join(lines)
+
+
+# --- Metrics recorded by the routers and services ---
+LIVE_ACTIVE = Gauge("listen_active_connections", "Open /listen presenter connections")
+LIVE_AUDIO_BYTES = Counter("listen_audio_bytes_total", "Client audio bytes received on /listen")
+LIVE_AUDIO_RATE = Histogram(
+    "listen_audio_bytes_per_second",
+    "Average client audio rate per /listen connection, observed at close",
+    buckets=(4000, 8000, 16000, 32000, 48000, 64000, 96000, 128000, 192000),
+)
+LIVE_CAPTION_LATENCY = Histogram(
+    "listen_caption_latency_seconds",
+    "From the client audio a caption ends at arriving to the caption being queued for the client",
+    labels=("kind",),
+)
+LIVE_INTERIM_TO_FINAL = Histogram(
+    "listen_interim_to_final_seconds", "From an utterance's first interim caption to its final"
+)
+LIVE_UPSTREAM_CONNECT = Histogram(
+    "deepgram_live_connect_seconds", "Time to get a Deepgram live connection", labels=("warm",)
+)
+DEEPGRAM_REQUESTS = Histogram(
+    "deepgram_request_seconds", "Prerecorded Deepgram request latency", labels=("outcome",)
+)
+GEMINI_CALLS = Histogram("gemini_call_seconds", "Gemini keyword call latency", labels=("model", "outcome"))
+PDF_STAGE = Histogram("pdf_stage_seconds", "PDF keyword pipeline time per stage", labels=("stage",))
+HTTP_REQUESTS = Histogram(
+    "http_request_duration_seconds", "HTTP request handling time", labels=("method", "route", "status")
+)
@@ -0,0 +1,210 @@
+"""
+Page-sharded PDF ingestion.
+Page ranges are extracted and scored in a process pool so large decks never block
+the event loop; merged keyword rankings are yielded as each shard finishes.
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Mapping, Optional
+
+import config
+from services import keyword_cache, keyword_engine, metrics, pdf_service
+from services.keywords_gemini import extract_keywords_gemini_async, fuse_rankings
+
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+_STAGES = {
+    stage: metrics.PDF_STAGE.labels(stage)
+    for stage in ("hash", "cache_hit", "page_count", "first_shard", "shards", "index", "gemini", "score", "total")
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=max(1, config.PDF_WORKERS))
+    return _executor
+
+
+def _noop() -> None:
+    return None
+
+
+def prestart() -> None:
+    """Fork all pool workers now (e.g. after the spaCy model is loaded so they share its pages)."""
+    executor = _get_executor()
+    for fut in [executor.submit(_noop) for _ in range(max(1, config.PDF_WORKERS))]:
+        fut.result()
+
+
+def is_started() -> bool:
+    return _executor is not None
+
+
+def shutdown() -> None:
+    """Stop the worker processes (call on app shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _score_shard(pdf_path: str, start: int, stop: int) -> tuple[int, int, list[str], Counter]:
+    """Worker: extract pages [start, stop) and count candidate keywords."""
+    pages = pdf_service.extract_page_texts(Path(pdf_path), start, stop)
+    counts = keyword_engine.count_keywords(pages, filler_terms=pdf_service.FILLER_TERMS)
+    return start, stop, pages, counts
+
+
+def shard_bounds(n_pages: int) -> list[tuple[int, int]]:
+    """Page ranges [start, stop): a small first shard, then PDF_PAGES_PER_SHARD pages each."""
+    first = max(1, config.PDF_FIRST_SHARD_PAGES)
+    size = max(1, config.PDF_PAGES_PER_SHARD)
+    bounds: list[tuple[int, int]] = []
+    start = 0
+    stop = min(first, n_pages)
+    while start < n_pages:
+        bounds.append((start, stop))
+        start, stop = stop, min(stop + size, n_pages)
+    return bounds
+
+
+async def run_keyword_pipeline(
+    pdf_path: Path,
+    top_n: int,
+    use_gemini: bool = False,
+    doc_hash: Optional[str] = None,
+) -> AsyncIterator[dict]:
+    """
+    Extract and rank keywords for a PDF, yielding progress events:
+      {"event": "partial", "keywords": [...], "pages_done": int, "pages_total": int}
+    once per finished shard, then a single
+      {"event": "keywords", "keywords": [...], "source": "spacy" | "gemini", "cached": bool,
+       "counts": {term: n}}
+    where counts are the document's spaCy candidate frequencies (kept per session so more
+    documents can be merged in later).
+    With use_gemini, Gemini ranks the whole document (map-reduced over page chunks); spaCy is
+    the fallback if it returns nothing or runs out of its latency budget.
+    The document's candidate counts are cached by doc_hash (computed from the file if not
+    given) and re-ranked against the current corpus index on a hit; cache hits are still
+    indexed. Complete Gemini rankings are cached too; one missing some chunks is returned but
+    not cached, so the next upload asks again.
+    """
+    started = time.perf_counter()
+    if doc_hash is None:
+        doc_hash = await asyncio.to_thread(keyword_cache.file_hash, pdf_path)
+        _STAGES["hash"].observe(time.perf_counter() - started)
+    filler = pdf_service.FILLER_TERMS
+    source = "gemini" if use_gemini else "spacy"
+    if use_gemini:
+        cached = keyword_cache.get(doc_hash, "gemini", top_n, filler)
+        counts = Counter(cached["counts"]) if cached is not None else None
+    else:
+        counts = keyword_cache.get_counts(doc_hash, filler)
+    if counts is not None:
+        # The index may have lost the document (in memory, after a restart)
+        await asyncio.to_thread(pdf_service.index_document, doc_hash, counts)
+        keywords = cached["keywords"] if use_gemini else pdf_service.score_keywords(counts, top_n=top_n)
+        _STAGES["cache_hit"].observe(time.perf_counter() - started)
+        yield {
+            "event": "keywords",
+            "keywords": keywords,
+            "source": source,
+            "cached": True,
+            "counts": counts,
+        }
+        return
+
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    t0 = time.perf_counter()
+    n_pages = await asyncio.to_thread(pdf_service.page_count, pdf_path)
+    _STAGES["page_count"].observe(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    futures = [
+        loop.run_in_executor(executor, _score_shard, str(pdf_path), start, stop)
+        for start, stop in shard_bounds(n_pages)
+    ]
+
+    shards: dict[int, tuple[list[str], Counter]] = {}
+    running: Counter[str] = Counter()
+    pages_done = 0
+    for fut in asyncio.as_completed(futures):
+        start, stop, pages, counts = await fut
+        if not shards:
+            _STAGES["first_shard"].observe(time.perf_counter() - t0)
+        shards[start] = (pages, counts)
+        running.update(counts)
+        pages_done += stop - start
+        yield {
+            "event": "partial",
+            "keywords": pdf_service.score_keywords(running, top_n=top_n),
+            "pages_done": pages_done,
+            "pages_total": n_pages,
+        }
+    _STAGES["shards"].observe(time.perf_counter() - t0)
+
+    # Merge in page order so tie-breaking matches a single pass over the document
+    total: Counter[str] = Counter()
+    for start in sorted(shards):
+        total.update(shards[start][1])
+    t0 = time.perf_counter()
+    await asyncio.to_thread(pdf_service.index_document, doc_hash, total)
+    _STAGES["index"].observe(time.perf_counter() - t0)
+    keyword_cache.put_counts(doc_hash, filler, total)
+
+    if use_gemini:
+        pages = [page for start in sorted(shards) for page in shards[start][0]]
+        t0 = time.perf_counter()
+        keywords, complete = await extract_keywords_gemini_async(pages, max_keywords=top_n)
+        _STAGES["gemini"].observe(time.perf_counter() - t0)
+        if keywords:
+            if complete:
+                keyword_cache.put(doc_hash, "gemini", top_n, filler, keywords, total)
+            _STAGES["total"].observe(time.perf_counter() - started)
+            yield {
+                "event": "keywords",
+                "keywords": keywords,
+                "source": "gemini",
+                "cached": False,
+                "counts": total,
+            }
+            return
+    t0 = time.perf_counter()
+    keywords = pdf_service.score_keywords(total, top_n=top_n)
+    _STAGES["score"].observe(time.perf_counter() - t0)
+    _STAGES["total"].observe(time.perf_counter() - started)
+    yield {"event": "keywords", "keywords": keywords, "source": "spacy", "cached": False, "counts": total}
+
+
+def merge_document(sess: Mapping, event: dict, top_n: int) -> dict:
+    """
+    Session fields updated with a newly processed document (the pipeline's final event):
+    keywords, merged term_counts, keyword_source and rankings (each document's own ranking).
+    spaCy sessions are re-ranked from the merged counts; if either side came from Gemini,
+    every document's ranking is fused, each with the same weight.
+    """
+    merged: Counter[str] = Counter(sess.get("term_counts") or {})
+    merged.update(event["counts"])
+    # Sessions stored before per-document rankings were kept count as one document
+    rankings = [*(sess.get("rankings") or [sess.get("keywords") or []]), list(event["keywords"])]
+    if event["source"] == "gemini" or sess.get("keyword_source") == "gemini":
+        keywords, source = fuse_rankings(rankings, top_n), "gemini"
+    else:
+        keywords, source = pdf_service.score_keywords(merged, top_n=top_n), "spacy"
+    return {"keywords": keywords, "term_counts": dict(merged), "keyword_source": source, "rankings": rankings}
+
+
+def encode_event(event: dict, fmt: str) -> str:
+    """Serialize one pipeline event as an NDJSON line or an SSE frame."""
+    data = json.dumps(event)
+    if fmt == "sse":
+        return f"event: {event.get('event', 'message')}\ndata: {data}\n\n"
+    return data + "\n"
@@ -2,15 +2,17 @@
 Phase 2: PDF ingestion pipeline.
 Extract text with PyMuPDF; use spaCy to identify high-signal technical vocabulary.
 No OCR, no persistence, no embeddings.
+PyMuPDF and spaCy are imported on first use so importing this module stays cheap.
 """
 
 from pathlib import Path
 from typing import Optional
 
-import fitz  # PyMuPDF
-import spacy
 from collections import Counter
 
+import config
+from services import corpus_index, keyword_cache, keyword_engine
+
 # Generic academic filler terms to exclude (lowercase)
 FILLER_TERMS: frozenset[str] = frozenset({
     "introduction", "chapter", "figure", "example", "section", "page",
@@ -21,21 +23,35 @@ FILLER_TERMS: frozenset[str] = frozenset({
     "schedule", "policy", "grading", "textbook", "materials",
 })
 
-_nlp: Optional[spacy.Language] = None
 
+def extract_text_from_pdf(pdf_path: Path) -> str:
+    """Extract all readable text from the PDF (no OCR). Assumes slides/syllabi."""
+    return " ".join(extract_page_texts(pdf_path))
 
-def _get_nlp() -> spacy.Language:
-    global _nlp
-    if _nlp is None:
-        _nlp = spacy.load("en_core_web_sm")
-    return _nlp
 
+def extract_page_texts(
+    pdf_path: Path,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> list[str]:
+    """Extract text for pages [start, stop) in page order (no OCR)."""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(pdf_path)
+    try:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        return [doc[i].get_text() for i in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def page_count(pdf_path: Path) -> int:
+    """Number of pages in the PDF (opens the document without extracting text)."""
+    import fitz  # PyMuPDF
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
-    """Extract all readable text from the PDF (no OCR). Assumes slides/syllabi."""
     doc = fitz.open(pdf_path)
     try:
-        return " ".join(page.get_text() for page in doc)
+        return doc.page_count
     finally:
         doc.close()
 
@@ -52,27 +68,53 @@ def extract_keywords(
     """
     if not text.strip():
         return []
-    filler = filler_terms or FILLER_TERMS
-    nlp = _get_nlp()
-    doc = nlp(text)
-    counts: Counter[str] = Counter()
-
-    for token in doc:
-        if token.pos_ not in ("NOUN", "PROPN"):
-            continue
-        word = token.text.strip().lower()
-        if len(word) < min_length:
-            continue
-        if not word.isalpha():
-            continue
-        if word in filler:
-            continue
-        counts[word] += 1
+    counts = count_keywords(text, min_length=min_length, filler_terms=filler_terms)
+    return rank_keywords(counts, top_n=top_n)
 
+
+def count_keywords(
+    text: str,
+    min_length: int = 5,
+    filler_terms: Optional[frozenset[str]] = None,
+) -> Counter[str]:
+    """
+    Per-term frequencies of candidate keywords in text (same filters as extract_keywords).
+    Counters from separate page ranges can be summed and ranked with rank_keywords.
+    """
+    if not text.strip():
+        return Counter()
+    return keyword_engine.count_keywords(
+        [text],
+        filler_terms=filler_terms or FILLER_TERMS,
+        min_length=min_length,
+    )
+
+
+def rank_keywords(counts: Counter[str], top_n: int = 50) -> list[str]:
+    """Top N terms by frequency; ties keep first-seen order."""
     return [term for term, _ in counts.most_common(top_n)]
 
 
+def index_document(doc_hash: str, counts: Counter[str]) -> None:
+    """Add the document's terms to the corpus document-frequency index (TF-IDF scoring only)."""
+    if config.KEYWORD_SCORING == "tfidf":
+        corpus_index.get_index().add_document(doc_hash, counts)
+
+
+def score_keywords(counts: Counter[str], top_n: int = 50) -> list[str]:
+    """Rank candidate counts with the configured scoring: TF-IDF against the corpus, or raw frequency."""
+    if config.KEYWORD_SCORING == "tfidf":
+        return corpus_index.rank_tfidf(counts, top_n=top_n)
+    return rank_keywords(counts, top_n=top_n)
+
+
 def process_pdf(pdf_path: Path, top_n: int = 50) -> list[str]:
-    """Full pipeline: extract text, then return top technical keywords."""
-    text = extract_text_from_pdf(pdf_path)
-    return extract_keywords(text, top_n=top_n)
+    """Full pipeline: extract text, then return top technical keywords (counts cached by content hash)."""
+    doc_hash = keyword_cache.file_hash(pdf_path)
+    counts = keyword_cache.get_counts(doc_hash, FILLER_TERMS)
+    if counts is None:
+        counts = count_keywords(extract_text_from_pdf(pdf_path))
+        keyword_cache.put_counts(doc_hash, FILLER_TERMS, counts)
+    # Also on cache hits: an in-memory index starts empty after a restart
+    index_document(doc_hash, counts)
+    return score_keywords(counts, top_n=top_n)
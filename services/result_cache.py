@@ -0,0 +1,103 @@
+"""
+Two-tier result cache: in-memory LRU bounded by bytes, plus an optional on-disk tier
+(one file per key) that survives restarts. Values must be JSON-serializable and are
+stored zlib-compressed in both tiers.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+
+def make_key(*parts: object) -> str:
+    """Stable hex key from the given parts (order matters)."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(repr(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class TieredCache:
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None) -> None:
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{key}.json.z"
+
+    def _store(self, key: str, blob: bytes) -> None:
+        """Insert into the memory tier and evict least-recently-used entries over budget."""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        if len(blob) > self.max_bytes:
+            return
+        self._entries[key] = blob
+        self._bytes += len(blob)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(zlib.decompress(blob))
+        if self.disk_dir is not None:
+            try:
+                blob = self._disk_path(key).read_bytes()
+                value = json.loads(zlib.decompress(blob))
+            except (OSError, ValueError, zlib.error):
+                pass
+            else:
+                with self._lock:
+                    self._store(key, blob)
+                    self.disk_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._store(key, blob)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                tmp.write_bytes(blob)
+                os.replace(tmp, path)
+            except OSError:
+                tmp.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
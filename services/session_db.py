@@ -0,0 +1,209 @@
+"""
+SQLite session table shared by every worker on the host (SESSION_BACKEND=sqlite).
+WAL mode lets readers run alongside a writer; each write stamps the row with the next change
+sequence number (from a counter row, so numbers are never reused) and each deletion leaves a
+tombstone with one, so a worker can tell which sessions other processes changed or deleted
+since it last looked: PRAGMA data_version moves only when another connection commits, so the
+common case is one cheap pragma and no query. Rows are JSON; used_at (wall clock, shared
+across processes) drives idle expiry.
+
+Calls block; the connection used on the event loop should get a short busy_timeout_ms, and
+bulk work (expire) belongs on its own connection in a thread. A call that waits longer than
+that for another worker's write raises DatabaseBusy instead of sqlite3's OperationalError.
+"""
+
+import functools
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_seq ON sessions (seq);
+CREATE INDEX IF NOT EXISTS sessions_used_at ON sessions (used_at);
+CREATE TABLE IF NOT EXISTS deleted (
+    session_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    deleted_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deleted_seq ON deleted (seq);
+CREATE TABLE IF NOT EXISTS change_seq (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    seq INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO change_seq (id, seq) SELECT 0, COALESCE(MAX(seq), 0) FROM sessions;
+"""
+_DATETIME_FIELDS = ("created_at", "updated_at")
+
+_T = TypeVar("_T", bound=Callable)
+
+
+class DatabaseBusy(Exception):
+    """Another worker held the database for longer than the busy timeout."""
+
+    def __init__(self) -> None:
+        super().__init__("Session database is busy; retry shortly")
+        self.retry_after = 1
+
+
+def _busy_as_error(method: _T) -> _T:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                raise DatabaseBusy() from e
+            raise
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _encode(sess: dict) -> str:
+    return json.dumps(sess, default=lambda v: v.isoformat() if isinstance(v, datetime) else str(v))
+
+
+def _decode(data: str) -> dict:
+    sess = json.loads(data)
+    for field in _DATETIME_FIELDS:
+        if sess.get(field):
+            sess[field] = datetime.fromisoformat(sess[field])
+    return sess
+
+
+class SessionDB:
+    @_busy_as_error
+    def __init__(self, path: str, busy_timeout_ms: int = 5000) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; writes open their own IMMEDIATE transaction
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        try:
+            self._conn.execute("PRAGMA busy_timeout=5000")  # the schema setup may wait for other workers
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+            self._data_version = self._version()
+            self.seen_seq = self._conn.execute("SELECT seq FROM change_seq").fetchone()[0]
+        except BaseException:
+            self._conn.close()
+            raise
+
+    def _next_seq(self) -> int:
+        """Take the next change sequence number (inside the write's transaction)."""
+        self._conn.execute("UPDATE change_seq SET seq = seq + 1 WHERE id = 0")
+        return self._conn.execute("SELECT seq FROM change_seq").fetchone()[0]
+
+    def _version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    @_busy_as_error
+    def changed(self) -> list[str]:
+        """Sessions written or deleted by other processes since the last call (usually none, cheaply)."""
+        version = self._version()
+        if version == self._data_version:
+            return []
+        rows = self._conn.execute(
+            "SELECT session_id, seq FROM sessions WHERE seq > ? "
+            "UNION ALL SELECT session_id, seq FROM deleted WHERE seq > ?",
+            (self.seen_seq, self.seen_seq),
+        ).fetchall()
+        self._data_version = version
+        if rows:
+            self.seen_seq = max(seq for _, seq in rows)
+        return [sid for sid, _ in rows]
+
+    @_busy_as_error
+    def get(self, session_id: str) -> Optional[dict]:
+        row = self._conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return _decode(row[0]) if row else None
+
+    @_busy_as_error
+    def insert(self, sess: dict) -> None:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            seq = self._next_seq()
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, data, seq, used_at) VALUES (?, ?, ?, ?)",
+                (sess["session_id"], _encode(sess), seq, time.time()),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    @_busy_as_error
+    def update(self, session_id: str, mutate: Callable[[dict], None]) -> Optional[dict]:
+        """Apply mutate to the current row in one transaction; the new session, or None if not found."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+            sess = _decode(row[0])
+            mutate(sess)
+            seq = self._next_seq()
+            self._conn.execute(
+                "UPDATE sessions SET data = ?, seq = ?, used_at = ? WHERE session_id = ?",
+                (_encode(sess), seq, time.time(), session_id),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return sess
+
+    @_busy_as_error
+    def touch(self, session_ids: list[str]) -> None:
+        """Mark sessions as used now (keeps them from expiring)."""
+        if session_ids:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE sessions SET used_at = ? WHERE session_id = ?", [(now, sid) for sid in session_ids]
+            )
+
+    @_busy_as_error
+    def expire(self, idle_s: float) -> list[str]:
+        """
+        Delete sessions unused for idle_s seconds, leaving tombstones for other workers'
+        changed(); returns their ids. Tombstones older than idle_s are pruned.
+        """
+        now = time.time()
+        cutoff = now - idle_s
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            ids = [r[0] for r in self._conn.execute("SELECT session_id FROM sessions WHERE used_at < ?", (cutoff,))]
+            self._conn.execute("DELETE FROM deleted WHERE deleted_at < ?", (cutoff,))
+            if ids:
+                seq = self._next_seq()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO deleted (session_id, seq, deleted_at) VALUES (?, ?, ?)",
+                    [(sid, seq, now) for sid in ids],
+                )
+                self._conn.execute("DELETE FROM sessions WHERE used_at < ?", (cutoff,))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return ids
+
+    @_busy_as_error
+    def stats(self) -> dict:
+        by_status = dict(
+            self._conn.execute(
+                "SELECT COALESCE(json_extract(data, '$.status'), 'unknown'), COUNT(*) FROM sessions GROUP BY 1"
+            ).fetchall()
+        )
+        return {"sessions": sum(by_status.values()), "by_status": by_status}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,59 +1,378 @@
-"""Simple in-memory session store."""
+"""
+Session store, bounded by idle time and approximate size.
+SESSION_BACKEND=memory (default) keeps sessions in this process only. SESSION_BACKEND=sqlite
+keeps them in a SQLite file (services/session_db.py) that every worker on the host shares,
+so a session created by one uvicorn worker is visible to /listen on another; the in-memory
+store then acts as this worker's hot cache, and entries other processes changed are dropped
+before each read.
 
+Sessions are kept in least-recently-used order. One idle for SESSION_TTL_S is dropped by
+the sweeper (started in the app lifespan), and once the sessions' estimated size passes
+SESSION_STORE_MAX_MB the least recently used are dropped first (from the cache only, with
+sqlite). Sessions with a live presenter or viewers, or with a transcription job queued or
+running, are never evicted. With sqlite, any call may raise DatabaseBusy when another worker
+holds the database for longer than SESSION_DB_BUSY_MS (the app answers 503). Reads return a
+read-only view of the stored dict instead of a copy; don't hold it across awaits expecting
+it to stay current or present.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict
 from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
 from uuid import uuid4
 
-# session_id -> { "keywords": list, "transcript": str | None, "status": str, ... }
-_sessions: dict[str, dict] = {}
+import config
+from services import caption_hub, keyword_matcher, transcript_log
+from services.session_db import DatabaseBusy, SessionDB
+
+logger = logging.getLogger(__name__)
+
+# session_id -> { "session_id", "keywords": list, "term_counts": dict, "transcript": str | None, "status": str, ... },
+# least recently used first
+_sessions: "OrderedDict[str, dict]" = OrderedDict()
+# session_id -> (monotonic time of last access, estimated bytes)
+_meta: dict[str, tuple[float, int]] = {}
+_bytes = 0
+_evicted = {"ttl": 0, "lru": 0}
+_sweeper: Optional[asyncio.Task] = None
+_last_sweep = time.monotonic()
+_db: Optional[SessionDB] = None
+# The sweeper's own connection, used from a worker thread
+_sweep_db: Optional[SessionDB] = None
+
+
+def _database() -> Optional[SessionDB]:
+    """The shared session table when SESSION_BACKEND=sqlite (opened on first use), else None."""
+    global _db
+    if _db is None and config.SESSION_BACKEND == "sqlite":
+        _db = SessionDB(config.SESSION_DB_PATH, busy_timeout_ms=config.SESSION_DB_BUSY_MS)
+    return _db
+
+
+def _approx_size(value: object) -> int:
+    """Estimated bytes held by a session value (containers walked, shared objects counted each time)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_approx_size(k) + _approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_approx_size(v) for v in value)
+    return size
+
+
+def _key(session_id: object) -> Optional[str]:
+    if not session_id or not isinstance(session_id, str):
+        return None
+    return session_id.strip()
+
+
+def _drop(sid: str) -> None:
+    """Remove a session from memory (with sqlite it stays in the database)."""
+    global _bytes
+    _sessions.pop(sid, None)
+    _, size = _meta.pop(sid, (0.0, 0))
+    _bytes -= size
+
+
+def _cache(sess: dict) -> None:
+    sid = sess["session_id"]
+    _drop(sid)
+    _sessions[sid] = sess
+    _resize(sid)
+
+
+def _lookup(session_id: object) -> Optional[dict]:
+    """The stored session, marked as just used; None if unknown."""
+    sid = _key(session_id)
+    if not sid:
+        return None
+    db = _database()
+    if db is not None:
+        for changed in db.changed():
+            _drop(changed)
+    sess = _sessions.get(sid)
+    if sess is None and db is not None:
+        sess = db.get(sid)
+        if sess is not None:
+            _cache(sess)
+    if sess is not None:
+        _sessions.move_to_end(sid)
+        _meta[sid] = (time.monotonic(), _meta[sid][1])
+    return sess
+
+
+def _write(session_id: object, mutate: Callable[[dict], None]) -> Optional[dict]:
+    """Apply mutate to the session and store it; the updated session, or None if not found."""
+    db = _database()
+    if db is None:
+        sess = _lookup(session_id)
+        if sess is not None:
+            mutate(sess)
+            _resize(sess["session_id"])
+        return sess
+    sid = _key(session_id)
+    sess = db.update(sid, mutate) if sid else None
+    if sess is None:
+        if sid:
+            _drop(sid)
+        return None
+    _cache(sess)
+    return sess
+
+
+def _resize(sid: str) -> None:
+    """Re-estimate the session's size and evict others if the store is over budget."""
+    global _bytes
+    used, old = _meta.get(sid, (time.monotonic(), 0))
+    new = _approx_size(_sessions[sid])
+    _meta[sid] = (used, new)
+    _bytes += new - old
+    _evict_over_budget(keep=sid)
+
+
+def _evict(sid: str, reason: str) -> None:
+    """Drop a session from memory; unless it lives on in the database, its live log and hits go too."""
+    _drop(sid)
+    _evicted[reason] += 1
+    if _db is None or reason == "ttl":
+        transcript_log.discard(sid)
+        keyword_matcher.discard(sid)
+
+
+# Statuses of sessions a background transcription job will still write to
+_JOB_STATUSES = ("queued", "transcribing")
+
+
+def _pinned(sid: str) -> bool:
+    """Whether the session must stay: it has live sockets or a pending transcription job."""
+    return caption_hub.is_live(sid) or _sessions[sid].get("status") in _JOB_STATUSES
+
+
+def _evict_over_budget(keep: Optional[str] = None) -> None:
+    """Evict least recently used sessions until under budget, never pinned ones or keep."""
+    max_bytes = config.SESSION_STORE_MAX_MB * 1024 * 1024
+    # Each session is looked at most once; kept ones are moved to the back
+    for _ in range(len(_sessions)):
+        if _bytes <= max_bytes or len(_sessions) <= 1:
+            return
+        sid = next(iter(_sessions))
+        if sid == keep or _pinned(sid):
+            _sessions.move_to_end(sid)
+            continue
+        _evict(sid, "lru")
+
+
+def _sweep_cache() -> tuple[int, list[str]]:
+    """
+    Evict cached sessions idle for longer than SESSION_TTL_S (with sqlite, only from the
+    cache). Returns how many were evicted and, with sqlite, the sessions used since the last sweep.
+    """
+    global _last_sweep
+    now = time.monotonic()
+    cutoff = now - config.SESSION_TTL_S
+    evicted = 0
+    db = _database()
+    for sid in list(_sessions):
+        used, _ = _meta[sid]
+        if used > cutoff:
+            break  # the rest were used more recently
+        if _pinned(sid):
+            _lookup(sid)
+        elif db is not None:
+            _drop(sid)  # another worker may still be using it
+        else:
+            _evict(sid, "ttl")
+            evicted += 1
+    used_since = [sid for sid, (used, _) in _meta.items() if used >= _last_sweep] if db is not None else []
+    _last_sweep = now
+    return evicted, used_since
 
 
-def create_session(keywords: list) -> str:
-    """Create a session with the given keywords. Returns session_id."""
+def _expire_shared(used: list[str]) -> list[str]:
+    """Record this worker's reads, then delete what no worker used; blocking, run off the event loop."""
+    global _sweep_db
+    if _sweep_db is None:
+        _sweep_db = SessionDB(config.SESSION_DB_PATH)
+    _sweep_db.touch(used)
+    return _sweep_db.expire(config.SESSION_TTL_S)
+
+
+def _finish_sweep(evicted: int, expired: list[str]) -> int:
+    for sid in expired:
+        _evict(sid, "ttl")
+    evicted += len(expired)
+    if evicted:
+        logger.info("Evicted %d idle sessions", evicted)
+    return evicted
+
+
+def sweep() -> int:
+    """Evict sessions idle for longer than SESSION_TTL_S. Returns how many were evicted."""
+    evicted, used = _sweep_cache()
+    expired = _expire_shared(used) if _database() is not None else []
+    return _finish_sweep(evicted, expired)
+
+
+async def _sweep_forever() -> None:
+    # Sessions this worker used that are not yet recorded in the database
+    used: set[str] = set()
+    while True:
+        await asyncio.sleep(config.SESSION_SWEEP_S)
+        try:
+            evicted, used_now = _sweep_cache()
+            used.update(used_now)
+            # The database part may wait on other workers' writes; keep it off the event loop
+            expired = await asyncio.to_thread(_expire_shared, list(used)) if _database() is not None else []
+        except DatabaseBusy:
+            logger.warning("Session database busy; idle sessions are expired on the next sweep")
+            continue
+        used.clear()
+        _finish_sweep(evicted, expired)
+
+
+def start() -> None:
+    """Start the idle-session sweeper (call from the app lifespan)."""
+    global _sweeper
+    if _sweeper is None and config.SESSION_TTL_S > 0:
+        _sweeper = asyncio.create_task(_sweep_forever())
+
+
+async def stop() -> None:
+    global _sweeper
+    global _db, _sweep_db
+    if _sweeper is not None:
+        _sweeper.cancel()
+        await asyncio.gather(_sweeper, return_exceptions=True)
+        _sweeper = None
+    if _db is not None:
+        _db.close()
+        _db = None
+    if _sweep_db is not None:
+        _sweep_db.close()
+        _sweep_db = None
+
+
+def create_session(
+    keywords: list,
+    term_counts: dict[str, int] | None = None,
+    keyword_source: str | None = None,
+    doc_hash: str | None = None,
+) -> str:
+    """
+    Create a session with the given keywords. term_counts are the per-term candidate
+    counts the keywords were ranked from, kept so later documents can be merged in;
+    doc_hash identifies the source document. Returns session_id.
+    """
     session_id = str(uuid4())
     now = datetime.utcnow()
-    _sessions[session_id] = {
+    sess = {
+        "session_id": session_id,
         "keywords": list(keywords),
+        "term_counts": dict(term_counts or {}),
+        "keyword_source": keyword_source,
+        "documents": [doc_hash] if doc_hash else [],
+        # Each document's own keyword ranking, fused when documents are merged
+        "rankings": [list(keywords)] if doc_hash else [],
         "transcript": None,
+        "segments": [],
         "status": "created",
+        "error": None,
         "created_at": now,
         "updated_at": now,
     }
+    db = _database()
+    if db is not None:
+        db.insert(sess)
+    _sessions[session_id] = sess
+    _resize(session_id)
     return session_id
 
 
-def get_session(session_id: str) -> dict | None:
-    """Return the full session dict, or None if not found."""
-    if not session_id or not isinstance(session_id, str):
-        return None
-    sess = _sessions.get(session_id.strip())
-    if sess is None:
-        return None
-    return {"session_id": session_id.strip(), **sess}
+def get_session(session_id: str) -> Mapping | None:
+    """Return a read-only view of the session (including session_id), or None if not found."""
+    sess = _lookup(session_id)
+    return MappingProxyType(sess) if sess is not None else None
 
 
-def update_session_transcript(session_id: str, transcript: str) -> None:
-    """Update the session with the transcript and set status to transcript_ready."""
-    if not session_id or not isinstance(session_id, str):
-        return
-    sid = session_id.strip()
-    if sid in _sessions:
-        _sessions[sid]["transcript"] = transcript
-        _sessions[sid]["status"] = "transcript_ready"
-        _sessions[sid]["updated_at"] = datetime.utcnow()
+def update_session_transcript(session_id: str, transcript: str, segments: list[dict] | None = None) -> None:
+    """Update the session with the transcript (and timed segments) and set status to transcript_ready."""
+
+    def mutate(sess: dict) -> None:
+        sess["transcript"] = transcript
+        if segments is not None:
+            sess["segments"] = segments
+        sess["status"] = "transcript_ready"
+        sess["error"] = None
+        sess["updated_at"] = datetime.utcnow()
+
+    _write(session_id, mutate)
+
+
+def update_session_status(session_id: str, status: str, error: str | None = None) -> bool:
+    """Set the status (e.g. queued, transcribing, failed) and error message. Returns False if not found."""
+
+    def mutate(sess: dict) -> None:
+        sess["status"] = status
+        sess["error"] = error
+        sess["updated_at"] = datetime.utcnow()
+
+    return _write(session_id, mutate) is not None
+
+
+def add_session_document(
+    session_id: str, doc_hash: str, merge: Callable[[Mapping], dict]
+) -> Optional[list]:
+    """
+    Add a document to the session in one write (atomic with other workers' with sqlite):
+    merge(session) returns the fields to update (keywords, term_counts, ...), and is not
+    called if the session already has the document. Returns the session's keywords, or None
+    if not found.
+    """
+
+    def mutate(sess: dict) -> None:
+        if doc_hash in sess.get("documents", []):
+            return
+        sess.update(merge(MappingProxyType(sess)))
+        sess["documents"] = [*sess.get("documents", []), doc_hash]
+        sess["updated_at"] = datetime.utcnow()
+
+    sess = _write(session_id, mutate)
+    return list(sess.get("keywords") or []) if sess is not None else None
 
 
 def session_exists(session_id: str) -> bool:
     """Return True if the session_id exists in the store."""
-    if not session_id or not isinstance(session_id, str):
-        return False
-    return session_id.strip() in _sessions
+    return _lookup(session_id) is not None
 
 
 def get_keywords(session_id: str) -> list:
     """Return keywords for the session, or empty list if not found."""
-    if not session_id or not isinstance(session_id, str):
-        return []
-    session = _sessions.get(session_id.strip())
+    session = _lookup(session_id)
     if session is None:
         return []
     return list(session.get("keywords", []))  # copy to avoid mutation
+
+
+def stats() -> dict:
+    """Number of sessions held, by status; estimated size in memory and evictions."""
+    db = _database()
+    if db is not None:
+        counts = db.stats()
+    else:
+        by_status: dict[str, int] = {}
+        for sess in _sessions.values():
+            status = sess.get("status", "unknown")
+            by_status[status] = by_status.get(status, 0) + 1
+        counts = {"sessions": len(_sessions), "by_status": by_status}
+    return {
+        "backend": config.SESSION_BACKEND,
+        **counts,
+        "cached": len(_sessions),
+        "bytes": _bytes,
+        "max_bytes": config.SESSION_STORE_MAX_MB * 1024 * 1024,
+        "evicted": dict(_evicted),
+    }
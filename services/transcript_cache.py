@@ -0,0 +1,51 @@
+"""
+Transcription result cache.
+Keyed by the audio's SHA-256, the de-duplicated keyword set and the request options, so
+re-opening a lecture or re-running it with the same bias list skips the Deepgram call.
+Keyword case is kept: Deepgram's output (e.g. smart_format casing) depends on it.
+Results are stored in columnar form (see transcript_columns).
+"""
+
+from typing import Iterable, Optional
+
+import config
+from services.result_cache import TieredCache, make_key
+from services.transcript_columns import from_columns, to_columns
+
+_cache = TieredCache(
+    max_bytes=config.TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024,
+    disk_dir=config.TRANSCRIPT_CACHE_DIR or None,
+)
+
+
+def _key(audio_hash: str, keywords: Optional[Iterable[str]], options: tuple) -> str:
+    normalized = sorted({k.strip() for k in keywords or [] if k.strip()})
+    return make_key("transcript", audio_hash, normalized, options)
+
+
+def get(
+    audio_hash: str,
+    keywords: Optional[Iterable[str]],
+    options: tuple,
+) -> Optional[tuple[str, Optional[float], list[dict], list[dict]]]:
+    """Cached (transcript, confidence, words, segments) for this audio, keyword set and options, or None."""
+    value = _cache.get(_key(audio_hash, keywords, options))
+    return from_columns(value) if isinstance(value, dict) else None
+
+
+def put(
+    audio_hash: str,
+    keywords: Optional[Iterable[str]],
+    options: tuple,
+    result: tuple[str, Optional[float], list[dict], list[dict]],
+) -> None:
+    """Store a result; empty transcripts (often an upstream hiccup) are not cached."""
+    transcript, confidence, _, segments = result
+    if not transcript.strip():
+        return
+    _cache.put(_key(audio_hash, keywords, options), to_columns(transcript, confidence, segments))
+
+
+def stats() -> dict:
+    """Hit/miss/eviction counters and memory-tier size."""
+    return _cache.stats()
@@ -0,0 +1,70 @@
+"""
+Columnar form of a transcription result.
+Words are stored once as parallel arrays (text, start ms, end ms) and segments as
+[start, end) index ranges into them, instead of word dicts repeated in both `words`
+and `segments`. dumps() serializes with orjson when it is installed.
+"""
+
+import json
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder with compact separators is used instead
+    orjson = None
+
+
+def to_columns(
+    transcript: str,
+    confidence: Optional[float],
+    segments: list[dict],
+    spans: Optional[list[list[dict]]] = None,
+) -> dict:
+    """
+    (transcript, confidence, segments) -> columnar dict. The flat word list is the segments'
+    words in order; spans, if given, are each segment's keyword spans (segments.spans).
+    """
+    text: list[str] = []
+    start_ms: list[int] = []
+    end_ms: list[int] = []
+    seg_transcripts: list[str] = []
+    seg_ranges: list[list[int]] = []
+    for seg in segments:
+        first = len(text)
+        for w in seg["words"]:
+            text.append(w["word"])
+            start_ms.append(round(w["start"] * 1000))
+            end_ms.append(round(w["end"] * 1000))
+        seg_transcripts.append(seg["transcript"])
+        seg_ranges.append([first, len(text)])
+    columns = {
+        "transcript": transcript,
+        "confidence": confidence,
+        "words": {"word": text, "start_ms": start_ms, "end_ms": end_ms},
+        "segments": {"transcript": seg_transcripts, "range": seg_ranges},
+    }
+    if spans is not None:
+        columns["segments"]["spans"] = spans
+    return columns
+
+
+def from_columns(columns: dict) -> tuple[str, Optional[float], list[dict], list[dict]]:
+    """Columnar dict -> (transcript, confidence, words, segments) as returned by asr_service."""
+    cols = columns["words"]
+    words = [
+        {"word": text, "start": start / 1000, "end": end / 1000}
+        for text, start, end in zip(cols["word"], cols["start_ms"], cols["end_ms"])
+    ]
+    segs = columns["segments"]
+    segments = [
+        {"transcript": transcript, "words": words[first:last]}
+        for transcript, (first, last) in zip(segs["transcript"], segs["range"])
+    ]
+    return (columns["transcript"], columns["confidence"], words, segments)
+
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes (no whitespace, UTF-8)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,216 @@
+"""
+Per-session log of live final captions.
+Each final from /listen is appended with a sequence number (1, 2, ...) so a reconnecting
+client can replay only what it missed (since()). Sequence numbers restart at 1 whenever a
+log is recreated (a restart without persistence, or another worker's copy), so every log also
+has a random epoch id that is sent with its seqs; a `since` from another epoch means nothing
+here and the whole log is replayed instead. Appends are O(1); the assembled transcript
+is extended incrementally and returned as one shared string, not rebuilt per read. With
+LIVE_TRANSCRIPT_DIR set, each session's log is also appended to {session_id}.ndjson and
+reloaded from there after a restart, keeping its epoch (stored on the file's first line).
+File writes are handed to one writer thread, which batches whatever is queued, so /listen
+never waits on the disk; the file is deleted when the session is discarded.
+"""
+
+import json
+import logging
+import math
+import queue
+import threading
+import uuid
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class _Writer:
+    """Appends lines to log files (and deletes files) in submission order on a daemon thread."""
+
+    def __init__(self) -> None:
+        # (path, line), or (path, None) to delete the file
+        self._queue: "queue.Queue[tuple[Path, Optional[str]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Submitted but not yet written, per file
+        self._pending: Counter[Path] = Counter()
+        self._done = threading.Condition()
+
+    def submit(self, path: Path, line: Optional[str]) -> None:
+        with self._done:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="transcript-log-writer", daemon=True)
+                self._thread.start()
+            self._pending[path] += 1
+        self._queue.put((path, line))
+
+    def flush(self, path: Optional[Path] = None) -> None:
+        """Block until everything submitted so far (for path, or for every file) is on disk."""
+        with self._done:
+            self._done.wait_for(lambda: not (self._pending[path] if path is not None else self._pending))
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                with self._done:
+                    self._pending.subtract(path for path, _ in batch)
+                    self._pending += Counter()  # drop files with nothing left
+                    self._done.notify_all()
+
+    @staticmethod
+    def _write(batch: list[tuple[Path, Optional[str]]]) -> None:
+        # Lines per file, written after any delete of that file earlier in the batch
+        lines: dict[Path, list[str]] = {}
+        for path, line in batch:
+            if line is not None:
+                lines.setdefault(path, []).append(line)
+                continue
+            lines.pop(path, None)
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning("Could not delete %s: %s", path, e)
+        for path, new in lines.items():
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(line + "\n" for line in new))
+            except OSError as e:
+                logger.error("Could not append %d lines to %s: %s", len(new), path, e)
+
+
+_writer = _Writer()
+
+
+class TranscriptLog:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._texts: list[str] = []
+        self._confidences = array("d")  # NaN when Deepgram gave none
+        self._joined = ""
+        self._joined_count = 0
+        self.epoch = uuid.uuid4().hex[:12]
+        if path is not None and path.exists():
+            self._load(path)
+        elif path is not None:
+            _writer.submit(path, json.dumps({"epoch": self.epoch}))
+
+    def _load(self, path: Path) -> None:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping unreadable line in %s", path)
+                    continue
+                if "text" not in entry:
+                    self.epoch = entry.get("epoch", self.epoch)
+                    continue
+                self._append(entry["text"], entry.get("confidence"))
+
+    def _append(self, text: str, confidence: Optional[float]) -> int:
+        self._texts.append(text)
+        self._confidences.append(math.nan if confidence is None else float(confidence))
+        return len(self._texts)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def append(self, text: str, confidence: Optional[float] = None) -> int:
+        """Append a final caption; returns its sequence number."""
+        seq = self._append(text, confidence)
+        if self.path is not None:
+            _writer.submit(self.path, json.dumps({"seq": seq, "text": text, "confidence": confidence}))
+        return seq
+
+    def since(self, seq: int, epoch: Optional[str] = None) -> list[dict]:
+        """Final caption messages with sequence number > seq, in order; all of them if epoch isn't this log's."""
+        start = max(0, seq) if epoch is None or epoch == self.epoch else 0
+        return [
+            {
+                "is_final": True,
+                "text": text,
+                "confidence": None if math.isnan(conf) else conf,
+                "seq": start + i + 1,
+                "epoch": self.epoch,
+            }
+            for i, (text, conf) in enumerate(zip(self._texts[start:], self._confidences[start:]))
+        ]
+
+    def transcript(self) -> str:
+        """All finals joined with spaces; only entries appended since the last call are joined."""
+        if self._joined_count < len(self._texts):
+            new = " ".join(self._texts[self._joined_count :])
+            self._joined = f"{self._joined} {new}" if self._joined else new
+            self._joined_count = len(self._texts)
+        return self._joined
+
+
+_logs: dict[str, TranscriptLog] = {}
+
+
+def _path(session_id: str) -> Optional[Path]:
+    if not config.LIVE_TRANSCRIPT_DIR:
+        return None
+    directory = Path(config.LIVE_TRANSCRIPT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{session_id}.ndjson"
+
+
+def get_log(session_id: str, create: bool = False) -> Optional[TranscriptLog]:
+    """The session's log (loaded from disk if persisted), or None if it has none and create is False."""
+    log = _logs.get(session_id)
+    if log is None:
+        path = _path(session_id)
+        if path is not None:
+            _writer.flush(path)  # a discarded log's file may still be being written or deleted
+        if create or (path is not None and path.exists()):
+            log = _logs[session_id] = TranscriptLog(path)
+    return log
+
+
+def append(session_id: str, text: str, confidence: Optional[float] = None) -> int:
+    """Append a final caption to the session's log; returns its sequence number."""
+    log = get_log(session_id, create=True)
+    assert log is not None
+    return log.append(text, confidence)
+
+
+def epoch(session_id: str) -> Optional[str]:
+    """Epoch id of the session's log, sent alongside its sequence numbers."""
+    log = get_log(session_id)
+    return log.epoch if log is not None else None
+
+
+def since(session_id: str, seq: int, epoch: Optional[str] = None) -> list[dict]:
+    log = get_log(session_id)
+    return log.since(seq, epoch) if log is not None else []
+
+
+def transcript(session_id: str) -> Optional[str]:
+    """Assembled live transcript, or None if the session has no live captions."""
+    log = get_log(session_id)
+    return log.transcript() if log is not None and len(log) else None
+
+
+def discard(session_id: str) -> None:
+    """Forget the session's log and delete its file, if any (the session is gone)."""
+    _logs.pop(session_id, None)
+    path = _path(session_id)
+    if path is not None:
+        _writer.submit(path, None)
+
+
+def flush() -> None:
+    """Wait until every queued log write has reached disk (call at shutdown)."""
+    _writer.flush()
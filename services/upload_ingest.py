@@ -0,0 +1,217 @@
+"""
+Upload ingestion shared by the upload routes.
+Routes take the raw Request instead of an UploadFile: a declared Content-Length over the
+limit is refused before any of the body is read, and otherwise the multipart body is fed
+through python-multipart's streaming parser as it arrives, with the file part written to a
+named temp file and hashed in the same pass. Uploads are never held in memory or copied
+twice, and the upload is aborted as soon as the limit is crossed.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, NamedTuple, Optional
+
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Allowance for multipart boundaries, part headers and small form fields on top of the file limit
+FORM_OVERHEAD_BYTES = 64 * 1024
+# Largest non-file form field kept (session ids, keyword lists)
+MAX_FIELD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised while receiving when an upload exceeds its limit (mapped to HTTP 413 in main)."""
+
+    def __init__(self, kind: str, max_mb: int) -> None:
+        super().__init__(f"{kind} file exceeds maximum size of {max_mb} MB")
+        self.kind = kind
+        self.max_mb = max_mb
+
+
+class SpooledUpload(NamedTuple):
+    path: Path
+    size: int
+    sha256: str
+
+    def unlink(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class ReceivedUpload(NamedTuple):
+    spooled: SpooledUpload
+    filename: str
+    fields: dict[str, str]
+
+
+def require_suffix(suffixes: tuple[str, ...], detail: str, missing_detail: Optional[str] = None) -> Callable[[str], str]:
+    """A receive_upload suffix check: the file name's extension if allowed, else HTTPException(400)."""
+
+    def check(filename: str) -> str:
+        if not filename and missing_detail:
+            raise HTTPException(400, detail=missing_detail)
+        ext = Path(filename).suffix.lower()
+        if ext not in suffixes:
+            raise HTTPException(400, detail=detail)
+        return ext
+
+    return check
+
+
+def multipart_body(file_description: str, **fields: str) -> dict:
+    """openapi_extra documenting a multipart body with a `file` part and optional text fields."""
+    properties = {"file": {"type": "string", "format": "binary", "description": file_description}}
+    properties.update({name: {"type": "string", "description": description} for name, description in fields.items()})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {"schema": {"type": "object", "properties": properties, "required": ["file"]}}
+            },
+        }
+    }
+
+
+class _Receiver:
+    """python-multipart callbacks: the first file part goes to a temp file, text fields to a dict."""
+
+    def __init__(
+        self, max_bytes: int, max_mb: int, kind: str, suffix: Callable[[str], str], file_fields: tuple[str, ...]
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_mb = max_mb
+        self.kind = kind
+        self.suffix = suffix
+        self.file_fields = file_fields
+        self.fields: dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.path: Optional[Path] = None
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self._out: Optional[BinaryIO] = None
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._name = ""
+        self._data = bytearray()
+        # Where the current part's data goes: "file", "field" or None (ignored)
+        self._target: Optional[str] = None
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._disposition = b""
+        self._data = bytearray()
+        self._target = None
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        self._name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" in options:
+            if self.path is not None or self._name not in self.file_fields:
+                return  # only the first file part is kept
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            # May raise HTTPException (400) for an unsupported file name before any data is read
+            suffix = self.suffix(self.filename)
+            fd, name = tempfile.mkstemp(suffix=suffix)
+            self.path = Path(name)
+            self._out = os.fdopen(fd, "wb")
+            self._target = "file"
+        elif self._name:
+            self._target = "field"
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._target == "file":
+            assert self._out is not None
+            self.size += end - start
+            if self.size > self.max_bytes:
+                raise UploadTooLarge(self.kind, self.max_mb)
+            chunk = data[start:end]
+            self.digest.update(chunk)
+            self._out.write(chunk)
+        elif self._target == "field":
+            if len(self._data) + end - start > MAX_FIELD_BYTES:
+                raise HTTPException(400, detail=f"Form field {self._name!r} is too large")
+            self._data += data[start:end]
+
+    def on_part_end(self) -> None:
+        if self._target == "file" and self._out is not None:
+            self._out.close()
+            self._out = None
+        elif self._target == "field":
+            self.fields[self._name] = self._data.decode("utf-8", "replace")
+        self._target = None
+
+    @property
+    def file_open(self) -> bool:
+        """Whether the file part started but never ended (the body was cut short)."""
+        return self._out is not None
+
+    def discard(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+
+async def receive_upload(
+    request: Request,
+    max_mb: int,
+    suffix: Callable[[str], str],
+    kind: str = "Uploaded",
+    file_fields: tuple[str, ...] = ("file",),
+) -> ReceivedUpload:
+    """
+    Stream a multipart/form-data request body to a temp file. suffix(filename) returns the
+    temp file's suffix, or raises HTTPException to reject the file by name (it is called with
+    "" when the body has no file part). Raises UploadTooLarge up front when Content-Length
+    is over the limit, and while receiving once the file passes max_mb (the partial file is
+    removed). Caller owns the returned file.
+    """
+    max_bytes = max_mb * 1024 * 1024
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes + FORM_OVERHEAD_BYTES:
+        raise UploadTooLarge(kind, max_mb)
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(400, detail="Expected a multipart/form-data upload")
+    receiver = _Receiver(max_bytes, max_mb, kind, suffix, file_fields)
+    parser = MultipartParser(params[b"boundary"], receiver.callbacks())
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+        if receiver.path is None:
+            suffix("")
+            raise HTTPException(400, detail="Expected a file upload")
+        if receiver.file_open:
+            raise HTTPException(400, detail="Upload ended before the file part was complete")
+    except BaseException:
+        receiver.discard()
+        raise
+    spooled = SpooledUpload(path=receiver.path, size=receiver.size, sha256=receiver.digest.hexdigest())
+    return ReceivedUpload(spooled=spooled, filename=receiver.filename or "", fields=receiver.fields)
@@ -0,0 +1,91 @@
+"""
+Engine warm-up and readiness.
+Heavy dependencies (spaCy, PyMuPDF, Deepgram SDK) are imported lazily by the subsystem that
+needs them; warm() loads the configured ones before traffic arrives and status() reports
+which engines are ready plus boot and first-request timings.
+"""
+
+import gc
+import importlib
+import logging
+import sys
+import time
+from typing import Callable, Optional
+
+from services import keyword_engine, keywords_gemini, pdf_pipeline
+
+logger = logging.getLogger(__name__)
+
+_process_started = time.perf_counter()
+_warmup_seconds: dict[str, float] = {}
+_ready_after: Optional[float] = None
+_first_request_ms: dict[str, float] = {}
+
+
+def _warm_spacy() -> None:
+    keyword_engine.get_nlp()
+
+
+def _warm_fitz() -> None:
+    importlib.import_module("fitz")
+
+
+def _warm_deepgram() -> None:
+    importlib.import_module("deepgram")
+
+
+_ENGINES: dict[str, tuple[Callable[[], None], Callable[[], bool]]] = {
+    "spacy": (_warm_spacy, keyword_engine.is_loaded),
+    "fitz": (_warm_fitz, lambda: "fitz" in sys.modules),
+    "deepgram": (_warm_deepgram, lambda: "deepgram" in sys.modules),
+    "gemini": (keywords_gemini.warm, keywords_gemini.is_warm),
+    # Forked after spaCy so pool workers share the model's pages copy-on-write
+    "pdf_pool": (pdf_pipeline.prestart, pdf_pipeline.is_started),
+}
+
+
+def warm(engines: list[str]) -> None:
+    """Load the given engines in a fixed order (spacy before pdf_pool). Unknown names are logged."""
+    global _ready_after
+    for name in _ENGINES:
+        if name not in engines:
+            continue
+        load, _ = _ENGINES[name]
+        t0 = time.perf_counter()
+        try:
+            load()
+        except Exception as e:
+            logger.warning("Warm-up of %s failed: %s", name, e)
+            continue
+        _warmup_seconds[name] = time.perf_counter() - t0
+        logger.info("Warmed %s in %.3fs", name, _warmup_seconds[name])
+    for name in engines:
+        if name not in _ENGINES:
+            logger.warning("Unknown warm-up engine %r", name)
+    # Keep preloaded objects out of future GC passes so forked workers don't touch (and copy) their pages
+    gc.freeze()
+    _ready_after = time.perf_counter() - _process_started
+
+
+def is_ready(engines: list[str]) -> bool:
+    return _ready_after is not None and all(
+        _ENGINES[name][1]()
+        for name in engines
+        if name in _ENGINES and not (name == "gemini" and not keywords_gemini.is_configured())
+    )
+
+
+def record_first_request(path: str, seconds: float) -> None:
+    if path not in _first_request_ms:
+        _first_request_ms[path] = round(seconds * 1000, 3)
+
+
+def status(engines: list[str]) -> dict:
+    """Readiness report: per-engine warm state, warm-up cost, boot and first-request latency."""
+    return {
+        "ready": is_ready(engines),
+        "engines": {name: check() for name, (_, check) in _ENGINES.items()},
+        "warmup_seconds": {k: round(v, 3) for k, v in _warmup_seconds.items()},
+        "boot_seconds": round(_ready_after, 3) if _ready_after is not None else None,
+        "first_request_ms": dict(_first_request_ms),
+    }
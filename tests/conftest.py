@@ -0,0 +1,22 @@
+from collections import OrderedDict
+
+import pytest
+
+import config
+from services import session_store
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """A fresh, empty in-memory session store."""
+    monkeypatch.setattr(session_store, "_sessions", OrderedDict())
+    monkeypatch.setattr(session_store, "_meta", {})
+    monkeypatch.setattr(session_store, "_bytes", 0)
+    monkeypatch.setattr(session_store, "_evicted", {"ttl": 0, "lru": 0})
+    monkeypatch.setattr(session_store, "_db", None)
+    monkeypatch.setattr(session_store, "_sweep_db", None)
+    monkeypatch.setattr(config, "SESSION_BACKEND", "memory")
+    yield session_store
+    for db in (session_store._db, session_store._sweep_db):
+        if db is not None:
+            db.close()
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+import pytest
+
+import config
+from services import asr_service
+
+
+@pytest.fixture
+def deepgram(monkeypatch):
+    """Answer every request with the response set in the returned dict."""
+    reply = {"response": httpx.Response(200, json={})}
+
+    def client():
+        transport = httpx.MockTransport(lambda request: reply["response"])
+        return httpx.AsyncClient(transport=transport), asyncio.Semaphore(1)
+
+    monkeypatch.setattr(config, "DEEPGRAM_API_KEY", "test-key")
+    monkeypatch.setattr(asr_service, "_get_client", client)
+    return reply
+
+
+async def _body():
+    yield b"audio"
+
+
+def _transcribe():
+    return asyncio.run(asr_service.transcribe_stream(_body(), 5, "audio/wav"))
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, text="<html>maintenance</html>"),
+        httpx.Response(200, json=["not", "an", "object"]),
+        httpx.Response(204),
+    ],
+)
+def test_success_status_without_a_json_object_is_a_502(deepgram, response):
+    deepgram["response"] = response
+    with pytest.raises(asr_service.UpstreamError) as e:
+        _transcribe()
+    assert (e.value.status_code, e.value.upstream_status) == (502, response.status_code)
+
+
+def test_error_status_is_a_502_carrying_the_upstream_status(deepgram):
+    deepgram["response"] = httpx.Response(503, json={"err_msg": "overloaded"})
+    with pytest.raises(asr_service.UpstreamError) as e:
+        _transcribe()
+    assert (e.value.status_code, e.value.upstream_status) == (502, 503)
+
+
+def test_json_result_is_parsed(deepgram):
+    alternative = {"transcript": "navier stokes", "confidence": 0.93}
+    deepgram["response"] = httpx.Response(200, json={"results": {"channels": [{"alternatives": [alternative]}]}})
+    transcript, confidence, _, _ = _transcribe()
+    assert (transcript, confidence) == ("navier stokes", 0.93)
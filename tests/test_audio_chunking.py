@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import io
+import wave
+
+import pytest
+
+import config
+from routers import upload
+from services import asr_service, transcript_cache
+from services.audio_chunking import Window, plan_windows, stitch
+from services.result_cache import TieredCache
+from services.upload_ingest import SpooledUpload
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: 417-byte frames of 1152 samples
+MP3_HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+MP3_FRAME_BYTES = 417
+MP3_FRAME_S = 1152 / 44100
+
+
+@pytest.fixture(autouse=True)
+def windowing(monkeypatch):
+    monkeypatch.setattr(config, "LONG_AUDIO_MIN_S", 5)
+    monkeypatch.setattr(config, "LONG_AUDIO_WINDOW_S", 4)
+    monkeypatch.setattr(config, "LONG_AUDIO_OVERLAP_S", 1)
+    monkeypatch.setattr(config, "DEEPGRAM_MAX_CONCURRENCY", 100)
+
+
+def _write_wav(path, seconds, rate=8000):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(bytes(2 * int(seconds * rate)))
+
+
+def test_wav_windows_overlap_and_are_valid_wav_files(tmp_path):
+    path = tmp_path / "talk.wav"
+    _write_wav(path, 10)
+    windows = plan_windows(path)
+    assert [(w.start_s, w.end_s) for w in windows] == [(0, 4), (3, 7), (6, 10)]
+    data = path.read_bytes()
+    for window in windows:
+        body = data[window.offset : window.offset + window.length]
+        with wave.open(io.BytesIO(window.header + body)) as w:
+            assert w.getframerate() == 8000
+            assert w.getnframes() == round((window.end_s - window.start_s) * 8000)
+
+
+def test_short_or_unknown_audio_is_not_split(tmp_path):
+    short = tmp_path / "short.wav"
+    _write_wav(short, 2)
+    other = tmp_path / "talk.ogg"
+    other.write_bytes(b"OggS" + bytes(1000))
+    assert plan_windows(short) is None
+    assert plan_windows(other) is None
+
+
+def test_mp3_windows_start_on_frame_boundaries(tmp_path):
+    n_frames = 380  # about 9.9 s
+    path = tmp_path / "talk.mp3"
+    path.write_bytes((MP3_HEADER + bytes(MP3_FRAME_BYTES - 4)) * n_frames)
+    windows = plan_windows(path)
+    assert len(windows) == 3
+    assert windows[0].offset == 0
+    assert windows[-1].offset + windows[-1].length == n_frames * MP3_FRAME_BYTES
+    for window in windows:
+        assert window.offset % MP3_FRAME_BYTES == 0
+        assert window.length % MP3_FRAME_BYTES == 0
+        assert window.start_s == pytest.approx(window.offset // MP3_FRAME_BYTES * MP3_FRAME_S)
+    for prev, nxt in zip(windows, windows[1:]):
+        assert nxt.start_s < prev.end_s
+
+
+def _segment(*words):
+    """A segment from (word, start, end) triples."""
+    return {
+        "transcript": " ".join(w for w, _, _ in words),
+        "words": [{"word": w, "start": start, "end": end} for w, start, end in words],
+    }
+
+
+def test_stitch_keeps_each_overlapping_word_once():
+    windows = [Window(0.0, 4.0, 0, 0), Window(3.0, 7.0, 0, 0)]
+    first = _segment(("alpha", 1.0, 1.4), ("beta", 3.3, 3.6), ("gamma", 3.6, 3.9))
+    # Second window's times are relative to its start (3 s)
+    second = _segment(("beta", 0.3, 0.6), ("gamma", 0.6, 0.9), ("delta", 2.0, 2.5))
+    transcript, confidence, words, segments = stitch(
+        windows, [("", 0.8, [], [first]), ("", 0.6, [], [second])]
+    )
+    assert transcript == "alpha beta gamma delta"
+    assert confidence == pytest.approx(0.7)
+    assert [(w["word"], w["start"], w["end"]) for w in words] == [
+        ("alpha", 1.0, 1.4),
+        ("beta", 3.3, 3.6),
+        ("gamma", 3.6, 3.9),
+        ("delta", 5.0, 5.5),
+    ]
+    assert [s["transcript"] for s in segments] == ["alpha beta", "gamma delta"]
+
+
+def test_stitch_without_confidence():
+    windows = [Window(0.0, 4.0, 0, 0), Window(3.0, 7.0, 0, 0)]
+    result = stitch(windows, [("", None, [], []), ("", None, [], [_segment(("late", 2.0, 2.2))])])
+    assert result[0] == "late"
+    assert result[1] is None
+
+
+@pytest.fixture
+def fake_deepgram(monkeypatch):
+    """Count Deepgram requests (whole files and windows); each hears one word."""
+    calls = {"file": 0, "window": 0}
+    segment = _segment(("word", 0.1, 0.3))
+    heard = ("word", 0.9, segment["words"], [segment])
+
+    async def transcribe_audio(path, keywords=None):
+        calls["file"] += 1
+        return heard
+
+    async def transcribe_stream(body, size, mimetype, keywords=None):
+        calls["window"] += 1
+        return heard
+
+    monkeypatch.setattr(asr_service, "transcribe_audio", transcribe_audio)
+    monkeypatch.setattr(asr_service, "transcribe_stream", transcribe_stream)
+    monkeypatch.setattr(transcript_cache, "_cache", TieredCache(1 << 20))
+    return calls
+
+
+def _spooled(path):
+    return SpooledUpload(path, path.stat().st_size, hashlib.sha256(path.read_bytes()).hexdigest())
+
+
+def test_unsplit_upload_shares_the_transcribe_cache_entry(tmp_path, fake_deepgram, monkeypatch):
+    path = tmp_path / "short.wav"
+    _write_wav(path, 2)
+    spooled = _spooled(path)
+    # As /transcribe stores it
+    transcript_cache.put(spooled.sha256, ["tensor"], asr_service.options_key(), ("hello", 0.9, [], []))
+    monkeypatch.setattr(config, "LONG_AUDIO_WINDOW_S", 3)  # windowing settings don't matter here
+
+    result, cached = asyncio.run(upload._transcribe(spooled, ["tensor"]))
+    assert cached and result[0] == "hello"
+    assert fake_deepgram == {"file": 0, "window": 0}
+
+
+def test_split_upload_is_cached_under_its_window_settings(tmp_path, fake_deepgram, monkeypatch):
+    path = tmp_path / "talk.wav"
+    _write_wav(path, 10)
+    spooled = _spooled(path)
+
+    assert asyncio.run(upload._transcribe(spooled, None))[1] is False
+    assert asyncio.run(upload._transcribe(spooled, None))[1] is True
+    monkeypatch.setattr(config, "LONG_AUDIO_WINDOW_S", 6)
+    assert asyncio.run(upload._transcribe(spooled, None))[1] is False
+    assert fake_deepgram == {"file": 0, "window": 3 + 2}
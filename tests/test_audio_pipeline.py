@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from services.audio_pipeline import AudioPipeline, resampled_rate
+
+RATE = 48000
+
+
+def tone(freq, seconds=1.0, amplitude=10000):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return np.rint(amplitude * np.sin(2 * np.pi * freq * t)).astype("<i2")
+
+
+def run(pcm, frame_samples, output_rate=16000, packet_ms=250):
+    pipeline = AudioPipeline(RATE, output_rate, packet_ms)
+    packets = []
+    for i in range(0, len(pcm), frame_samples):
+        pipeline.feed(pcm[i : i + frame_samples].tobytes(), packets.append)
+    pipeline.flush(packets.append)
+    return pipeline, packets
+
+
+def samples(packets):
+    return np.frombuffer(b"".join(packets), dtype="<i2").astype(np.float64)
+
+
+def rms(x):
+    return np.sqrt(np.mean(x**2))
+
+
+@pytest.mark.parametrize(
+    "input_rate, output_rate, expected", [(48000, 16000, 16000), (48000, 8000, 8000), (44100, 16000, 44100)]
+)
+def test_only_integer_factors_are_resampled(input_rate, output_rate, expected):
+    assert resampled_rate(input_rate, output_rate) == expected
+
+
+def test_passband_tone_keeps_its_level():
+    pipeline, packets = run(tone(440), 960)
+    out = samples(packets)[200:]  # past the filter's start-up
+    assert pipeline.output_rate == 16000
+    assert rms(out) == pytest.approx(10000 / np.sqrt(2), rel=0.02)
+
+
+def test_tone_above_output_nyquist_is_removed():
+    _, packets = run(tone(15000), 960)
+    assert rms(samples(packets)[200:]) < 100
+
+
+def test_output_does_not_depend_on_frame_size():
+    pcm = tone(440) + tone(3000, amplitude=5000)
+    _, whole = run(pcm, len(pcm))
+    _, framed = run(pcm, 700)  # not a multiple of the decimation factor
+    a, b = samples(whole), samples(framed)
+    assert len(a) == len(b) == pytest.approx(len(pcm) / 3, abs=20)
+    assert np.abs(a - b).max() <= 1
+
+
+def test_packets_are_packet_ms_long_after_the_first_frame():
+    pipeline, packets = run(tone(440), 960, packet_ms=100)
+    assert len(packets[0]) == 2 * 320  # the first frame goes out alone
+    assert {len(p) for p in packets[1:-1]} == {2 * 1600}
+    assert pipeline.bytes_out == sum(len(p) for p in packets)
+
+
+def test_same_rate_passes_through():
+    pcm = tone(440, seconds=0.1)
+    pipeline = AudioPipeline(RATE, RATE, 250)
+    packets = []
+    pipeline.feed(pcm.tobytes(), packets.append)
+    pipeline.flush(packets.append)
+    assert b"".join(packets) == pcm.tobytes()
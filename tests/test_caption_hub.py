@@ -0,0 +1,129 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+import config
+from routers import listen
+from services import caption_hub, live_pool
+from services.caption_queue import CaptionQueue
+
+
+@pytest.fixture(autouse=True)
+def empty_hub(monkeypatch):
+    monkeypatch.setattr(caption_hub, "_viewers", {})
+    monkeypatch.setattr(caption_hub, "_presenters", {})
+    monkeypatch.setattr(caption_hub, "_counts", dict.fromkeys(caption_hub._counts, 0))
+
+
+class FakeUpstream:
+    """Deepgram live connection stand-in: accepts audio, never sends a transcript."""
+
+    event = SimpleNamespace(TRANSCRIPT_RECEIVED="transcript", ERROR="error")
+
+    def register_handler(self, event, handler) -> None:
+        pass
+
+    def send(self, data: bytes) -> None:
+        pass
+
+    async def finish(self) -> None:
+        pass
+
+
+def test_newer_presenter_closes_the_previous_one_with_4001(store, monkeypatch):
+    async def acquire(keywords, sample_rate):
+        return FakeUpstream(), False
+
+    monkeypatch.setattr(config, "DEEPGRAM_API_KEY", "test-key")
+    monkeypatch.setattr(live_pool, "acquire", acquire)
+    app = FastAPI()
+    app.include_router(listen.router)
+    sid = store.create_session(["tensor"])
+    url = f"/listen?session_id={sid}&role=presenter"
+
+    with TestClient(app) as client, client.websocket_connect(url) as first:
+        first.send_bytes(b"\0\0")  # first is now claimed and reading audio
+        with client.websocket_connect(url) as second:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                first.receive_text()
+            assert closed.value.code == listen.PRESENTER_REPLACED == 4001
+            second.send_bytes(b"\0\0")
+            assert caption_hub.stats()["presenters_replaced"] == 1
+            assert caption_hub.is_live(sid)
+    assert not caption_hub.is_live(sid)
+
+
+def test_release_by_a_replaced_presenter_keeps_the_new_one():
+    async def old():
+        pass
+
+    async def new():
+        pass
+
+    async def run():
+        caption_hub.claim_presenter("s", old)
+        caption_hub.claim_presenter("s", new)
+        caption_hub.release_presenter("s", old)
+        return caption_hub.is_live("s")
+
+    assert asyncio.run(run())
+
+
+class Viewer:
+    """A subscribed viewer whose socket sends only while its gate is open."""
+
+    def __init__(self, session_id: str, max_finals: int, open_gate: bool = True) -> None:
+        self.sent: list[str] = []
+        self.closed = False
+        self.gate = asyncio.Event()
+        if open_gate:
+            self.gate.set()
+        self.queue = CaptionQueue(self.send_text, max_finals=max_finals)
+        caption_hub.subscribe(session_id, self.queue, self.close)
+
+    async def send_text(self, text: str) -> None:
+        await self.gate.wait()
+        self.sent.append(text)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_slow_viewer_is_dropped_without_holding_up_the_others():
+    async def run():
+        fast = Viewer("s", max_finals=5)
+        slow = Viewer("s", max_finals=2, open_gate=False)
+        for n in range(4):
+            caption_hub.publish("s", {"is_final": True, "text": f"final {n}"})
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)  # the slow viewer's close task runs
+        caption_hub.publish("s", {"is_final": True, "text": "after"})
+        await fast.queue.aclose()
+        slow.gate.set()
+        await slow.queue.aclose()
+        return fast, slow
+
+    fast, slow = asyncio.run(run())
+    assert [json.loads(t)["text"] for t in fast.sent] == ["final 0", "final 1", "final 2", "final 3", "after"]
+    assert not fast.closed
+    assert slow.closed
+    assert "after" not in "".join(slow.sent)
+    assert caption_hub.stats()["evicted_slow"] == 1
+    assert caption_hub.stats()["viewers"] == 1
+
+
+def test_caption_is_serialized_once_for_every_viewer():
+    async def run():
+        viewers = [Viewer("s", max_finals=5) for _ in range(3)]
+        caption_hub.publish("s", {"is_final": False, "text": "hello"})
+        for viewer in viewers:
+            await viewer.queue.aclose()
+        return viewers
+
+    sent = [viewer.sent[0] for viewer in asyncio.run(run())]
+    assert all(text is sent[0] for text in sent)
+    assert caption_hub.stats()["delivered"] == 3
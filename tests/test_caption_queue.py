@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+from services.caption_queue import CaptionQueue
+
+
+class GatedSocket:
+    """send_text stand-in that records captions and blocks while the gate is closed."""
+
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send_text(self, text: str) -> None:
+        await self.gate.wait()
+        self.sent.append(json.loads(text))
+
+
+def _final(n: int) -> dict:
+    return {"is_final": True, "text": f"final {n}"}
+
+
+def _interim(n: int) -> dict:
+    return {"is_final": False, "text": f"interim {n}"}
+
+
+def test_only_the_newest_interim_is_sent_to_a_lagging_client():
+    async def run():
+        socket = GatedSocket()
+        socket.gate.clear()
+        captions = CaptionQueue(socket.send_text)
+        captions.put(_final(1))
+        await asyncio.sleep(0)  # the writer is now blocked sending final 1
+        for n in range(1, 4):
+            captions.put(_interim(n))
+        socket.gate.set()
+        await captions.aclose()
+        return socket.sent, captions
+
+    sent, captions = asyncio.run(run())
+    assert [m["text"] for m in sent] == ["final 1", "interim 3"]
+    assert captions.dropped_interims == 2
+
+
+def test_a_final_supersedes_the_pending_interim():
+    async def run():
+        socket = GatedSocket()
+        socket.gate.clear()
+        captions = CaptionQueue(socket.send_text)
+        captions.put(_interim(1))
+        await asyncio.sleep(0)  # interim 1 is being sent
+        captions.put(_interim(2))
+        captions.put(_final(2))
+        socket.gate.set()
+        await captions.aclose()
+        return socket.sent
+
+    assert [m["text"] for m in asyncio.run(run())] == ["interim 1", "final 2"]
+
+
+def test_finals_are_never_dropped_and_stay_in_order():
+    async def run():
+        socket = GatedSocket()
+        captions = CaptionQueue(socket.send_text, max_finals=100)
+        for n in range(50):
+            captions.put(_interim(n))
+            captions.put(_final(n))
+            if n % 7 == 0:
+                await asyncio.sleep(0)
+        await captions.aclose()
+        return socket.sent
+
+    finals = [m["text"] for m in asyncio.run(run()) if m["is_final"]]
+    assert finals == [f"final {n}" for n in range(50)]
+
+
+def test_final_backlog_holds_back_the_reader():
+    async def run():
+        socket = GatedSocket()
+        socket.gate.clear()
+        captions = CaptionQueue(socket.send_text, max_finals=2)
+        captions.put(_final(1))
+        await asyncio.sleep(0)  # final 1 is being sent
+        captions.put(_final(2))
+        captions.put(_final(3))
+        waiting = asyncio.create_task(captions.wait_for_room())
+        await asyncio.sleep(0.01)
+        blocked = not waiting.done()
+        socket.gate.set()
+        await asyncio.wait_for(waiting, 1)
+        await captions.aclose()
+        return blocked, socket.sent
+
+    blocked, sent = asyncio.run(run())
+    assert blocked
+    assert [m["text"] for m in sent] == ["final 1", "final 2", "final 3"]
+
+
+def test_failed_send_closes_the_queue_and_releases_the_reader():
+    async def broken(text: str) -> None:
+        raise ConnectionError("client went away")
+
+    async def run():
+        captions = CaptionQueue(broken, max_finals=1)
+        captions.put(_final(1))
+        await asyncio.wait_for(captions.wait_for_room(), 1)
+        captions.put(_final(2))  # ignored once closed
+        await captions.aclose()
+        return captions
+
+    captions = asyncio.run(run())
+    assert captions.sent == 0
+    assert captions.depth == 0
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import config
+from routers import upload
+from services import job_queue
+
+
+@pytest.fixture(autouse=True)
+def fresh_queue(monkeypatch):
+    """An unstarted queue: one worker, one waiting slot, no history."""
+    monkeypatch.setattr(config, "TRANSCRIBE_WORKERS", 1)
+    monkeypatch.setattr(config, "TRANSCRIBE_QUEUE_SIZE", 1)
+    monkeypatch.setattr(job_queue, "_queue", None)
+    monkeypatch.setattr(job_queue, "_workers", [])
+    monkeypatch.setattr(job_queue, "_job_seconds", job_queue._INITIAL_JOB_SECONDS)
+    for counter in ("_running", "_completed", "_failed", "_rejected"):
+        monkeypatch.setattr(job_queue, counter, 0)
+
+
+def test_full_queue_rejects_with_retry_after():
+    async def run():
+        job_queue.start()
+        release = asyncio.Event()
+        job_queue.submit(release.wait)
+        await asyncio.sleep(0)  # the worker takes the first job
+        job_queue.submit(release.wait)  # waits in the only slot
+        with pytest.raises(job_queue.QueueFull) as full:
+            job_queue.submit(release.wait)
+        release.set()
+        await job_queue._queue.join()
+        await job_queue.stop()
+        return full.value
+
+    full = asyncio.run(run())
+    # One worker, no finished job yet: the initial duration guess
+    assert full.retry_after == job_queue._INITIAL_JOB_SECONDS
+    assert job_queue.stats()["rejected"] == 1
+    assert job_queue.stats()["completed"] == 2
+
+
+def test_upload_admission_answers_429_with_retry_after(monkeypatch):
+    def full():
+        raise job_queue.QueueFull(7)
+
+    monkeypatch.setattr(job_queue, "admit", full)
+    with pytest.raises(HTTPException) as e:
+        upload._admit()
+    assert e.value.status_code == 429
+    assert e.value.headers == {"Retry-After": "7"}
+
+
+def test_failed_job_is_counted_and_the_worker_keeps_going():
+    ran = []
+
+    async def fail():
+        raise RuntimeError("deepgram down")
+
+    async def succeed():
+        ran.append("ok")
+
+    async def run():
+        job_queue.start()
+        job_queue.submit(fail)
+        await job_queue._queue.join()
+        job_queue.submit(succeed)
+        await job_queue._queue.join()
+        await job_queue.stop()
+
+    asyncio.run(run())
+    assert ran == ["ok"]
+    assert (job_queue.stats()["failed"], job_queue.stats()["completed"]) == (1, 1)
+
+
+def test_stop_discards_jobs_that_never_started(monkeypatch):
+    monkeypatch.setattr(config, "TRANSCRIBE_QUEUE_SIZE", 3)
+    discarded = []
+
+    def broken_discard():
+        raise OSError("spool already gone")
+
+    async def never():
+        raise AssertionError("a queued job ran after stop")
+
+    async def run():
+        job_queue.start()
+        release = asyncio.Event()
+        job_queue.submit(release.wait, discard=lambda: discarded.append("running"))
+        await asyncio.sleep(0)
+        job_queue.submit(never, discard=broken_discard)
+        job_queue.submit(never, discard=lambda: discarded.append("queued"))
+        job_queue.submit(never)
+        await job_queue.stop()
+
+    asyncio.run(run())
+    # The running job was cancelled, not discarded; a failing discard does not stop the rest
+    assert discarded == ["queued"]
+    assert job_queue.stats()["queued"] == 0
@@ -0,0 +1,99 @@
+import pytest
+
+from services.common_words import load_wordlist
+from services.keyword_corrector import KeywordCorrector, correct_result, phonetic
+
+KEYWORDS = ["Navier-Stokes", "vector", "algorithm", "entropy", "Fourier transform", "eigenvalue"]
+
+
+@pytest.fixture(scope="module")
+def corrector() -> KeywordCorrector:
+    return KeywordCorrector(KEYWORDS)
+
+
+@pytest.mark.parametrize(
+    "heard, expected",
+    [
+        ("the Navy Stock equations", "the Navier-Stokes equations"),
+        ("take the four year transform", "take the Fourier transform"),
+        ("an eigen value problem", "an eigenvalue problem"),
+        ("a vecter field", "a vector field"),
+    ],
+)
+def test_misheard_keywords_are_corrected(corrector, heard, expected):
+    text, replaced, exceeded = corrector.correct(heard)
+    assert text == expected
+    assert replaced == 1
+    assert not exceeded
+
+
+@pytest.mark.parametrize(
+    "heard",
+    [
+        "add the vectors",
+        "sorting algorithms",
+        "the vectored thrust",
+        "an entry point",
+        "Fourier transforms",
+        "navier stokes",
+    ],
+)
+def test_correct_words_are_kept(corrector, heard):
+    assert corrector.correct(heard) == (heard, 0, False)
+
+
+def test_windows_do_not_cross_sentences(corrector):
+    assert corrector.correct("the Navy. Stock prices")[0] == "the Navy. Stock prices"
+
+
+def test_budget_stops_early(corrector):
+    text = "Navy Stock " * 200
+    corrected, _, exceeded = corrector.correct(text, budget_ms=0)
+    assert exceeded
+    assert corrected == text
+
+
+def test_phonetic():
+    assert phonetic("knight") == phonetic("night")
+    assert phonetic("phase") == phonetic("faze")
+    assert phonetic("") == ""
+
+
+@pytest.mark.parametrize("heard", ["the tender offer", "lamb duh", "a lamb chop", "the tensors"])
+def test_real_words_that_sound_like_keywords_are_kept(heard):
+    assert KeywordCorrector(["tensor", "lambda"]).correct(heard) == (heard, 0, False)
+
+
+def test_near_spelling_of_a_keyword_is_corrected():
+    assert KeywordCorrector(["tensor", "lambda"]).correct("the tenser product")[0] == "the tensor product"
+
+
+def test_words_from_a_frequency_list_are_common(tmp_path):
+    wordlist = tmp_path / "freq.txt"
+    wordlist.write_text("the 100\nTenser 50\nrare 1\n")
+    assert load_wordlist(str(wordlist), top=2) == {"the", "tenser"}
+
+
+def _words(*items):
+    return [{"word": word, "start": start, "end": end} for word, start, end in items]
+
+
+def test_timed_words_are_corrected_with_their_timings(corrector):
+    words = _words(("the", 0.0, 0.2), ("Navy", 0.2, 0.5), ("Stock", 0.5, 0.9), ("equations.", 0.9, 1.4))
+    corrected, replaced, _ = corrector.correct_words(words)
+    assert replaced == 1
+    assert corrected == _words(("the", 0.0, 0.2), ("Navier-Stokes", 0.2, 0.9), ("equations.", 0.9, 1.4))
+
+
+def test_corrected_result_words_agree_with_transcripts(corrector):
+    segments = [
+        {"transcript": "a vecter field", "words": _words(("a", 0.0, 0.1), ("vecter", 0.1, 0.5), ("field", 0.5, 0.9))},
+        {"transcript": "the Navy Stock.", "words": _words(("the", 1.0, 1.1), ("Navy", 1.1, 1.4), ("Stock.", 1.4, 1.8))},
+    ]
+    words = [w for seg in segments for w in seg["words"]]
+    transcript, _, words, segments = correct_result(corrector, ("a vecter field the Navy Stock.", 0.9, words, segments))
+    assert transcript == "a vector field the Navier-Stokes."
+    for seg in segments:
+        assert seg["transcript"] == " ".join(w["word"] for w in seg["words"])
+    assert words == [w for seg in segments for w in seg["words"]]
+    assert (words[-1]["word"], words[-1]["start"], words[-1]["end"]) == ("Navier-Stokes.", 1.1, 1.8)
@@ -0,0 +1,49 @@
+from collections import Counter
+
+import pytest
+
+import config
+from services import keyword_engine, pdf_service
+from services.keyword_engine import iter_chunks
+
+PAGES = [
+    "Gradient descent minimizes the loss function.\nThe Hessian matrix gives curvature.",
+    "Stochastic gradient descent samples minibatches.\n" + "Backpropagation computes gradients. " * 20,
+    "",
+    "Convolution kernels and pooling layers in LeCun's networks.",
+]
+
+
+@pytest.mark.parametrize("max_chars", [16, 40, 1000])
+def test_chunks_are_bounded_and_lossless(max_chars):
+    chunks = list(iter_chunks(PAGES, max_chars))
+    assert all(len(chunk) <= max_chars for chunk in chunks)
+    # Pages are joined with a space, as in the single-document pass
+    assert "".join(chunks) == " ".join(PAGES) + " "
+
+
+def test_chunks_split_at_line_breaks():
+    assert list(iter_chunks(["aaa\nbbb\nccc"], 8)) == ["aaa\nbbb\n", "ccc "]
+
+
+@pytest.fixture(scope="module")
+def full_nlp():
+    spacy = pytest.importorskip("spacy")
+    try:
+        return spacy.load(keyword_engine.MODEL_NAME)
+    except OSError:
+        pytest.skip(f"spaCy model {keyword_engine.MODEL_NAME} is not installed")
+
+
+def test_lean_pipeline_ranks_like_the_full_model(full_nlp, monkeypatch):
+    """The excluded components and chunked tagging leave the keyword ranking unchanged."""
+    monkeypatch.setattr(config, "KEYWORD_CHUNK_CHARS", 100_000)
+    expected: Counter[str] = Counter()
+    for token in full_nlp(" ".join(PAGES)):
+        word = token.text.strip().lower()
+        if token.pos_ in keyword_engine.KEYWORD_POS and len(word) >= 5 and word.isalpha():
+            if word not in pdf_service.FILLER_TERMS:
+                expected[word] += 1
+    counts = keyword_engine.count_keywords(PAGES, filler_terms=pdf_service.FILLER_TERMS, n_process=1)
+    assert counts == expected
+    assert pdf_service.rank_keywords(counts) == pdf_service.rank_keywords(expected)
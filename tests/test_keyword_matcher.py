@@ -0,0 +1,51 @@
+import pytest
+
+from services.keyword_matcher import KeywordMatcher, get_matcher, match_segments
+
+
+def spans(keywords, text):
+    return [(text[s["start"] : s["end"]], s["keyword"]) for s in KeywordMatcher(keywords).find(text)]
+
+
+def test_case_insensitive_spans_index_the_original_text():
+    assert spans(["Navier-Stokes", "entropy"], "NAVIER-STOKES and Entropy.") == [
+        ("NAVIER-STOKES", "Navier-Stokes"),
+        ("Entropy", "entropy"),
+    ]
+
+
+def test_only_whole_words_match():
+    assert spans(["vector"], "vectors, subvector and vector_x") == []
+    assert spans(["vector"], "a vector-valued vector.") == [("vector", "vector"), ("vector", "vector")]
+
+
+def test_longest_match_wins_and_spans_do_not_overlap():
+    assert spans(["new", "new york", "york city"], "New York City") == [("New York", "new york")]
+    assert spans(["fourier", "fourier transform"], "the Fourier transform") == [
+        ("Fourier transform", "fourier transform")
+    ]
+
+
+def test_phrase_matches_across_any_whitespace():
+    assert spans(["Fourier  transform"], "a fourier\ntransform") == [("fourier\ntransform", "Fourier  transform")]
+
+
+def test_matches_found_through_fail_links():
+    # "york" ends inside the "new yorker" branch of the trie, reached only via fail links
+    assert spans(["new yorker", "york"], "in new york") == [("york", "york")]
+    assert spans(["he", "she", "his", "hers"], "ushers, she and his") == [("she", "she"), ("his", "his")]
+
+
+def test_duplicates_and_blank_keywords_are_ignored():
+    matcher = KeywordMatcher(["Entropy", "entropy", "  ", ""])
+    assert matcher.keywords == ["Entropy"]
+
+
+@pytest.mark.parametrize("keywords", [None, []])
+def test_no_keywords_no_matcher(keywords):
+    assert get_matcher(keywords) is None
+    assert match_segments(None, [{"transcript": "entropy"}]) == [[]]
+
+
+def test_matchers_are_cached_by_keyword_list():
+    assert get_matcher(["entropy"]) is get_matcher(["entropy"])
@@ -0,0 +1,184 @@
+import asyncio
+import gc
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from services import keyword_cache, keywords_gemini, pdf_pipeline
+from services.result_cache import TieredCache
+from services.keywords_gemini import chunk_pages, fuse_rankings
+
+
+def test_chunk_pages_breaks_between_pages():
+    assert chunk_pages(["aaa bbb", "ccc", "", "ddd eee"], max_chars=12) == ["aaa bbb ccc", "ddd eee"]
+
+
+def test_chunk_pages_splits_long_page_at_whitespace():
+    assert chunk_pages(["one two three four"], max_chars=9) == ["one two", "three", "four"]
+
+
+def test_fuse_rankings_prefers_terms_found_in_many_chunks():
+    fused = fuse_rankings([["a", "b", "c"], ["c", "d"], ["c", "b"]], max_keywords=3)
+    assert fused == ["c", "b", "a"]
+
+
+def test_fuse_rankings_counts_duplicates_once():
+    assert fuse_rankings([["a", "a", "a", "b"], ["b"]], max_keywords=2) == ["b", "a"]
+
+
+@pytest.fixture
+def fake_chunks(monkeypatch):
+    """Each chunk answers with its first word; chunks containing "fail" get no answer."""
+
+    async def extract(chunk, max_keywords, deadline, hedge, semaphore):
+        return [] if "fail" in chunk else [chunk.split()[0]]
+
+    monkeypatch.setattr(keywords_gemini, "_gemini_available", lambda: True)
+    monkeypatch.setattr(keywords_gemini, "_extract_hedged", extract)
+    monkeypatch.setattr(config, "GEMINI_CHUNK_CHARS", 10)
+
+
+def test_all_chunks_answered_is_complete(fake_chunks):
+    result = asyncio.run(keywords_gemini.extract_keywords_gemini_async(["alpha one", "gamma two"]))
+    assert result == (["alpha", "gamma"], True)
+
+
+def test_missing_chunk_is_partial(fake_chunks):
+    result = asyncio.run(keywords_gemini.extract_keywords_gemini_async(["alpha one", "fail here", "gamma two"]))
+    assert result.keywords == ["alpha", "gamma"]
+    assert not result.complete
+
+
+class FakeModels:
+    """generate_content with a (delay seconds, keywords or exception) per model; tracks calls in flight."""
+
+    def __init__(self, behaviour: dict) -> None:
+        self.behaviour = behaviour
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls.append(model)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay, result = self.behaviour[model]
+            if isinstance(delay, asyncio.Event):
+                await delay.wait()
+            else:
+                await asyncio.sleep(delay)
+            if isinstance(result, Exception):
+                raise result
+            return SimpleNamespace(text=json.dumps(result))
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Install a fake shared client over models "a", "b", "c"; call with their behaviour."""
+    pytest.importorskip("google.genai")  # _call_model builds the request config with its types
+    monkeypatch.setattr(keywords_gemini, "MODEL_NAMES", ("a", "b", "c"))
+    monkeypatch.setattr(keywords_gemini, "_stats", {})
+    monkeypatch.setattr(keywords_gemini, "_gemini_available", lambda: True)
+
+    def install(behaviour: dict) -> FakeModels:
+        models = FakeModels(behaviour)
+        client = SimpleNamespace(aio=SimpleNamespace(models=models))
+        monkeypatch.setattr(keywords_gemini, "_get_client", lambda: client)
+        return models
+
+    return install
+
+
+def _extract(text="chunk text", budget_ms=2000, hedge_ms=100):
+    async def run():
+        t0 = time.perf_counter()
+        result = await keywords_gemini.extract_keywords_gemini_async(text, budget_ms=budget_ms, hedge_ms=hedge_ms)
+        return result, time.perf_counter() - t0
+
+    return asyncio.run(run())
+
+
+def test_hedge_starts_the_next_model_after_the_delay(fake_gemini):
+    models = fake_gemini({"a": (1.0, ["slow"]), "b": (0.05, ["fast"]), "c": (0.05, ["unused"])})
+    result, elapsed = _extract(hedge_ms=100)
+    assert result == (["fast"], True)
+    assert models.calls == ["a", "b"]
+    assert 0.1 <= elapsed < 0.5
+    stats = keywords_gemini.get_stats()
+    assert stats["b"]["hedged"] == 1
+    assert stats["a"]["cancelled"] == 1
+
+
+def test_failed_call_is_replaced_without_waiting_for_the_hedge(fake_gemini):
+    models = fake_gemini({"a": (0.01, RuntimeError("quota")), "b": (0.02, ["ok"]), "c": (0.02, ["unused"])})
+    result, elapsed = _extract(hedge_ms=5000)
+    assert result.keywords == ["ok"]
+    assert models.calls == ["a", "b"]
+    assert elapsed < 0.5
+    assert keywords_gemini.get_stats()["a"]["errors"] == 1
+
+
+def test_invalid_json_counts_as_a_failure(fake_gemini):
+    fake_gemini({"a": (0.01, {"not": "a list"}), "b": (0.01, ["ok"]), "c": (0.01, ["unused"])})
+    assert _extract(hedge_ms=5000)[0].keywords == ["ok"]
+
+
+def test_budget_bounds_the_total_latency(fake_gemini):
+    fake_gemini({name: (5.0, ["late"]) for name in "abc"})
+    result, elapsed = _extract(budget_ms=200, hedge_ms=50)
+    assert result == ([], False)
+    assert elapsed < 1
+    assert sum(st["timeouts"] for st in keywords_gemini.get_stats().values()) == 3
+
+
+def test_losing_tasks_have_their_exceptions_retrieved(fake_gemini):
+    async def run():
+        reported = []
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda loop, context: reported.append(context["message"]))
+        release = asyncio.Event()
+        # "a" fails and "b" answers in the same loop iteration; "c" fails after "b" has won
+        fake_gemini({"a": (release, RuntimeError("a")), "b": (release, ["ok"]), "c": (release, RuntimeError("c"))})
+        loop.call_later(0.05, release.set)
+        keywords = await keywords_gemini._extract_hedged("text", 5, loop.time() + 2, 0.0, asyncio.Semaphore(3))
+        await asyncio.sleep(0.01)
+        gc.collect()
+        return keywords, reported
+
+    keywords, reported = asyncio.run(run())
+    assert keywords == ["ok"]
+    assert reported == []
+
+
+def test_concurrency_limit_covers_hedged_calls(fake_gemini, monkeypatch):
+    monkeypatch.setattr(config, "GEMINI_CHUNK_CHARS", 10)
+    monkeypatch.setattr(config, "GEMINI_MAX_CONCURRENCY", 2)
+    models = fake_gemini({name: (0.05, [name]) for name in "abc"})
+    # Every chunk hedges before its first call could answer, yet only two calls run at once
+    result, _ = _extract(["alpha one", "beta two", "gamma three"], hedge_ms=1)
+    assert result.complete
+    assert models.max_in_flight == 2
+
+
+def test_pipeline_falls_back_to_spacy_when_gemini_fails(fake_gemini, monkeypatch, tmp_path):
+    fake_gemini({name: (0.01, RuntimeError("down")) for name in "abc"})
+    counts = Counter({"tensor": 3, "lattice": 1})
+    monkeypatch.setattr(config, "KEYWORD_SCORING", "frequency")
+    monkeypatch.setattr(keyword_cache, "_cache", TieredCache(1 << 20))
+    monkeypatch.setattr(pdf_pipeline, "_get_executor", lambda: ThreadPoolExecutor(1))
+    monkeypatch.setattr(pdf_pipeline.pdf_service, "page_count", lambda path: 1)
+    monkeypatch.setattr(pdf_pipeline, "_score_shard", lambda path, start, stop: (start, stop, ["tensor text"], counts))
+
+    async def run():
+        return [e async for e in pdf_pipeline.run_keyword_pipeline(tmp_path / "doc.pdf", 10, use_gemini=True, doc_hash="h")]
+
+    final = asyncio.run(run())[-1]
+    assert (final["source"], final["keywords"]) == ("spacy", ["tensor", "lattice"])
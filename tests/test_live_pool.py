@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from services import live_pool
+
+
+class FakeConnection:
+    def __init__(self, options: dict) -> None:
+        self.keywords = options.get("keywords")
+        self.done = False
+
+    def keep_alive(self) -> None:
+        pass
+
+    async def finish(self) -> None:
+        self.done = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """An empty pool of at most two idle connections, opened by a fake Deepgram client."""
+    opened: list[FakeConnection] = []
+
+    async def live(options):
+        opened.append(FakeConnection(options))
+        return opened[-1]
+
+    monkeypatch.setattr(config, "DEEPGRAM_API_KEY", "test-key")
+    monkeypatch.setattr(config, "LIVE_POOL_MAX_IDLE", 2)
+    monkeypatch.setattr(live_pool, "_dg", SimpleNamespace(transcription=SimpleNamespace(live=live)))
+    monkeypatch.setattr(live_pool, "_idle", {})
+    monkeypatch.setattr(live_pool, "_opening", 0)
+    monkeypatch.setattr(live_pool, "_evicted", 0)
+    monkeypatch.setattr(live_pool, "_handoffs", {"warm": 0, "cold": 0})
+    return opened
+
+
+async def _prewarm(*keyword_lists: list[str]) -> None:
+    for keywords in keyword_lists:
+        live_pool.prewarm(keywords)
+        await asyncio.gather(*live_pool._tasks)
+
+
+def test_full_pool_closes_the_longest_open_connection_for_new_keywords(pool):
+    async def run():
+        await _prewarm(["first"], ["second"], ["third"])
+        warm = [(await live_pool.acquire(keywords))[1] for keywords in (["first"], ["third"])]
+        stats = live_pool.stats()
+        await live_pool.aclose()
+        return warm, stats
+
+    warm, stats = asyncio.run(run())
+    assert warm == [False, True]
+    assert pool[0].done  # "first" was closed to make room
+    assert stats["evicted"] == 1
+
+
+def test_full_pool_is_not_churned_for_keywords_it_already_holds(pool):
+    async def run():
+        await _prewarm(["same"], ["same"], ["same"])
+        stats = live_pool.stats()
+        await live_pool.aclose()
+        return stats
+
+    stats = asyncio.run(run())
+    assert len(pool) == 2
+    assert (stats["idle"], stats["evicted"]) == (2, 0)
@@ -0,0 +1,25 @@
+import pytest
+
+import config
+from services.pdf_pipeline import shard_bounds
+
+
+@pytest.fixture(autouse=True)
+def shard_sizes(monkeypatch):
+    monkeypatch.setattr(config, "PDF_FIRST_SHARD_PAGES", 2)
+    monkeypatch.setattr(config, "PDF_PAGES_PER_SHARD", 3)
+
+
+def test_small_first_shard_then_fixed_size():
+    assert shard_bounds(10) == [(0, 2), (2, 5), (5, 8), (8, 10)]
+
+
+def test_document_shorter_than_first_shard():
+    assert shard_bounds(1) == [(0, 1)]
+    assert shard_bounds(0) == []
+
+
+@pytest.mark.parametrize("n_pages", [1, 2, 3, 5, 17, 100])
+def test_shards_cover_every_page_once(n_pages):
+    pages = [page for start, stop in shard_bounds(n_pages) for page in range(start, stop)]
+    assert pages == list(range(n_pages))
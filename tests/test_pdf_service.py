@@ -0,0 +1,48 @@
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+import config
+from services import corpus_index, keyword_cache, pdf_service
+from services.result_cache import TieredCache
+
+DOCS = {
+    "a.pdf": Counter({"tensor": 3, "gradient": 3, "entropy": 1}),
+    "b.pdf": Counter({"tensor": 2, "lattice": 4}),
+}
+
+
+@pytest.fixture
+def extracted(monkeypatch, tmp_path):
+    """Fake extraction over DOCS; returns the list of documents actually extracted."""
+    calls = []
+
+    def count_keywords(text, **kwargs):
+        calls.append(text)
+        return Counter(DOCS[text])
+
+    monkeypatch.setattr(config, "KEYWORD_SCORING", "tfidf")
+    monkeypatch.setattr(corpus_index, "_index", corpus_index.DfIndex(None))
+    monkeypatch.setattr(keyword_cache, "_cache", TieredCache(1 << 20, str(tmp_path / "cache")))
+    monkeypatch.setattr(keyword_cache, "file_hash", lambda path: path.name)
+    monkeypatch.setattr(pdf_service, "extract_text_from_pdf", lambda path: path.name)
+    monkeypatch.setattr(pdf_service, "count_keywords", count_keywords)
+    return calls
+
+
+def test_repeat_upload_hits_after_other_documents_are_indexed(extracted):
+    assert pdf_service.process_pdf(Path("a.pdf")) == ["tensor", "gradient", "entropy"]
+    pdf_service.process_pdf(Path("b.pdf"))
+    # Re-ranked against the current index: "tensor" is now in every document
+    assert pdf_service.process_pdf(Path("a.pdf")) == ["gradient", "tensor", "entropy"]
+    assert extracted == ["a.pdf", "b.pdf"]
+
+
+def test_disk_tier_hits_after_restart_and_reindexes(extracted, monkeypatch, tmp_path):
+    pdf_service.process_pdf(Path("a.pdf"))
+    monkeypatch.setattr(corpus_index, "_index", corpus_index.DfIndex(None))
+    monkeypatch.setattr(keyword_cache, "_cache", TieredCache(1 << 20, str(tmp_path / "cache")))
+    pdf_service.process_pdf(Path("a.pdf"))
+    assert extracted == ["a.pdf"]
+    assert corpus_index.get_index().n_docs == 1
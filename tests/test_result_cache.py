@@ -0,0 +1,78 @@
+import zlib
+
+import pytest
+
+from services import keyword_cache
+from services.result_cache import TieredCache, make_key
+
+
+def test_memory_hit_and_miss():
+    cache = TieredCache(max_bytes=1 << 20)
+    cache.put("k", {"keywords": ["tensor"]})
+    assert cache.get("k") == {"keywords": ["tensor"]}
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_bound_evicts_least_recently_used():
+    cache = TieredCache(max_bytes=1 << 20)
+    cache.put("a", "x" * 100)
+    entry_bytes = cache.stats()["bytes"]
+    cache = TieredCache(max_bytes=2 * entry_bytes)
+    cache.put("a", "x" * 100)
+    cache.put("b", "y" * 100)
+    cache.get("a")  # b is now the least recently used
+    cache.put("c", "z" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_value_larger_than_budget_is_not_kept_in_memory():
+    cache = TieredCache(max_bytes=16)
+    cache.put("big", list(range(1000)))
+    assert cache.stats()["entries"] == 0
+    assert cache.get("big") is None
+
+
+def test_disk_tier_survives_restart_and_promotes_to_memory(tmp_path):
+    TieredCache(max_bytes=1 << 20, disk_dir=str(tmp_path)).put("k", [1, 2, 3])
+    cache = TieredCache(max_bytes=1 << 20, disk_dir=str(tmp_path))
+    assert cache.get("k") == [1, 2, 3]
+    assert cache.get("k") == [1, 2, 3]
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["hits"], stats["entries"]) == (1, 1, 1)
+
+
+@pytest.mark.parametrize(
+    "blob", [b"", b"not zlib", zlib.compress(b'{"truncated": ['), zlib.compress(b"\xff\xfe")[:5]]
+)
+def test_corrupt_or_partial_disk_entries_are_misses(tmp_path, blob):
+    cache = TieredCache(max_bytes=1 << 20, disk_dir=str(tmp_path))
+    (tmp_path / "k.json.z").write_bytes(blob)
+    assert cache.get("k") is None
+    assert cache.stats()["misses"] == 1
+    # A later put replaces the bad file
+    cache.put("k", "ok")
+    assert TieredCache(max_bytes=1 << 20, disk_dir=str(tmp_path)).get("k") == "ok"
+
+
+def test_make_key_depends_on_every_part_and_order():
+    assert make_key("keywords", "h", 50) == make_key("keywords", "h", 50)
+    assert make_key("keywords", "h", 50) != make_key("keywords", "h", 40)
+    assert make_key("a", "b") != make_key("b", "a")
+    assert make_key("ab", "c") != make_key("a", "bc")
+
+
+def test_keyword_cache_key_is_sensitive_to_settings(monkeypatch):
+    monkeypatch.setattr(keyword_cache, "_cache", TieredCache(max_bytes=1 << 20))
+    filler = frozenset({"chapter", "lecture"})
+    keyword_cache.put_counts("h", filler, {"tensor": 2})
+    keyword_cache.put("h", "gemini", 50, filler, ["tensor"])
+    assert keyword_cache.get_counts("h", filler) == {"tensor": 2}
+    assert keyword_cache.get_counts("h", filler | {"week"}) is None
+    assert keyword_cache.get_counts("other", filler) is None
+    assert keyword_cache.get("h", "gemini", 50, filler)["keywords"] == ["tensor"]
+    assert keyword_cache.get("h", "gemini", 20, filler) is None
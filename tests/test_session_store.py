@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+import config
+from services import caption_hub, transcript_log
+from services.session_db import DatabaseBusy, SessionDB
+
+
+@pytest.fixture
+def shared(store, monkeypatch, tmp_path):
+    """This worker's store on a SQLite file, plus another worker's own connection to it."""
+    path = str(tmp_path / "sessions.db")
+    monkeypatch.setattr(config, "SESSION_BACKEND", "sqlite")
+    monkeypatch.setattr(config, "SESSION_DB_PATH", path)
+    monkeypatch.setattr(config, "SESSION_DB_BUSY_MS", 50)
+    other = SessionDB(path, busy_timeout_ms=50)
+    yield store, other
+    other.close()
+
+
+def test_workers_see_each_others_writes(shared):
+    store, other = shared
+    sid = store.create_session(["tensor"])
+    assert other.get(sid)["keywords"] == ["tensor"]
+    other.update(sid, lambda sess: sess.update(keywords=["lattice"]))
+    assert store.get_keywords(sid) == ["lattice"]
+    other.expire(0)
+    assert store.get_session(sid) is None
+
+
+def test_write_while_another_worker_holds_the_database_raises_busy(shared):
+    store, other = shared
+    sid = store.create_session(["tensor"])
+    other._conn.execute("BEGIN IMMEDIATE")
+    try:
+        t0 = time.perf_counter()
+        with pytest.raises(DatabaseBusy):
+            store.update_session_status(sid, "queued")
+        with pytest.raises(DatabaseBusy):
+            store.create_session([])
+        assert time.perf_counter() - t0 < 1
+    finally:
+        other._conn.execute("COMMIT")
+    assert store.update_session_status(sid, "queued")
+    assert other.get(sid)["status"] == "queued"
+
+
+def _idle(store, sid: str, seconds: float) -> None:
+    """Pretend the session was last used `seconds` ago."""
+    used, size = store._meta[sid]
+    store._meta[sid] = (used - seconds, size)
+
+
+def test_sweep_evicts_idle_sessions_but_not_pinned_ones(store, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "SESSION_TTL_S", 60)
+    monkeypatch.setattr(config, "LIVE_TRANSCRIPT_DIR", str(tmp_path))
+    monkeypatch.setattr(caption_hub, "_presenters", {})
+    idle, live, job = (store.create_session([f"k{i}"]) for i in range(3))
+    caption_hub.claim_presenter(live, lambda: None)
+    store.update_session_status(job, "transcribing")
+    recent = store.create_session(["k3"])
+    for sid in (idle, live, job):
+        _idle(store, sid, 120)
+    transcript_log.append(idle, "goodbye")
+
+    assert store.sweep() == 1
+    transcript_log.flush()
+    assert store.get_session(idle) is None
+    assert not (tmp_path / f"{idle}.ndjson").exists()
+    assert all(store.get_session(sid) is not None for sid in (live, job, recent))
+    assert store.stats()["evicted"]["ttl"] == 1
+
+
+def _sized_store(store, monkeypatch, sessions_that_fit: float) -> None:
+    """Budget the store for this many sessions like the ones _new_session creates."""
+    probe = _new_session(store)
+    size = store._meta[probe][1]
+    store._drop(probe)
+    monkeypatch.setattr(config, "SESSION_STORE_MAX_MB", sessions_that_fit * size / (1024 * 1024))
+
+
+def _new_session(store) -> str:
+    return store.create_session(["x" * 200])
+
+
+def test_over_budget_evicts_least_recently_used_first(store, monkeypatch):
+    _sized_store(store, monkeypatch, 2.5)
+    a, b = _new_session(store), _new_session(store)
+    store.get_session(a)  # b is now the least recently used
+    c = _new_session(store)
+
+    assert store.get_session(b) is None
+    assert store.get_session(a) is not None and store.get_session(c) is not None
+    assert store.stats()["evicted"]["lru"] == 1
+
+
+def test_over_budget_never_evicts_pinned_sessions(store, monkeypatch):
+    _sized_store(store, monkeypatch, 2.5)
+    monkeypatch.setattr(caption_hub, "_presenters", {})
+    live, job = _new_session(store), _new_session(store)
+    caption_hub.claim_presenter(live, lambda: None)
+    store.update_session_status(job, "queued")
+    newest = _new_session(store)
+
+    # Both older sessions are pinned, so the store stays over budget rather than drop them
+    assert all(store.get_session(sid) is not None for sid in (live, job, newest))
+    assert store.stats()["evicted"]["lru"] == 0
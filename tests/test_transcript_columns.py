@@ -0,0 +1,45 @@
+import json
+
+from services.transcript_columns import dumps, from_columns, to_columns
+
+SEGMENTS = [
+    {
+        "transcript": "The Navier-Stokes equations",
+        "words": [
+            {"word": "The", "start": 0.0, "end": 0.12},
+            {"word": "Navier-Stokes", "start": 0.12, "end": 0.9},
+            {"word": "equations", "start": 0.9, "end": 1.501},
+        ],
+    },
+    {"transcript": "", "words": []},
+    {"transcript": "describe flow.", "words": [{"word": "describe", "start": 2.0, "end": 2.4}]},
+]
+
+
+def test_round_trip():
+    columns = to_columns("The Navier-Stokes equations describe flow.", 0.93, SEGMENTS)
+    transcript, confidence, words, segments = from_columns(columns)
+    assert transcript == "The Navier-Stokes equations describe flow."
+    assert confidence == 0.93
+    assert segments == SEGMENTS
+    assert words == [w for seg in SEGMENTS for w in seg["words"]]
+
+
+def test_words_stored_once_as_parallel_arrays():
+    columns = to_columns("", None, SEGMENTS)
+    assert columns["words"]["word"] == ["The", "Navier-Stokes", "equations", "describe"]
+    assert columns["words"]["start_ms"] == [0, 120, 900, 2000]
+    assert columns["segments"]["range"] == [[0, 3], [3, 3], [3, 4]]
+    assert "spans" not in columns["segments"]
+
+
+def test_spans_are_kept():
+    spans = [[{"start": 4, "end": 17, "keyword": "Navier-Stokes"}], [], []]
+    assert to_columns("", None, SEGMENTS, spans)["segments"]["spans"] == spans
+
+
+def test_dumps_is_compact_utf8():
+    data = dumps({"word": "Schrödinger", "n": [1, 2]})
+    assert b" " not in data
+    assert json.loads(data) == {"word": "Schrödinger", "n": [1, 2]}
+    assert "Schrödinger".encode() in data
@@ -0,0 +1,50 @@
+import pytest
+
+import config
+from services import transcript_log
+
+
+@pytest.fixture
+def log_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "LIVE_TRANSCRIPT_DIR", str(tmp_path))
+    monkeypatch.setattr(transcript_log, "_logs", {})
+    return tmp_path
+
+
+def test_appends_reach_disk_and_reload_with_the_epoch(log_dir):
+    seqs = [transcript_log.append("s1", text, 0.9) for text in ("one", "two", "three")]
+    epoch = transcript_log.epoch("s1")
+    transcript_log.flush()
+    transcript_log._logs.clear()  # as after a restart
+
+    assert seqs == [1, 2, 3]
+    assert transcript_log.epoch("s1") == epoch
+    assert transcript_log.transcript("s1") == "one two three"
+    assert [m["seq"] for m in transcript_log.since("s1", 1, epoch)] == [2, 3]
+
+
+def test_since_from_another_epoch_replays_everything(log_dir):
+    transcript_log.append("s1", "one")
+    transcript_log.append("s1", "two")
+    assert [m["text"] for m in transcript_log.since("s1", 1, "elsewhere")] == ["one", "two"]
+
+
+def test_discard_deletes_the_file(log_dir):
+    transcript_log.append("s1", "one")
+    transcript_log.discard("s1")
+    transcript_log.flush()
+
+    assert not (log_dir / "s1.ndjson").exists()
+    assert transcript_log.get_log("s1") is None
+
+
+def test_log_recreated_after_discard_starts_a_new_epoch(log_dir):
+    transcript_log.append("s1", "old")
+    old_epoch = transcript_log.epoch("s1")
+    transcript_log.discard("s1")
+    assert transcript_log.append("s1", "new") == 1
+    transcript_log.flush()
+    transcript_log._logs.clear()
+
+    assert transcript_log.epoch("s1") != old_epoch
+    assert transcript_log.transcript("s1") == "new"